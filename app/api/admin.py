@@ -1,71 +1,161 @@
-from fastapi import APIRouter, Depends, HTTPException
+import os
+from datetime import datetime
+from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlmodel import select
-from sqlalchemy import func
 from app.auth.dependencies import get_current_admin
 from app.db.session import get_session
 from app.models.review import Review
 from app.models.user import User
 from app.models.resume import Resume
+from app.models.job_desc import JobPosting
+from app.schemas.job_desc import RankResumesRequest
+from app.services import llm_cache, llm_router, ranking, search, stats
+from app.services.export import MEDIA_TYPES, resume_export_statement, review_export_statement, stream_rows
+from app.utils.pagination import PageParams, decode_cursor, encode_cursor, page_params, paginate, page_response
 
 router = APIRouter()
 
+# Listing endpoints return metadata only; the large text columns (resume content,
+# review feedback) are never loaded for a list.
+REVIEW_COLUMNS = (Review.id, Review.resume_id, Review.user_id, Review.score, Review.created_at)
+RESUME_COLUMNS = (Resume.id, Resume.user_id, Resume.filename, Resume.uploaded_at)
+USER_COLUMNS = (User.id, User.email, User.is_active, User.role)
+# Upper bound on resumes scored by one /rank-resumes call (newest first)
+RANK_MAX_RESUMES = int(os.getenv("RANK_MAX_RESUMES", "5000"))
+
 @router.get("/stats")
-def get_stats(session=Depends(get_session), admin=Depends(get_current_admin)):
-    review_count = session.exec(select(func.count()).select_from(Review)).one()
-    user_count = session.exec(select(func.count()).select_from(User)).one()
-    resume_count = session.exec(select(func.count()).select_from(Resume)).one()
-    return {
-        "review_count": review_count,
-        "user_count": user_count,
-        "resume_count": resume_count
-    }
+def get_stats(
+    days: int = Query(30, ge=1, le=366),
+    session=Depends(get_session),
+    admin=Depends(get_current_admin)
+):
+    # Served from counters maintained on insert, not count(*) scans
+    return stats.get_stats(session, days)
+
+@router.get("/llm-cache")
+def get_llm_cache_stats(admin=Depends(get_current_admin)):
+    return llm_cache.stats()
+
+@router.get("/llm-models")
+async def get_llm_model_stats(admin=Depends(get_current_admin)):
+    # Runs on the event loop, where the routers update their stats
+    return llm_router.stats()
+
+@router.get("/export/reviews")
+def export_reviews(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    start: datetime | None = Query(None, description="created_at >= start"),
+    end: datetime | None = Query(None, description="created_at < end"),
+    user_id: int | None = None,
+    admin=Depends(get_current_admin)
+):
+    statement = review_export_statement(start, end, user_id)
+    return StreamingResponse(
+        stream_rows(statement, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=reviews.{format}"}
+    )
+
+@router.get("/export/resumes")
+def export_resumes(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    start: datetime | None = Query(None, description="uploaded_at >= start"),
+    end: datetime | None = Query(None, description="uploaded_at < end"),
+    user_id: int | None = None,
+    include_content: bool = False,
+    admin=Depends(get_current_admin)
+):
+    statement = resume_export_statement(start, end, user_id, include_content)
+    return StreamingResponse(
+        stream_rows(statement, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=resumes.{format}"}
+    )
+
+@router.get("/search")
+def search_resumes(
+    q: str = Query(..., min_length=1, description='Terms are ANDed; supports OR, NOT / -term and "exact phrases"'),
+    page: PageParams = Depends(page_params),
+    session=Depends(get_session),
+    admin=Depends(get_current_admin)
+):
+    # Results are ranked, not ordered by id, so the cursor carries the rank offset
+    offset = decode_cursor(page.cursor) or 0
+    total, hits = search.search(session, q, offset, page.limit)
+    rows = {}
+    if hits:
+        statement = select(*RESUME_COLUMNS).where(Resume.id.in_([resume_id for resume_id, _ in hits]))
+        rows = {row.id: row._asdict() for row in session.exec(statement)}
+    items = [{**rows[resume_id], "score": score} for resume_id, score in hits if resume_id in rows]
+    next_cursor = encode_cursor(offset + len(hits)) if offset + len(hits) < total else None
+    return {**page_response(items, next_cursor), "total": total}
 
 @router.get("/reviews")
-def get_all_reviews(session=Depends(get_session), admin=Depends(get_current_admin)):
-    reviews = session.exec(select(Review)).all()
-    if not reviews:
+def get_all_reviews(page: PageParams = Depends(page_params), session=Depends(get_session), admin=Depends(get_current_admin)):
+    rows, next_cursor = paginate(session, select(*REVIEW_COLUMNS), Review.id, page)
+    if not rows and page.cursor is None:
         raise HTTPException(status_code=404, detail="No reviews found")
-    return [review.dict() for review in reviews]
+    return page_response([row._asdict() for row in rows], next_cursor)
 
 @router.get("/users")
-def get_all_users(session=Depends(get_session), admin=Depends(get_current_admin)):
-    users = session.exec(select(User)).all()
-    if not users:
+def get_all_users(page: PageParams = Depends(page_params), session=Depends(get_session), admin=Depends(get_current_admin)):
+    # Exclude the current admin; hashed_password is never selected
+    statement = select(*USER_COLUMNS).where(User.id != admin.id)
+    rows, next_cursor = paginate(session, statement, User.id, page)
+    if not rows and page.cursor is None:
         raise HTTPException(status_code=404, detail="No users found")
-    # Exclude the current admin and the password field
-    filtered_users = []
-    for user in users:
-        if user.id == admin.id:
-            continue  # Skip the current admin
-        user_dict = user.dict()
-        user_dict.pop("hashed_password", None)  # Remove password field if present
-        filtered_users.append(user_dict)
-    return filtered_users
+    return page_response([row._asdict() for row in rows], next_cursor)
 
 @router.get("/resumes")
-def get_all_resumes(session=Depends(get_session), admin=Depends(get_current_admin)):
-    resumes = session.exec(select(Resume)).all()
-    if not resumes:
+def get_all_resumes(page: PageParams = Depends(page_params), session=Depends(get_session), admin=Depends(get_current_admin)):
+    rows, next_cursor = paginate(session, select(*RESUME_COLUMNS), Resume.id, page)
+    if not rows and page.cursor is None:
         raise HTTPException(status_code=404, detail="No resumes found")
-    return [resume.dict() for resume in resumes]
+    return page_response([row._asdict() for row in rows], next_cursor)
 
 @router.get("/user/{user_id}/resumes")
-def get_user_resumes(user_id: int, session=Depends(get_session), admin=Depends(get_current_admin)):
-    resumes = session.exec(select(Resume).where(Resume.user_id == user_id)).all()
-    if not resumes:
+def get_user_resumes(user_id: int, page: PageParams = Depends(page_params), session=Depends(get_session), admin=Depends(get_current_admin)):
+    statement = select(*RESUME_COLUMNS).where(Resume.user_id == user_id)
+    rows, next_cursor = paginate(session, statement, Resume.id, page)
+    if not rows and page.cursor is None:
         raise HTTPException(status_code=404, detail="No resumes found for this user")
-    return [resume.dict() for resume in resumes]
+    return page_response([row._asdict() for row in rows], next_cursor)
 
 @router.get("/user/{user_id}/reviews")
-def get_user_reviews(user_id: int, session=Depends(get_session), admin=Depends(get_current_admin)):
-    reviews = session.exec(select(Review).where(Review.user_id == user_id)).all()
-    if not reviews:
+def get_user_reviews(user_id: int, page: PageParams = Depends(page_params), session=Depends(get_session), admin=Depends(get_current_admin)):
+    statement = select(*REVIEW_COLUMNS).where(Review.user_id == user_id)
+    rows, next_cursor = paginate(session, statement, Review.id, page)
+    if not rows and page.cursor is None:
         raise HTTPException(status_code=404, detail="No reviews found for this user")
-    return [review.dict() for review in reviews]
+    return page_response([row._asdict() for row in rows], next_cursor)
 
 @router.get("/resume/{resume_id}/reviews")
-def get_resume_reviews(resume_id: int, session=Depends(get_session), admin=Depends(get_current_admin)):
-    reviews = session.exec(select(Review).where(Review.resume_id == resume_id)).all()
-    if not reviews:
+def get_resume_reviews(resume_id: int, page: PageParams = Depends(page_params), session=Depends(get_session), admin=Depends(get_current_admin)):
+    statement = select(*REVIEW_COLUMNS).where(Review.resume_id == resume_id)
+    rows, next_cursor = paginate(session, statement, Review.id, page)
+    if not rows and page.cursor is None:
         raise HTTPException(status_code=404, detail="No reviews found for this resume")
-    return [review.dict() for review in reviews]
\ No newline at end of file
+    return page_response([row._asdict() for row in rows], next_cursor)
+
+@router.post("/rank-resumes")
+def rank_resumes(request: RankResumesRequest, session=Depends(get_session), admin=Depends(get_current_admin)):
+    if request.posting_id is not None:
+        posting = session.get(JobPosting, request.posting_id)
+        if not posting:
+            raise HTTPException(status_code=404, detail="Job posting not found")
+        job_description = posting.description
+    elif request.job_description:
+        job_description = request.job_description
+    else:
+        raise HTTPException(status_code=400, detail="Provide posting_id or job_description")
+    statement = select(Resume.id, Resume.user_id, Resume.filename, Resume.content)
+    if request.user_id is not None:
+        statement = statement.where(Resume.user_id == request.user_id)
+    resumes = session.exec(statement.order_by(Resume.id.desc()).limit(RANK_MAX_RESUMES)).all()
+    results = []
+    for hit in ranking.rank_resumes(job_description, [r.content for r in resumes], request.top_k):
+        resume = resumes[hit.pop("index")]
+        results.append({"resume_id": resume.id, "user_id": resume.user_id, "filename": resume.filename, **hit})
+    return {"candidates": len(resumes), "results": results}
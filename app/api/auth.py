@@ -1,37 +1,41 @@
 import os
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import IntegrityError
 from app.schemas.tokens import Token
-from app.crud.user import get_user_by_email
+from app.crud.user import create_user, get_user_by_email
 from app.auth.jwt import create_access_token
 from app.db.session import SessionDep
 from app.models.user import User
 from app.schemas.user import UserCreate, UserRead
-from app.utils.security import hash_password, verify_password
+from app.utils.security import hash_password_async, verify_password_async
 from fastapi import Request
 from typing import Set
 
 router = APIRouter()
 
 @router.post("/login", response_model=Token)
-def login(user: UserCreate, session: SessionDep):
-    db_user = get_user_by_email(session, user.email)
-    if not db_user or not verify_password(user.password, db_user.hashed_password):
+async def login(user: UserCreate, session: SessionDep):
+    db_user = await run_in_threadpool(get_user_by_email, session, user.email)
+    if not db_user or not await verify_password_async(user.password, db_user.hashed_password):
         raise HTTPException(status_code=403, detail="Invalid credentials")
     token = create_access_token({"sub": db_user.email, "id": db_user.id})
     return {"access_token": token, "token_type": "bearer"}
 
 @router.post("/register", response_model=UserRead, status_code=status.HTTP_201_CREATED)
-def register(user: UserCreate, session: SessionDep):
-    db_user = get_user_by_email(session, user.email)
+async def register(user: UserCreate, session: SessionDep):
+    db_user = await run_in_threadpool(get_user_by_email, session, user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
-    hashed_pw = hash_password(user.password)  
+    hashed_pw = await hash_password_async(user.password)
     admin_email = os.getenv("ADMIN_EMAIL")
     role = "admin" if user.email == admin_email else "user"
     new_user = User(email=user.email, hashed_password=hashed_pw, is_active=True, role=role)
-    session.add(new_user)
-    session.commit()
-    session.refresh(new_user)
+    try:
+        new_user = await run_in_threadpool(create_user, session, new_user)
+    except IntegrityError:
+        # Lost a race with a concurrent registration; the unique email index caught it
+        raise HTTPException(status_code=400, detail="Email already registered")
     return new_user
 
 
@@ -1,60 +1,146 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
-from app.services.jd_match import match_resume_with_job_desc
-from app.db.session import get_session
+from fastapi import APIRouter, Depends, HTTPException, Body, Query
+from fastapi.concurrency import run_in_threadpool
+from app.services import keywords, ranking, resume_sections
+from app.services.jd_match import match_payload, parse_match_result, suggest_improvements
+from app.services.llm_client import LLMBusyError, LLMError
+from app.db.session import run_db
+from app.crud.resume import get_user_resume
 from app.models.resume import Resume
-from app.models.job_desc import JobMatch
+from app.models.job_desc import JobMatch, JobPosting
+from app.schemas.job_desc import JobPostingCreate, JobPostingRead, RankJobsRequest
 from app.auth.dependencies import get_current_user
+from app.services.rate_limit import enforce_rate_limit
+from app.utils.pagination import PageParams, page_params, paginate, page_response, raw_page_response
+from sqlmodel import select
 import json
+import os
 from datetime import datetime
 
+JOB_MATCH_LIMIT_PER_DAY = int(os.getenv("JOB_MATCH_LIMIT_PER_DAY", "20"))
+
 router = APIRouter()
 
+def save_job_match(session, job_match: JobMatch) -> JobMatch:
+    session.add(job_match)
+    session.flush()
+    job_match.payload = match_payload(job_match.id, job_match.job_description, job_match.result, job_match.created_at)
+    session.commit()
+    session.refresh(job_match)
+    return job_match
+
+def _match_page(session, resume_id: int, user_id: int, page: PageParams):
+    statement = select(JobMatch.id, JobMatch.payload).where(
+        JobMatch.resume_id == resume_id,
+        JobMatch.user_id == user_id
+    )
+    matches, next_cursor = paginate(session, statement, JobMatch.id, page)
+    payloads = [m.payload for m in matches]
+    missing = [m.id for m in matches if m.payload is None]
+    if missing:
+        # Written by an older release after the 0008 backfill ran
+        rebuilt = {
+            m.id: match_payload(m.id, m.job_description, parse_match_result(m.ai_response), m.created_at)
+            for m in session.exec(select(JobMatch).where(JobMatch.id.in_(missing)))
+        }
+        payloads = [payload or rebuilt[m.id] for payload, m in zip(payloads, matches)]
+    return payloads, next_cursor
+
+def _create_posting(session, job_posting: JobPosting) -> JobPosting:
+    session.add(job_posting)
+    session.commit()
+    session.refresh(job_posting)
+    return job_posting
+
+def _ranking_inputs(session, resume_id: int, user_id: int, posting_ids):
+    content = session.exec(select(Resume.content).where(Resume.id == resume_id, Resume.user_id == user_id)).first()
+    if content is None:
+        return None, []
+    statement = select(JobPosting.id, JobPosting.title, JobPosting.description).where(JobPosting.user_id == user_id)
+    if posting_ids is not None:
+        statement = statement.where(JobPosting.id.in_(posting_ids))
+    return content, session.exec(statement).all()
+
 @router.post("/{resume_id}/match")
-def match_resume(
+async def match_resume(
     resume_id: int,
     job_description: str = Body(..., embed=True),
-    session=Depends(get_session),
+    suggestions: bool = Query(True, description="Also ask the AI for free-text suggestions"),
     user=Depends(get_current_user)
 ):
-    resume = session.get(Resume, resume_id)
-    if not resume or resume.user_id != user.id:
+    # No session is held across the model round-trip: one for the lookup, one for the save
+    resume = await run_db(get_user_resume, resume_id, user.id)
+    if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
-    ai_response = match_resume_with_job_desc(resume.content, job_description)
-    try:
-        result = json.loads(ai_response)
-        ai_response_to_store = json.dumps(result, ensure_ascii=False)
-    except Exception:
-        ai_response_to_store = ai_response
-        result = {"raw_feedback": ai_response}
+    await enforce_rate_limit("job_match", JOB_MATCH_LIMIT_PER_DAY, user.id)
+    # Keywords are computed locally, so an AI outage only costs the suggestions
+    result = keywords.match_keywords(resume.content, job_description)
+    result["suggestions"] = []
+    if suggestions:
+        # Within the token budget: the sections that matter most for matching, and a trimmed description
+        resume_text = resume_sections.resume_for_prompt(resume, priority=resume_sections.MATCH_PRIORITY)
+        job_text = resume_sections.job_description_for_prompt(job_description)
+        resume_sections.record_reduction("match", f"{resume.content}\n{job_description}", f"{resume_text}\n{job_text}")
+        try:
+            result["suggestions"] = await suggest_improvements(
+                resume_text, job_text,
+                result["matching_keywords"], result["missing_keywords"], user_id=user.id
+            )
+        except LLMBusyError as exc:
+            result["suggestions_error"] = str(exc)
+        except LLMError:
+            result["suggestions_error"] = "AI service unavailable"
     job_match = JobMatch(
         resume_id=resume.id,
         user_id=user.id,
         job_description=job_description,
-        ai_response=ai_response_to_store,
+        ai_response=json.dumps(result, ensure_ascii=False),
+        result=result,
         created_at=datetime.utcnow()
     )
-    session.add(job_match)
-    session.commit()
-    session.refresh(job_match)
+    job_match = await run_db(save_job_match, job_match)
     result["job_match_id"] = job_match.id
     return result
 
 @router.get("/{resume_id}/matches")
-def list_job_matches(
+async def list_job_matches(
     resume_id: int,
-    session=Depends(get_session),
+    page: PageParams = Depends(page_params),
     user=Depends(get_current_user)
 ):
-    matches = session.query(JobMatch).filter(
-        JobMatch.resume_id == resume_id,
-        JobMatch.user_id == user.id
-    ).all()
-    return [
-        {
-            "id": m.id,
-            "job_description": m.job_description,
-            "ai_response": json.loads(m.ai_response) if m.ai_response else {},
-            "created_at": m.created_at
-        }
-        for m in matches
-    ]
\ No newline at end of file
+    payloads, next_cursor = await run_db(_match_page, resume_id, user.id, page)
+    return raw_page_response(payloads, next_cursor)
+
+@router.post("/postings", response_model=JobPostingRead)
+async def create_job_posting(
+    posting: JobPostingCreate,
+    user=Depends(get_current_user)
+):
+    job_posting = JobPosting(user_id=user.id, title=posting.title, description=posting.description)
+    return await run_db(_create_posting, job_posting)
+
+@router.get("/postings")
+async def list_job_postings(
+    page: PageParams = Depends(page_params),
+    user=Depends(get_current_user)
+):
+    statement = select(JobPosting.id, JobPosting.title, JobPosting.created_at).where(JobPosting.user_id == user.id)
+    rows, next_cursor = await run_db(paginate, statement, JobPosting.id, page)
+    return page_response([row._asdict() for row in rows], next_cursor)
+
+@router.post("/{resume_id}/rank_jobs")
+async def rank_jobs(
+    resume_id: int,
+    request: RankJobsRequest,
+    user=Depends(get_current_user)
+):
+    # Scored locally with BM25; no AI call, so no rate limit
+    content, postings = await run_db(_ranking_inputs, resume_id, user.id, request.posting_ids)
+    if content is None:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    # Scoring is CPU work; keep it off the event loop
+    hits = await run_in_threadpool(ranking.rank_jobs, content, [p.description for p in postings], request.top_k)
+    results = []
+    for hit in hits:
+        posting = postings[hit.pop("index")]
+        results.append({"posting_id": posting.id, "title": posting.title, **hit})
+    return {"resume_id": resume_id, "candidates": len(postings), "results": results}
@@ -1,231 +1,320 @@
-import os
 import json
-from fastapi import APIRouter, BackgroundTasks, UploadFile, File, Depends, HTTPException, status
-from fastapi.responses import FileResponse
-from app.db.session import get_session
+import os
+from contextlib import aclosing
+from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from app.db.session import run_db
 from app.models.resume import Resume
 from app.auth.dependencies import get_current_user
 from app.models.review import Review
-from app.services.ai_review import review_resume_ai
-from app.services.parser import parse_resume_file
+from app.crud.review_job import enqueue_review_job, get_review_job
+from app.schemas.review_job import ReviewJobRead
+from app.crud.resume import get_resume_by_content_hash, get_user_resume
+from app.services.parser import ParseTimeout, cache_parsed_text, get_cached_text, parse_resume_file_async
+from app.utils.pagination import PageParams, page_params, paginate, page_response, raw_page_response
+from app.services import resume_sections, review_events, review_pdf, search
+from app.services.review_pipeline import review_fields, review_payload
+from app.services.rate_limit import enforce_rate_limit
+from app.utils.upload import read_upload
+from sqlmodel import select
 from datetime import datetime, timezone
 from app.schemas.resume import ResumeRead
 from datetime import datetime
-from app.db.session import engine
-from sqlmodel import Session
-from app.services.review_download import generate_review_pdf, ensure_list
-from app.models.resume import Resume
-from app.models.review import Review
-from app.db.session import engine
-from sqlmodel import Session
-import re, os
 
 
-REVIEW_LIMIT_PER_DAY = 5
+REVIEW_LIMIT_PER_DAY = int(os.getenv("REVIEW_LIMIT_PER_DAY", "5"))
+REVIEW_WAIT_MAX_SECONDS = float(os.getenv("REVIEW_WAIT_MAX_SECONDS", "60"))
+REVIEW_EVENTS_HEARTBEAT_SECONDS = float(os.getenv("REVIEW_EVENTS_HEARTBEAT_SECONDS", "15"))
 
-def get_today():
-    return datetime.now(timezone.utc).date()
+router = APIRouter()
 
-def get_review_count_today(session, user):
-    today = get_today()
-    return session.query(Review).filter(
-        Review.user_id == user.id,
-        Review.created_at >= today
-    ).count()
+# Routes take a session per database step through run_db, never for the whole request:
+# uploads, model calls and long-polls must not pin a pooled connection
 
-router = APIRouter()
+def _store_resume(session, resume: Resume, parent_resume_id: int | None):
+    """Store ``resume`` as a new version of ``parent_resume_id``, or of the user's latest file of the same name."""
+    statement = select(Resume.id, Resume.version).where(Resume.user_id == resume.user_id)
+    if parent_resume_id is not None:
+        parent = session.exec(statement.where(Resume.id == parent_resume_id)).first()
+        if parent is None:
+            return None
+    else:
+        parent = session.exec(
+            statement.where(Resume.filename == resume.filename).order_by(Resume.id.desc()).limit(1)
+        ).first()
+    if parent is not None:
+        resume.parent_resume_id = parent.id
+        resume.version = parent.version + 1
+    session.add(resume)
+    session.flush()
+    # Indexed in the same transaction, so a stored resume is always searchable
+    search.index_resume(session, resume.id, resume.content)
+    session.commit()
+    return resume
+
+def _owns_resume(session, resume_id: int, user_id: int) -> bool:
+    return session.exec(select(Resume.id).where(Resume.id == resume_id, Resume.user_id == user_id)).first() is not None
+
+def _version_pair(session, resume_id: int, user_id: int):
+    resume = get_user_resume(session, resume_id, user_id)
+    if resume is None or resume.parent_resume_id is None:
+        return resume, None
+    return resume, get_user_resume(session, resume.parent_resume_id, user_id)
+
+def _review_page(session, resume_id: int, user_id: int, page: PageParams):
+    statement = select(Review.id, Review.payload).where(
+        Review.resume_id == resume_id,
+        Review.user_id == user_id
+    )
+    reviews, next_cursor = paginate(session, statement, Review.id, page)
+    payloads = [r.payload for r in reviews]
+    missing = [r.id for r in reviews if r.payload is None]
+    if missing:
+        # Written by an older release after the 0008 backfill ran
+        rebuilt = {
+            r.id: review_payload(r.id, r.created_at, *review_fields(r))
+            for r in session.exec(select(Review).where(Review.id.in_(missing)))
+        }
+        payloads = [payload or rebuilt[r.id] for payload, r in zip(payloads, reviews)]
+    return payloads, next_cursor
+
+def _report_state(session, resume_id: int, user_id: int):
+    filename = session.exec(
+        select(Resume.filename).where(Resume.id == resume_id, Resume.user_id == user_id)
+    ).first()
+    if filename is None:
+        return None
+    reviews = session.exec(
+        select(Review.id, Review.created_at)
+        .where(Review.resume_id == resume_id, Review.user_id == user_id)
+        .order_by(Review.id)
+    ).all()
+    return filename, reviews
+
+def _review_download_row(session, resume_id: int, review_id: int, user_id: int):
+    return session.exec(
+        select(Review.id, Review.feedback, Review.score, Review.suggestions, Review.summary, Resume.filename)
+        .join(Resume, Resume.id == Review.resume_id)
+        .where(Review.id == review_id, Review.resume_id == resume_id, Review.user_id == user_id)
+    ).first()
 
 @router.post("/upload", status_code=status.HTTP_201_CREATED)
 async def upload_resume(
     file: UploadFile = File(...),
-    session=Depends(get_session),
+    parent_resume_id: int | None = Form(None, description="Resume this is a new version of; defaults to the latest upload with the same file name"),
     user=Depends(get_current_user)
 ):
-    allowed_types = [
-        "application/pdf",
-        "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-    ]
-    if file.content_type not in allowed_types:
-        raise HTTPException(status_code=400, detail="Invalid file type")
-
-    content = await file.read()
-    if not content:
-        raise HTTPException(status_code=400, detail="File is empty")
-    
-    parsed_text = parse_resume_file(file.filename, content)
+    # Type comes from the magic bytes and size is enforced while streaming, not from client headers
+    upload = await read_upload(file)
+    with upload:
+        sha256 = upload.sha256
+        # Re-uploads of the same CV are very common; reuse the text we already extracted
+        parsed_text = get_cached_text(file.filename, sha256)
+        if parsed_text is None:
+            existing = await run_db(get_resume_by_content_hash, sha256)
+            if existing is not None:
+                parsed_text = existing.content
+                cache_parsed_text(file.filename, sha256, parsed_text)
+        if parsed_text is None:
+            try:
+                parsed_text = await parse_resume_file_async(file.filename, upload.source(), sha256)
+            except ParseTimeout:
+                raise HTTPException(status_code=422, detail="Resume took too long to parse")
     if not parsed_text.strip():
         raise HTTPException(status_code=400, detail="Could not extract text from resume")
+    # Normalized and split once here; review and match prompts are built from the stored sections
+    sections = await run_in_threadpool(resume_sections.segment, parsed_text)
 
     resume = Resume(
         user_id=user.id,
         filename=file.filename,
         content=parsed_text,
-        uploaded_at=datetime.now(timezone.utc).isoformat()
+        content_hash=sha256,
+        sections=sections,
+        uploaded_at=datetime.now(timezone.utc)
     )
-    session.add(resume)
-    session.commit()
-    session.refresh(resume)
+    resume = await run_db(_store_resume, resume, parent_resume_id)
+    if resume is None:
+        raise HTTPException(status_code=404, detail="Parent resume not found")
 
-    return {"resume_id": resume.id}
+    return {"resume_id": resume.id, "version": resume.version, "parent_resume_id": resume.parent_resume_id}
 
 
 @router.get("/resumes")
 async def list_resumes(
-    session=Depends(get_session),
+    page: PageParams = Depends(page_params),
     user=Depends(get_current_user)
 ):
-    resumes = session.query(Resume).filter(Resume.user_id == user.id).all()
-    if not resumes:
+    # Only the listed columns are selected; resume content stays in the database
+    statement = select(
+        Resume.id, Resume.filename, Resume.uploaded_at, Resume.version, Resume.parent_resume_id
+    ).where(Resume.user_id == user.id)
+    resumes, next_cursor = await run_db(paginate, statement, Resume.id, page)
+    if not resumes and page.cursor is None:
         raise HTTPException(status_code=404, detail="No resumes found")
-    return [
+    return page_response([
         {
             "id": r.id,
             "filename": r.filename,
-            "uploaded_at": r.uploaded_at
+            "uploaded_at": r.uploaded_at,
+            "version": r.version,
+            "parent_resume_id": r.parent_resume_id
         }
         for r in resumes
-    ]
+    ], next_cursor)
+
+@router.get("/review-jobs/{job_id}", response_model=ReviewJobRead)
+async def get_review_job_status(
+    job_id: int,
+    user=Depends(get_current_user)
+):
+    job = await run_db(get_review_job, job_id, user.id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Review job not found")
+    return job
+
+def _job_state(job) -> dict:
+    return {"job_id": job.id, "resume_id": job.resume_id, "status": job.status, "last_error": job.last_error, "review": None}
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+@router.get("/review-jobs/{job_id}/wait")
+async def wait_for_review_job(
+    job_id: int,
+    timeout: float = Query(30, gt=0, le=REVIEW_WAIT_MAX_SECONDS),
+    user=Depends(get_current_user)
+):
+    """Long-poll: answers as soon as the job is done or failed, else with its state after ``timeout``."""
+    job = await run_db(get_review_job, job_id, user.id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Review job not found")
+    state = _job_state(job)
+    event = await review_events.wait(job_id, timeout)
+    return event if event is not None else state
+
+@router.get("/review-jobs/{job_id}/events")
+async def stream_review_job(
+    job_id: int,
+    request: Request,
+    user=Depends(get_current_user)
+):
+    """Server-Sent Events: the current state, then one ``done`` or ``failed`` event carrying the review."""
+    job = await run_db(get_review_job, job_id, user.id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Review job not found")
+    state = _job_state(job)
+
+    async def events():
+        yield _sse("status", state)
+        async with aclosing(review_events.follow(job_id, REVIEW_EVENTS_HEARTBEAT_SECONDS)) as updates:
+            async for event in updates:
+                if event is not None:
+                    yield _sse(event["status"], event)
+                    return
+                if await request.is_disconnected():
+                    return
+                yield ": keepalive\n\n"
+
+    return StreamingResponse(
+        events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.get("/{resume_id}", response_model=ResumeRead)
 async def get_resume(
     resume_id: int,
-    session=Depends(get_session),
     user=Depends(get_current_user)
 ):
-    resume = session.query(Resume).filter(Resume.id == resume_id, Resume.user_id == user.id).first()
+    resume = await run_db(get_user_resume, resume_id, user.id)
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
 
-    return {"id": resume.id, "filename": resume.filename, "content": resume.content, "uploaded_at": resume.uploaded_at}
+    return {"id": resume.id, "filename": resume.filename, "content": resume.content, "uploaded_at": resume.uploaded_at,
+            "version": resume.version, "parent_resume_id": resume.parent_resume_id}
+
+@router.get("/{resume_id}/diff")
+async def diff_resume_versions(
+    resume_id: int,
+    user=Depends(get_current_user)
+):
+    """Section-level changes of this version against the one it was uploaded as a new version of."""
+    resume, previous = await run_db(_version_pair, resume_id, user.id)
+    if not resume:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    if not previous:
+        raise HTTPException(status_code=404, detail="Resume has no earlier version")
+    return {
+        "resume_id": resume.id,
+        "version": resume.version,
+        "previous_resume_id": previous.id,
+        "previous_version": previous.version,
+        **resume_sections.diff_sections(resume_sections.sections_of(previous), resume_sections.sections_of(resume)),
+    }
 
 
 @router.get("/{resume_id}/review")
 async def review_resume(
     resume_id: int,
-    background_tasks: BackgroundTasks,
-    session=Depends(get_session),
     user=Depends(get_current_user)
 ):
-    today = get_today()
-    start = datetime.combine(today, datetime.min.time())
-    end = datetime.combine(today, datetime.max.time())
-    review_count = session.query(Review).filter(
-        Review.user_id == user.id,
-        Review.created_at >= start,
-        Review.created_at <= end
-    ).count()
-    if review_count >= REVIEW_LIMIT_PER_DAY:
-        raise HTTPException(status_code=429, detail="Daily review limit reached")
-
-    resume = session.query(Resume).filter(Resume.id == resume_id, Resume.user_id == user.id).first()
-    if not resume:
+    if not await run_db(_owns_resume, resume_id, user.id):
         raise HTTPException(status_code=404, detail="Resume not found")
-    
-    def clean_ai_json_response(ai_response: str):
-        # Remove code block markers if present
-        if ai_response.strip().startswith("```"):
-            ai_response = ai_response.strip().split('\n', 1)[1]
-            if ai_response.startswith("json"):
-                ai_response = ai_response[4:]
-            ai_response = ai_response.rsplit("```", 1)[0]
-        return ai_response.strip()
-
-    def save_and_format_review(resume_id: int, user_id: int):
-        
-
-        with Session(engine) as bg_session:
-            resume = bg_session.query(Resume).filter(Resume.id == resume_id, Resume.user_id == user_id).first()
-            if not resume:
-                return
-            ai_response = review_resume_ai(resume.content)
-            cleaned = clean_ai_json_response(ai_response)
-            try:
-                parsed = json.loads(cleaned)
-                
-                suggestions = parsed.get("suggestions", [])
-                suggestions = ensure_list(suggestions)
-                summary = parsed.get("summary", "")
-                if isinstance(summary, list):
-                    summary = " ".join(str(s) for s in summary)
-                score = parsed.get("score")
-                # Save normalized JSON
-                feedback_to_store = json.dumps({
-                    "score": score,
-                    "suggestions": suggestions,
-                    "summary": summary
-                }, ensure_ascii=False)
-            except Exception:
-                # fallback: store raw
-                score = None
-                suggestions = []
-                summary = ""
-                feedback_to_store = ai_response
-
-            review = Review(
-                resume_id=resume.id,
-                user_id=user_id,
-                feedback=feedback_to_store,
-                score=score
-            )
-            bg_session.add(review)
-            bg_session.commit()
-            bg_session.refresh(review)
-            # Generate PDF
-            pdf_dir = "generated_reviews"
-            os.makedirs(pdf_dir, exist_ok=True)
-            pdf_path = os.path.join(pdf_dir, f"{review.id}.pdf")
-            generate_review_pdf(resume, score, suggestions, summary, pdf_path)
-
-    background_tasks.add_task(save_and_format_review, resume.id, user.id)
-    return {"message": "Review is being processed in the background. Check /resume/{resume_id}/reviews for results."}
+    await enforce_rate_limit("review", REVIEW_LIMIT_PER_DAY, user.id)
+    job = await run_db(enqueue_review_job, resume_id, user.id)
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "message": f"Review is queued. Wait on /resume/review-jobs/{job.id}/wait or /resume/review-jobs/{job.id}/events for the result."
+    }
 
 @router.get("/{resume_id}/reviews")
 async def list_reviews(
     resume_id: int,
-    session=Depends(get_session),
+    page: PageParams = Depends(page_params),
     user=Depends(get_current_user)
 ):
-    reviews = session.query(Review).filter(
-        Review.resume_id == resume_id,
-        Review.user_id == user.id
-    ).all()
+    payloads, next_cursor = await run_db(_review_page, resume_id, user.id, page)
+    if not payloads and page.cursor is None:
+        raise HTTPException(status_code=404, detail="No reviews found for this resume")
+    return raw_page_response(payloads, next_cursor)
+
+@router.get("/{resume_id}/reviews/report")
+async def download_reviews_report(
+    resume_id: int,
+    request: Request,
+    user=Depends(get_current_user)
+):
+    state = await run_db(_report_state, resume_id, user.id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    filename, reviews = state
     if not reviews:
         raise HTTPException(status_code=404, detail="No reviews found for this resume")
-    result = []
-    for r in reviews:
-        try:
-            parsed = json.loads(r.feedback)
-            score = parsed.get("score")
-            suggestions = parsed.get("suggestions", [])
-            summary = parsed.get("summary", "")
-        except Exception:
-            score = r.score
-            suggestions = []
-            summary = ""
-        result.append({
-            "id": r.id,
-            "score": score,
-            "created_at": r.created_at,
-            "suggestions": suggestions,
-            "summary": summary
-        })
-    return result
+    etag = review_pdf.report_etag(resume_id, filename, reviews)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if review_pdf.etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    data = await review_pdf.get_report_pdf(resume_id, user.id, filename, etag)
+    headers["Content-Disposition"] = f'attachment; filename="resume_{resume_id}_reviews.pdf"'
+    return Response(content=data, media_type="application/pdf", headers=headers)
 
 @router.get("/{resume_id}/review/{review_id}/download")
 async def download_review_pdf(
     resume_id: int,
     review_id: int,
-    session=Depends(get_session),
+    request: Request,
     user=Depends(get_current_user)
 ):
-    review = session.query(Review).filter(
-        Review.id == review_id,
-        Review.resume_id == resume_id,
-        Review.user_id == user.id
-    ).first()
-    if not review:
+    row = await run_db(_review_download_row, resume_id, review_id, user.id)
+    if not row:
         raise HTTPException(status_code=404, detail="Review not found")
-    pdf_path = os.path.join("generated_reviews", f"{review_id}.pdf")
-    if not os.path.exists(pdf_path):
-        raise HTTPException(status_code=404, detail="PDF not generated yet")
-    return FileResponse(pdf_path, filename=f"resume_review_{review_id}.pdf", media_type="application/pdf")
\ No newline at end of file
+    etag = review_pdf.pdf_etag(row.id, row.filename, row.feedback, row.score)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if review_pdf.etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    # Rendered on first download and kept in the shared blob store, so any replica can serve it
+    data = await review_pdf.get_review_pdf(row)
+    headers["Content-Disposition"] = f'attachment; filename="resume_review_{review_id}.pdf"'
+    return Response(content=data, media_type="application/pdf", headers=headers)
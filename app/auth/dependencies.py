@@ -1,18 +1,44 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from app.db.session import get_session
+from sqlalchemy import event
+from app.db.session import run_db
 from app.models.resume import Resume
 from app.models.user import User
 from app.crud.user import get_user_by_email
+from app.services import metrics
+from app.utils.cache import LRUCache
 import os
 
 SECRET_KEY = os.getenv("SECRET_KEY", "supersecret")
 ALGORITHM = "HS256"
+# Resolved users are reused for this long; 0 disables the cache
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-def get_current_user(token: str = Depends(oauth2_scheme), session=Depends(get_session)):
+_principals = LRUCache(maxsize=PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL_SECONDS)
+
+def invalidate_principal(user_id: int):
+    _principals.pop(user_id)
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_changed_user(mapper, connection, target):
+    # Role or is_active changes must not be served from a stale cache entry in this process;
+    # other processes pick the change up when their entry's TTL runs out
+    invalidate_principal(target.id)
+
+def _load_principal(session, user_id, email):
+    user = session.get(User, user_id) if user_id is not None else get_user_by_email(session, email)
+    if user is None:
+        return None
+    # A detached copy without the password hash is what gets shared between requests
+    return User(id=user.id, email=user.email, hashed_password="", is_active=user.is_active, role=user.role)
+
+@metrics.timed("auth")
+async def get_current_user(token: str = Depends(oauth2_scheme)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -21,13 +47,21 @@ def get_current_user(token: str = Depends(oauth2_scheme), session=Depends(get_se
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
+        user_id = payload.get("id")
         if email is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    user = get_user_by_email(session, email)
+    user = _principals.get(user_id) if user_id is not None and PRINCIPAL_CACHE_TTL_SECONDS > 0 else None
     if user is None:
-        raise credentials_exception
+        # Primary-key lookup; tokens issued before "id" was added fall back to email
+        user = await run_db(_load_principal, user_id, email)
+        if user is None:
+            raise credentials_exception
+        if PRINCIPAL_CACHE_TTL_SECONDS > 0:
+            _principals.set(user.id, user)
+    if not user.is_active:
+        raise HTTPException(status_code=403, detail="Inactive user")
     return user
 
 def get_current_admin(user: User = Depends(get_current_user)):
@@ -35,3 +69,5 @@ def get_current_admin(user: User = Depends(get_current_user)):
         raise HTTPException(status_code=403, detail="Not enough permissions")
     return user
 
+def principal_cache_stats() -> dict:
+    return _principals.stats()
@@ -0,0 +1,10 @@
+from sqlmodel import Session, select
+from app.models.resume import Resume
+
+def get_resume_by_content_hash(session: Session, content_hash: str):
+    statement = select(Resume).where(Resume.content_hash == content_hash).limit(1)
+    return session.exec(statement).first()
+
+def get_user_resume(session: Session, resume_id: int, user_id: int):
+    statement = select(Resume).where(Resume.id == resume_id, Resume.user_id == user_id)
+    return session.exec(statement).first()
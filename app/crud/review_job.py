@@ -0,0 +1,145 @@
+from datetime import datetime, timedelta
+from sqlalchemy import and_, delete, or_, update
+from sqlmodel import Session, select
+from app.models.review import Review
+from app.models.review_job import ReviewJob
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+def enqueue_review_job(session: Session, resume_id: int, user_id: int, max_attempts: int = 3) -> ReviewJob:
+    job = ReviewJob(resume_id=resume_id, user_id=user_id, status=QUEUED, max_attempts=max_attempts)
+    session.add(job)
+    session.commit()
+    session.refresh(job)
+    return job
+
+def get_review_job(session: Session, job_id: int, user_id: int):
+    statement = select(ReviewJob).where(ReviewJob.id == job_id, ReviewJob.user_id == user_id)
+    return session.exec(statement).first()
+
+def claim_next_job(session: Session, worker_id: str, visibility_timeout: float):
+    """Atomically move the oldest claimable job to running and return it.
+
+    A job is claimable when it is queued and past its backoff, or when it is
+    running but its visibility timeout has expired (its worker died).
+    """
+    while True:
+        now = datetime.utcnow()
+        candidate = session.exec(
+            select(ReviewJob.id, ReviewJob.attempts)
+            .where(or_(
+                and_(ReviewJob.status == QUEUED, ReviewJob.available_at <= now),
+                and_(
+                    ReviewJob.status == RUNNING,
+                    ReviewJob.locked_until < now,
+                    ReviewJob.attempts < ReviewJob.max_attempts,
+                ),
+            ))
+            .order_by(ReviewJob.id)
+            .limit(1)
+        ).first()
+        if candidate is None:
+            return None
+        job_id, attempts = candidate
+        # The attempts check makes the claim a compare-and-swap, so two workers never win the same job
+        result = session.execute(
+            update(ReviewJob)
+            .where(ReviewJob.id == job_id, ReviewJob.attempts == attempts)
+            .values(
+                status=RUNNING,
+                attempts=attempts + 1,
+                worker_id=worker_id,
+                locked_until=now + timedelta(seconds=visibility_timeout),
+                updated_at=now,
+            )
+        )
+        session.commit()
+        if result.rowcount == 1:
+            return session.get(ReviewJob, job_id)
+
+def extend_job_lease(session: Session, job_id: int, worker_id: str, visibility_timeout: float):
+    now = datetime.utcnow()
+    session.execute(
+        update(ReviewJob)
+        .where(ReviewJob.id == job_id, ReviewJob.worker_id == worker_id, ReviewJob.status == RUNNING)
+        .values(locked_until=now + timedelta(seconds=visibility_timeout), updated_at=now)
+    )
+    session.commit()
+
+def complete_job(session: Session, job_id: int, worker_id: str, review_id: int) -> bool:
+    """Mark the job done; False when this worker no longer holds it (its lease expired and it was reclaimed)."""
+    result = session.execute(
+        update(ReviewJob)
+        .where(ReviewJob.id == job_id, ReviewJob.worker_id == worker_id, ReviewJob.status == RUNNING)
+        .values(status=DONE, review_id=review_id, locked_until=None, last_error=None, updated_at=datetime.utcnow())
+    )
+    session.commit()
+    return result.rowcount == 1
+
+def fail_job(session: Session, job_id: int, worker_id: str, error: str, backoff_seconds: float,
+             retry: bool = True) -> bool:
+    """Requeue with exponential backoff, or mark failed once attempts are used up.
+
+    Like ``complete_job``, only the worker that still holds the job can fail it.
+    """
+    job = session.get(ReviewJob, job_id)
+    if job is None:
+        return False
+    now = datetime.utcnow()
+    values = {"last_error": error[:1000], "locked_until": None, "updated_at": now}
+    if retry and job.attempts < job.max_attempts:
+        values.update(status=QUEUED, available_at=now + timedelta(seconds=backoff_seconds * 2 ** (job.attempts - 1)))
+    else:
+        values["status"] = FAILED
+    result = session.execute(
+        update(ReviewJob)
+        .where(
+            ReviewJob.id == job_id,
+            ReviewJob.worker_id == worker_id,
+            ReviewJob.status == RUNNING,
+            ReviewJob.attempts == job.attempts,
+        )
+        .values(**values)
+    )
+    session.commit()
+    return result.rowcount == 1
+
+def discard_review(session: Session, review_id: int):
+    """Delete a review written by a worker that lost its job, unless a job or a newer review already uses it."""
+    referenced = session.exec(select(Review.id).where(Review.base_review_id == review_id).limit(1)).first()
+    # complete_job may have committed before it raised; then the review is the job's result
+    if referenced is None:
+        referenced = session.exec(select(ReviewJob.id).where(ReviewJob.review_id == review_id).limit(1)).first()
+    if referenced is None:
+        session.execute(delete(Review).where(Review.id == review_id))
+        session.commit()
+
+def fail_abandoned_jobs(session: Session) -> int:
+    """Running jobs whose lease expired on their final attempt will never be reclaimed."""
+    now = datetime.utcnow()
+    result = session.execute(
+        update(ReviewJob)
+        .where(
+            ReviewJob.status == RUNNING,
+            ReviewJob.locked_until < now,
+            ReviewJob.attempts >= ReviewJob.max_attempts,
+        )
+        .values(status=FAILED, last_error="Visibility timeout expired", locked_until=None, updated_at=now)
+    )
+    session.commit()
+    return result.rowcount
+
+def get_finished_jobs(session: Session, job_ids: list[int]):
+    """Done or failed jobs among ``job_ids``, joined with their review, in one query."""
+    statement = (
+        select(
+            ReviewJob.id, ReviewJob.resume_id, ReviewJob.status, ReviewJob.review_id, ReviewJob.last_error,
+            Review.score, Review.feedback, Review.suggestions, Review.summary, Review.created_at,
+        )
+        .outerjoin(Review, Review.id == ReviewJob.review_id)
+        .where(ReviewJob.id.in_(job_ids), ReviewJob.status.in_((DONE, FAILED)))
+    )
+    return session.exec(statement).all()
@@ -3,4 +3,10 @@ from app.models.user import User
 
 def get_user_by_email(session: Session, email: str):
     statement = select(User).where(User.email == email)
-    return session.exec(statement).first()
\ No newline at end of file
+    return session.exec(statement).first()
+
+def create_user(session: Session, user: User) -> User:
+    session.add(user)
+    session.commit()
+    session.refresh(user)
+    return user
@@ -1,5 +1,25 @@
+import os
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
 from .session import engine
-from sqlmodel import SQLModel
+# Import every table so metadata is complete for whichever entry point (API or worker) runs first
+from app.models import user, resume, review, job_desc, llm_cache, review_job, stats, rate_limit, search  # noqa: F401
 
-def create_db_and_tables():
-    SQLModel.metadata.create_all(engine)
\ No newline at end of file
+ALEMBIC_INI = os.path.join(os.path.dirname(__file__), "..", "..", "alembic.ini")
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "migrations")
+# Schema that the old create_all() bootstrap produced; databases from that era are adopted here
+BASELINE_REVISION = "0001"
+
+def get_alembic_config() -> Config:
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("script_location", MIGRATIONS_DIR)
+    config.attributes["configure_logger"] = False
+    return config
+
+def run_migrations():
+    config = get_alembic_config()
+    tables = inspect(engine).get_table_names()
+    if "alembic_version" not in tables and "users" in tables:
+        command.stamp(config, BASELINE_REVISION)
+    command.upgrade(config, "head")
@@ -0,0 +1,60 @@
+"""LLM response cache, review job queue and resume content hashes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases bootstrapped with create_all() may already have some of these
+    inspector = sa.inspect(op.get_bind())
+    tables = inspector.get_table_names()
+
+    if "content_hash" not in {c["name"] for c in inspector.get_columns("resumes")}:
+        with op.batch_alter_table("resumes") as batch:
+            batch.add_column(sa.Column("content_hash", sa.String(length=64), nullable=True))
+    if "ix_resumes_content_hash" not in {i["name"] for i in inspector.get_indexes("resumes")}:
+        op.create_index("ix_resumes_content_hash", "resumes", ["content_hash"])
+
+    if "llm_cache" not in tables:
+        op.create_table(
+            "llm_cache",
+            sa.Column("key", sa.String(length=64), primary_key=True),
+            sa.Column("model", sa.String(), nullable=False),
+            sa.Column("response", sa.String(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+        )
+
+    if "review_jobs" not in tables:
+        op.create_table(
+            "review_jobs",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("resume_id", sa.Integer(), sa.ForeignKey("resumes.id"), nullable=False),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("status", sa.String(), nullable=False),
+            sa.Column("attempts", sa.Integer(), nullable=False),
+            sa.Column("max_attempts", sa.Integer(), nullable=False),
+            sa.Column("review_id", sa.Integer(), sa.ForeignKey("reviews.id"), nullable=True),
+            sa.Column("last_error", sa.String(), nullable=True),
+            sa.Column("worker_id", sa.String(), nullable=True),
+            sa.Column("available_at", sa.DateTime(), nullable=False),
+            sa.Column("locked_until", sa.DateTime(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+        )
+
+
+def downgrade():
+    op.drop_table("review_jobs")
+    op.drop_table("llm_cache")
+    op.drop_index("ix_resumes_content_hash", table_name="resumes")
+    with op.batch_alter_table("resumes") as batch:
+        batch.drop_column("content_hash")
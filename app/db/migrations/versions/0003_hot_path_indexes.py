@@ -0,0 +1,36 @@
+"""Indexes for the per-user lookups on every hot endpoint
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # get_current_user / login / register; fails if duplicate emails already exist, dedupe those first
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+    # /resume/resumes
+    op.create_index("ix_resumes_user_id", "resumes", ["user_id"])
+    # Daily review limit: range over created_at for one user
+    op.create_index("ix_reviews_user_id_created_at", "reviews", ["user_id", "created_at"])
+    # /resume/{id}/reviews
+    op.create_index("ix_reviews_resume_id_user_id", "reviews", ["resume_id", "user_id"])
+    # /job_match/{id}/matches
+    op.create_index("ix_job_matches_resume_id_user_id", "job_matches", ["resume_id", "user_id"])
+    # Worker claim query
+    op.create_index("ix_review_jobs_status_available_at", "review_jobs", ["status", "available_at"])
+
+
+def downgrade():
+    op.drop_index("ix_review_jobs_status_available_at", table_name="review_jobs")
+    op.drop_index("ix_job_matches_resume_id_user_id", table_name="job_matches")
+    op.drop_index("ix_reviews_resume_id_user_id", table_name="reviews")
+    op.drop_index("ix_reviews_user_id_created_at", table_name="reviews")
+    op.drop_index("ix_resumes_user_id", table_name="resumes")
+    op.drop_index("ix_users_email", table_name="users")
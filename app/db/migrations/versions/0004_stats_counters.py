@@ -0,0 +1,51 @@
+"""Incrementally maintained stats counters and per-day series
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "stat_counters",
+        sa.Column("name", sa.String(), primary_key=True),
+        sa.Column("value", sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        "daily_stats",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("metric", sa.String(), primary_key=True),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("total", sa.Float(), nullable=False),
+    )
+    # Backfill so the counters are right from the first request; later drift is fixed by reconciliation
+    for name, table in [("users", "users"), ("resumes", "resumes"), ("reviews", "reviews"), ("job_matches", "job_matches")]:
+        op.execute(f"INSERT INTO stat_counters (name, value) SELECT '{name}', count(*) FROM {table}")
+    for metric, table, column in [
+        ("resumes", "resumes", "uploaded_at"),
+        ("reviews", "reviews", "created_at"),
+        ("job_matches", "job_matches", "created_at"),
+    ]:
+        op.execute(
+            f"INSERT INTO daily_stats (day, metric, count, total) "
+            f"SELECT date({column}), '{metric}', count(*), 0 FROM {table} "
+            f"WHERE {column} IS NOT NULL GROUP BY date({column})"
+        )
+    op.execute(
+        "INSERT INTO daily_stats (day, metric, count, total) "
+        "SELECT date(created_at), 'review_scores', count(*), sum(score) FROM reviews "
+        "WHERE score IS NOT NULL GROUP BY date(created_at)"
+    )
+
+
+def downgrade():
+    op.drop_table("daily_stats")
+    op.drop_table("stat_counters")
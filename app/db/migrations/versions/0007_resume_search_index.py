@@ -0,0 +1,102 @@
+"""Inverted index for resume search
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+import re
+from collections import defaultdict
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 500
+
+# The analyzer as of this revision (app.services.search.analyze), frozen so the
+# migration keeps producing the same postings when the app's tokenizer changes
+_TOKEN = re.compile(r"[a-z0-9.#+\-]*[a-z0-9#+]|[.#]?[a-z0-9]+", re.IGNORECASE)
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or our that the their "
+    "this to was we will with you your who what which about into over under using used "
+    "experience years year work working team teams role ability strong knowledge".split()
+)
+
+resumes = sa.table("resumes", sa.column("id", sa.Integer()), sa.column("content", sa.String()))
+search_documents = sa.table("search_documents", sa.column("resume_id", sa.Integer()), sa.column("length", sa.Integer()))
+search_postings = sa.table(
+    "search_postings",
+    sa.column("term", sa.String()),
+    sa.column("resume_id", sa.Integer()),
+    sa.column("tf", sa.Integer()),
+    sa.column("positions", sa.String()),
+)
+
+
+def _fold(token: str) -> str:
+    token = token.lower()
+    if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+def _postings(text: str) -> dict:
+    """term -> token offsets; offsets count stopwords so phrases keep their gaps."""
+    positions = defaultdict(list)
+    for offset, token in enumerate(_TOKEN.findall((text or "").replace("/", " "))):
+        term = _fold(token)
+        if term not in _STOPWORDS:
+            positions[term].append(offset)
+    return positions
+
+
+def _index_existing(connection):
+    """Index every resume in id order, one batch per round trip."""
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(resumes.c.id, resumes.c.content).where(resumes.c.id > last_id).order_by(resumes.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        documents, postings = [], []
+        for row in rows:
+            positions = _postings(row.content)
+            documents.append({"resume_id": row.id, "length": sum(map(len, positions.values()))})
+            postings.extend(
+                {"term": term, "resume_id": row.id, "tf": len(offsets), "positions": " ".join(map(str, offsets))}
+                for term, offsets in positions.items()
+            )
+        connection.execute(search_documents.insert(), documents)
+        if postings:
+            connection.execute(search_postings.insert(), postings)
+        last_id = rows[-1].id
+
+
+def upgrade():
+    op.create_table(
+        "search_documents",
+        sa.Column("resume_id", sa.Integer(), sa.ForeignKey("resumes.id"), primary_key=True),
+        sa.Column("length", sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        "search_postings",
+        sa.Column("term", sa.String(), primary_key=True),
+        sa.Column("resume_id", sa.Integer(), sa.ForeignKey("resumes.id"), primary_key=True),
+        sa.Column("tf", sa.Integer(), nullable=False),
+        sa.Column("positions", sa.String(), nullable=False),
+    )
+    op.create_index("ix_search_postings_resume_id", "search_postings", ["resume_id"])
+    # Index existing resumes with the analyzer the app used at this revision, so old and new uploads rank alike
+    _index_existing(op.get_bind())
+
+
+def downgrade():
+    op.drop_index("ix_search_postings_resume_id", table_name="search_postings")
+    op.drop_table("search_postings")
+    op.drop_table("search_documents")
@@ -0,0 +1,145 @@
+"""Structured review feedback and job-match results with pre-serialized list payloads
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+"""
+import json
+import re
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+JSON = sa.JSON().with_variant(postgresql.JSONB(), "postgresql")
+
+reviews = sa.table(
+    "reviews",
+    sa.column("id", sa.Integer()),
+    sa.column("feedback", sa.String()),
+    sa.column("score", sa.Integer()),
+    sa.column("created_at", sa.DateTime()),
+    sa.column("suggestions", JSON),
+    sa.column("summary", sa.String()),
+    sa.column("payload", sa.String()),
+)
+job_matches = sa.table(
+    "job_matches",
+    sa.column("id", sa.Integer()),
+    sa.column("job_description", sa.String()),
+    sa.column("ai_response", sa.String()),
+    sa.column("created_at", sa.DateTime()),
+    sa.column("result", JSON),
+    sa.column("payload", sa.String()),
+)
+
+
+def _backfill(connection, table, columns, convert):
+    """Rewrite every row in id order, one batch per round trip."""
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(*(table.c[name] for name in columns)).where(table.c.id > last_id).order_by(table.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        connection.execute(
+            table.update().where(table.c.id == sa.bindparam("row_id")),
+            [{"row_id": row.id, **convert(row)} for row in rows],
+        )
+        last_id = rows[-1].id
+
+
+# Parsing and serialization as of this revision, copied rather than imported so later changes to
+# the app cannot change what this migration writes
+
+
+def _ensure_list(obj):
+    if isinstance(obj, list):
+        return obj
+    if isinstance(obj, str):
+        points = re.split(r"\n\d+\.\s*", "\n" + obj.strip())
+        points = [p.strip() for p in points if p.strip()]
+        if len(points) > 1:
+            return points
+        return [s.strip() for s in re.split(r"[\n;]", obj) if s.strip()]
+    return []
+
+
+def _summary_text(summary) -> str:
+    if summary is None:
+        return ""
+    if isinstance(summary, list):
+        return " ".join(str(s) for s in summary)
+    return summary if isinstance(summary, str) else json.dumps(summary, ensure_ascii=False)
+
+
+def _parse_feedback(feedback: str, score=None):
+    try:
+        parsed = json.loads(feedback)
+        return parsed.get("score"), _ensure_list(parsed.get("suggestions", [])), _summary_text(parsed.get("summary", ""))
+    except Exception:
+        return score, [], ""
+
+
+def _review(row):
+    # Same parsing the read path used to do on every request, done once
+    score, suggestions, summary = _parse_feedback(row.feedback, row.score)
+    return {
+        "suggestions": suggestions,
+        "summary": summary,
+        "payload": json.dumps({
+            "id": row.id,
+            "score": score,
+            "created_at": row.created_at.isoformat(),
+            "suggestions": suggestions,
+            "summary": summary,
+        }, ensure_ascii=False),
+    }
+
+
+def _job_match(row):
+    try:
+        result = json.loads(row.ai_response) if row.ai_response else {}
+    except ValueError:
+        result = {}
+    if not isinstance(result, dict):
+        result = {}
+    return {
+        "result": result,
+        "payload": json.dumps({
+            "id": row.id,
+            "job_description": row.job_description,
+            "ai_response": result,
+            "created_at": row.created_at.isoformat(),
+        }, ensure_ascii=False),
+    }
+
+
+def upgrade():
+    op.add_column("reviews", sa.Column("suggestions", JSON, nullable=True))
+    op.add_column("reviews", sa.Column("summary", sa.String(), nullable=True))
+    op.add_column("reviews", sa.Column("payload", sa.String(), nullable=True))
+    op.add_column("job_matches", sa.Column("result", JSON, nullable=True))
+    op.add_column("job_matches", sa.Column("payload", sa.String(), nullable=True))
+    connection = op.get_bind()
+    _backfill(connection, reviews, ["id", "feedback", "score", "created_at"], _review)
+    _backfill(connection, job_matches, ["id", "job_description", "ai_response", "created_at"], _job_match)
+
+
+def downgrade():
+    with op.batch_alter_table("job_matches") as batch:
+        batch.drop_column("payload")
+        batch.drop_column("result")
+    with op.batch_alter_table("reviews") as batch:
+        batch.drop_column("payload")
+        batch.drop_column("summary")
+        batch.drop_column("suggestions")
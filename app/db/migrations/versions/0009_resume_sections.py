@@ -0,0 +1,162 @@
+"""Normalized resume sections for token-budgeted prompts
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18
+"""
+import re
+import unicodedata
+from collections import Counter
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+# Resumes are larger than reviews; keep each round trip small
+BACKFILL_BATCH_SIZE = 200
+
+JSON = sa.JSON().with_variant(postgresql.JSONB(), "postgresql")
+
+resumes = sa.table(
+    "resumes",
+    sa.column("id", sa.Integer()),
+    sa.column("content", sa.String()),
+    sa.column("sections", JSON),
+)
+
+# Segmentation as of this revision (app.services.resume_sections.segment), frozen so the
+# backfill keeps producing the same sections when the app's segmenter changes
+_REPEATED_LINE_THRESHOLD = 2
+_PAGE_EDGE_LINES = 2
+_MAX_HEADING_LENGTH = 50
+
+_SECTION_HEADINGS = {
+    "summary": ("summary", "professional summary", "profile", "professional profile", "about me", "about",
+                "objective", "career objective", "overview"),
+    "experience": ("experience", "work experience", "professional experience", "employment", "employment history",
+                   "work history", "career history", "relevant experience"),
+    "education": ("education", "academic background", "education and training", "qualifications"),
+    "skills": ("skills", "technical skills", "core skills", "key skills", "skills and tools", "competencies",
+               "core competencies", "technologies", "tech stack", "tools"),
+    "projects": ("projects", "personal projects", "selected projects", "side projects", "open source"),
+    "certifications": ("certifications", "certificates", "licenses and certifications", "courses", "training"),
+    "awards": ("awards", "honors", "honors and awards", "achievements"),
+    "publications": ("publications", "talks", "publications and talks"),
+    "languages": ("languages",),
+    "interests": ("interests", "hobbies", "activities", "volunteering", "volunteer experience"),
+}
+_HEADINGS = {alias: name for name, aliases in _SECTION_HEADINGS.items() for alias in aliases}
+
+_TOKEN_PIECE = re.compile(r"\w+|[^\w\s]+|\n+")
+_SPACES = re.compile(r"[ \t\u00a0\u2000-\u200b\u3000]+")
+_CONTROL = re.compile(r"[\x00-\x08\x0b\x0e-\x1f\x7f]")
+_BULLET = re.compile(r"^[\u2022\u25aa\u25cf\u25e6\u2023\u2043\u25a0\uf0b7*\u00b7]\s*")
+_PAGE_NUMBER = re.compile(r"(page\s*)?\d{1,3}(\s*(of|/)\s*\d{1,3})?|[-–]\s*\d{1,3}\s*[-–]", re.IGNORECASE)
+
+
+def _estimate_tokens(text: str) -> int:
+    return sum((len(piece) + 3) // 4 for piece in _TOKEN_PIECE.findall(text))
+
+
+def _clean_lines(page: str) -> list[str]:
+    lines = []
+    for line in re.split(r"\r\n|[\r\n\v]", page):
+        line = _SPACES.sub(" ", line).strip()
+        if not line or _PAGE_NUMBER.fullmatch(line):
+            continue
+        lines.append(_BULLET.sub("- ", line))
+    return lines
+
+
+def _edges(lines: list[str]) -> list[tuple[int, str]]:
+    """``(index, "top" or "bottom")`` for the lines where a header or footer would sit."""
+    count = min(_PAGE_EDGE_LINES, len(lines))
+    return [(i, "top") for i in range(count)] + [(len(lines) - 1 - i, "bottom") for i in range(count)]
+
+
+def _normalize_text(text: str) -> list[str]:
+    """Non-empty, whitespace-collapsed lines, without page numbers and repeated page headers or footers."""
+    # NFKC also folds ligatures (fi, fl) and full-width characters from PDF fonts
+    text = _CONTROL.sub("", unicodedata.normalize("NFKC", text))
+    pages = [_clean_lines(page) for page in text.split("\f")]
+    pages = [lines for lines in pages if lines]
+    # A different first page (no header on it) is common, so one page may miss the line
+    threshold = max(_REPEATED_LINE_THRESHOLD, len(pages) - 1)
+    counts = Counter()
+    for lines in pages:
+        counts.update({(edge, lines[i]) for i, edge in _edges(lines)})
+    repeated = [{i for i, edge in _edges(lines) if counts[edge, lines[i]] >= threshold} for lines in pages]
+    seen = set()
+    kept = []
+    for lines, edges in zip(pages, repeated):
+        for i, line in enumerate(lines):
+            if i in edges and _heading(line) is None:
+                if line in seen:
+                    continue
+                seen.add(line)
+            kept.append(line)
+    return kept
+
+
+def _heading(line: str):
+    if len(line) > _MAX_HEADING_LENGTH:
+        return None
+    key = re.sub(r"[^a-z ]+", " ", line.lower().replace("&", " and "))
+    return _HEADINGS.get(" ".join(key.split()))
+
+
+def _split_sections(lines: list[str]) -> list[dict]:
+    sections = []
+    current = {"name": "header", "title": "", "lines": []}
+    for line in lines:
+        name = _heading(line)
+        if name is not None:
+            if current["lines"]:
+                sections.append(current)
+            current = {"name": name, "title": line.rstrip(":"), "lines": []}
+        else:
+            current["lines"].append(line)
+    if current["lines"]:
+        sections.append(current)
+    return [_section(s["name"], s["title"], "\n".join(s["lines"])) for s in sections]
+
+
+def _render(title: str, text: str) -> str:
+    return f"{title}\n{text}" if title else text
+
+
+def _section(name: str, title: str, text: str) -> dict:
+    return {"name": name, "title": title, "text": text, "tokens": _estimate_tokens(_render(title, text))}
+
+
+def _segment(text: str) -> list[dict]:
+    return _split_sections(_normalize_text(text))
+
+
+def upgrade():
+    op.add_column("resumes", sa.Column("sections", JSON, nullable=True))
+    # Segmented the way new uploads were at this revision
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(resumes.c.id, resumes.c.content).where(resumes.c.id > last_id).order_by(resumes.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        connection.execute(
+            resumes.update().where(resumes.c.id == sa.bindparam("row_id")),
+            [{"row_id": row.id, "sections": _segment(row.content)} for row in rows],
+        )
+        last_id = rows[-1].id
+
+
+def downgrade():
+    with op.batch_alter_table("resumes") as batch:
+        batch.drop_column("sections")
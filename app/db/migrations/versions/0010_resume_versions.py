@@ -0,0 +1,51 @@
+"""Resume versions and per-section review feedback
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+JSON = sa.JSON().with_variant(postgresql.JSONB(), "postgresql")
+
+
+def upgrade():
+    with op.batch_alter_table("resumes") as batch:
+        batch.add_column(sa.Column("parent_resume_id", sa.Integer(), nullable=True))
+        batch.add_column(sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+        batch.create_foreign_key("fk_resumes_parent_resume_id", "resumes", ["parent_resume_id"], ["id"])
+        batch.create_index("ix_resumes_parent_resume_id", ["parent_resume_id"])
+    with op.batch_alter_table("reviews") as batch:
+        batch.add_column(sa.Column("section_feedback", JSON, nullable=True))
+        batch.add_column(sa.Column("base_review_id", sa.Integer(), nullable=True))
+        batch.create_foreign_key("fk_reviews_base_review_id", "reviews", ["base_review_id"], ["id"])
+    # Earlier uploads of the same file name by the same user become its earlier versions, in one statement
+    op.execute("""
+        UPDATE resumes SET version = v.version, parent_resume_id = v.parent_id
+        FROM (
+            SELECT id,
+                   ROW_NUMBER() OVER (PARTITION BY user_id, filename ORDER BY id) AS version,
+                   LAG(id) OVER (PARTITION BY user_id, filename ORDER BY id) AS parent_id
+            FROM resumes
+        ) AS v
+        WHERE resumes.id = v.id AND v.version > 1
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table("reviews") as batch:
+        batch.drop_constraint("fk_reviews_base_review_id", type_="foreignkey")
+        batch.drop_column("base_review_id")
+        batch.drop_column("section_feedback")
+    with op.batch_alter_table("resumes") as batch:
+        batch.drop_index("ix_resumes_parent_resume_id")
+        batch.drop_constraint("fk_resumes_parent_resume_id", type_="foreignkey")
+        batch.drop_column("version")
+        batch.drop_column("parent_resume_id")
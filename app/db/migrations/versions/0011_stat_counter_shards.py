@@ -0,0 +1,64 @@
+"""Shard the stats counter rows
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+# The primary keys gain a column; the tables are small, so they are rebuilt rather than altered.
+# Named constraints, because on PostgreSQL the renamed tables keep their old ones until dropped.
+
+
+def _shard_column(sharded: bool) -> list:
+    return [sa.Column("shard", sa.Integer(), nullable=False, server_default="0")] if sharded else []
+
+
+def _rebuild(sharded: bool):
+    op.rename_table("stat_counters", "stat_counters_old")
+    op.rename_table("daily_stats", "daily_stats_old")
+    suffix = "_shard" if sharded else ""
+    op.create_table(
+        "stat_counters",
+        sa.Column("name", sa.String(), nullable=False),
+        *_shard_column(sharded),
+        sa.Column("value", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("name", *(["shard"] if sharded else []), name=f"pk_stat_counters{suffix}"),
+    )
+    op.create_table(
+        "daily_stats",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("metric", sa.String(), nullable=False),
+        *_shard_column(sharded),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("total", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("day", "metric", *(["shard"] if sharded else []), name=f"pk_daily_stats{suffix}"),
+    )
+    if sharded:
+        op.execute("INSERT INTO stat_counters (name, shard, value) SELECT name, 0, value FROM stat_counters_old")
+        op.execute(
+            "INSERT INTO daily_stats (day, metric, shard, count, total) "
+            "SELECT day, metric, 0, count, total FROM daily_stats_old"
+        )
+    else:
+        op.execute("INSERT INTO stat_counters (name, value) SELECT name, sum(value) FROM stat_counters_old GROUP BY name")
+        op.execute(
+            "INSERT INTO daily_stats (day, metric, count, total) "
+            "SELECT day, metric, sum(count), sum(total) FROM daily_stats_old GROUP BY day, metric"
+        )
+    op.drop_table("stat_counters_old")
+    op.drop_table("daily_stats_old")
+
+
+def upgrade():
+    _rebuild(sharded=True)
+
+
+def downgrade():
+    _rebuild(sharded=False)
@@ -1,16 +1,85 @@
 from fastapi import Depends
-from sqlmodel import SQLModel, create_engine, Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.engine import make_url
+from sqlmodel import create_engine, Session
 import os
 from dotenv import load_dotenv
 from typing import Annotated
 
 load_dotenv()
+
 DATABASE_URL = os.getenv("SQL_MODEL_DATABASE_URL")
+# Statement logging floods stdout under load; turn it on only to debug queries
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() in ("1", "true", "yes")
+# Routes that go through run_db use an async driver (asyncpg / aiosqlite) instead of the threadpool
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes")
+# Per engine and per process; the threadpool (40 threads) queues on the pool beyond size + overflow
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Checks a connection before handing it out, so a database restart or failover costs a reconnect, not a 500
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+# Seconds; keep below the server's or proxy's idle timeout (PgBouncer, cloud load balancers)
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+
+def pool_options(url: str) -> dict:
+    options = {"pool_pre_ping": DB_POOL_PRE_PING, "pool_recycle": DB_POOL_RECYCLE}
+    # SQLite picks its own pool class per database kind; sizes only apply to server databases
+    if make_url(url).get_backend_name() != "sqlite":
+        options.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT)
+    return options
+
+
+def async_database_url(url: str) -> str:
+    """``postgresql://...`` -> ``postgresql+asyncpg://...``; the sync URL stays the single setting."""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f"DB_ASYNC is not supported for {backend} databases")
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def create_async_db_engine(url: str):
+    from sqlalchemy.ext.asyncio import create_async_engine
+    try:
+        return create_async_engine(async_database_url(url), echo=DB_ECHO, **pool_options(url))
+    except ImportError as exc:
+        raise RuntimeError(
+            "DB_ASYNC needs the async driver for this database: pip install asyncpg (PostgreSQL) "
+            "or aiosqlite (SQLite)"
+        ) from exc
+
+
+engine = create_engine(DATABASE_URL, echo=DB_ECHO, **pool_options(DATABASE_URL))
+async_engine = create_async_db_engine(DATABASE_URL) if DB_ASYNC else None
 
-engine = create_engine(DATABASE_URL, echo=True)
 
 def get_session():
     with Session(engine) as session:
         yield session
-        
-SessionDep = Annotated[Session, Depends(get_session)]
\ No newline at end of file
+
+SessionDep = Annotated[Session, Depends(get_session)]
+
+
+def _run_in_session(fn, *args):
+    with Session(engine, expire_on_commit=False) as session:
+        return fn(session, *args)
+
+
+async def run_db(fn, *args):
+    """Run ``fn(session, *args)`` in a session that lives only for that call.
+
+    The connection goes back to the pool as soon as ``fn`` returns, not when
+    the request ends. ``fn`` is plain sync code; with DB_ASYNC it runs against
+    the async engine without a thread, otherwise in the threadpool. Objects it
+    returns are detached with their loaded attributes, so return what the
+    caller needs rather than relationships to load later.
+    """
+    if async_engine is None:
+        return await run_in_threadpool(_run_in_session, fn, *args)
+    from sqlmodel.ext.asyncio.session import AsyncSession
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        return await session.run_sync(fn, *args)
@@ -1,21 +1,59 @@
+import asyncio
+import os
 from fastapi import FastAPI
-from app.db.base import create_db_and_tables
+from fastapi.responses import PlainTextResponse
+from app.db.base import run_migrations
 from contextlib import asynccontextmanager
 
+from app import worker
 from app.api import auth, resume, admin, job_match
+from app.db.session import async_engine, engine
+from app.services import llm_client, metrics, parser, profiler, review_events, stats
+from app.utils.upload import UploadSizeLimitMiddleware
+
+REVIEW_WORKER_EMBEDDED = os.getenv("REVIEW_WORKER_EMBEDDED", "false").lower() in ("1", "true", "yes")
+REVIEW_WORKER_SHUTDOWN_TIMEOUT = float(os.getenv("REVIEW_WORKER_SHUTDOWN_TIMEOUT", "30"))
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    create_db_and_tables()
+    run_migrations()
+    reconcile_task = asyncio.create_task(stats.reconcile_periodically())
+    watch_task = asyncio.create_task(review_events.watch())
+    worker_stop = asyncio.Event()
+    worker_task = asyncio.create_task(worker.run_pool(stop=worker_stop)) if REVIEW_WORKER_EMBEDDED else None
     yield
+    if worker_task is not None:
+        worker_stop.set()
+        try:
+            # Let running reviews finish; unfinished ones are re-claimed after their lease expires
+            await asyncio.wait_for(worker_task, REVIEW_WORKER_SHUTDOWN_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass
+    watch_task.cancel()
+    reconcile_task.cancel()
+    await llm_client.aclose()
+    parser.shutdown_executor()
+    if async_engine is not None:
+        await async_engine.dispose()
+
+metrics.instrument_engine(engine)
+if async_engine is not None:
+    metrics.instrument_engine(async_engine.sync_engine)
 
 app = FastAPI(lifespan=lifespan)
+app.add_middleware(UploadSizeLimitMiddleware, paths=["/resume/upload"])
+# Added last, so it is outermost and times everything else, including rejected uploads
+app.add_middleware(metrics.MetricsMiddleware, profiler=profiler.from_env())
 
 app.include_router(auth.router, prefix="/auth" , tags=["auth"])
 app.include_router(resume.router, prefix="/resume" , tags=["resume"])
 app.include_router(admin.router, prefix="/admin", tags=["admin"])
 app.include_router(job_match.router, prefix="/job_match", tags=["job-match"])
 
+@app.get("/metrics", include_in_schema=False)
+def read_metrics():
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the AI Resume Reviewer API"}
@@ -1,13 +1,26 @@
 from sqlmodel import SQLModel, Field
+from sqlalchemy import JSON, Column, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from typing import Optional
 from datetime import datetime
 
 class JobMatch(SQLModel, table=True):
     __tablename__ = "job_matches"
+    __table_args__ = (Index("ix_job_matches_resume_id_user_id", "resume_id", "user_id"),)
     id: int = Field(default=None, primary_key=True)
     resume_id: int = Field(foreign_key="resumes.id")
     user_id: int = Field(foreign_key="users.id")
     job_description: str
     ai_response: str  # Store as JSON string
     created_at: datetime = Field(default_factory=datetime.utcnow)
-    
+    result: Optional[dict] = Field(default=None, sa_column=Column(JSON().with_variant(JSONB(), "postgresql")))
+    payload: Optional[str] = None  # the list-endpoint item, already serialized to JSON
+
+class JobPosting(SQLModel, table=True):
+    """A saved job description that resumes can be ranked against."""
+    __tablename__ = "job_postings"
+    id: int = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="users.id", index=True)
+    title: str
+    description: str
+    created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,9 @@
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+
+class LLMCacheEntry(SQLModel, table=True):
+    __tablename__ = "llm_cache"
+    key: str = Field(primary_key=True, max_length=64)  # sha256 of version + model + normalized prompt
+    model: str
+    response: str
+    created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,7 @@
+from sqlmodel import SQLModel, Field
+
+class RateLimitBucket(SQLModel, table=True):
+    __tablename__ = "rate_limit_buckets"
+    key: str = Field(primary_key=True)  # "<scope>:<user id>"
+    tokens: float
+    updated_at: float  # unix time of the last reservation; a new window refills the bucket
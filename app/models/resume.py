@@ -1,11 +1,19 @@
 from datetime import datetime, timezone
+from sqlalchemy import JSON, Column
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlmodel import SQLModel, Field
 from typing import Optional
 
 class Resume(SQLModel, table=True):
     __tablename__ = "resumes"
     id: int = Field(default=None, primary_key=True)
-    user_id: int = Field(foreign_key="users.id")
+    user_id: int = Field(foreign_key="users.id", index=True)
     filename: str
     content: str
-    uploaded_at: Optional[datetime] = Field(default_factory=datetime.now(timezone.utc))
\ No newline at end of file
+    content_hash: Optional[str] = Field(default=None, index=True, max_length=64)  # sha256 of the uploaded bytes
+    uploaded_at: Optional[datetime] = Field(default_factory=datetime.now(timezone.utc))
+    # The earlier upload this is a new version of: given at upload, or the user's latest file of the same name
+    parent_resume_id: Optional[int] = Field(default=None, foreign_key="resumes.id", index=True)
+    version: int = 1
+    # Normalized text split by heading, computed at upload; prompts are built from it (see resume_sections)
+    sections: Optional[list] = Field(default=None, sa_column=Column(JSON().with_variant(JSONB(), "postgresql")))
@@ -1,12 +1,25 @@
 from sqlmodel import SQLModel, Field
+from sqlalchemy import JSON, Column, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from typing import Optional
 from datetime import datetime
 
 class Review(SQLModel, table=True):
     __tablename__ = "reviews"
+    __table_args__ = (
+        Index("ix_reviews_user_id_created_at", "user_id", "created_at"),
+        Index("ix_reviews_resume_id_user_id", "resume_id", "user_id"),
+    )
     id: int = Field(default=None, primary_key=True)
     resume_id: int = Field(foreign_key="resumes.id")
     user_id: int = Field(foreign_key="users.id")
     feedback: str
     score: Optional[int] = None
-    created_at: datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    # Normalized once when the review is stored, so reads never re-parse ``feedback``
+    suggestions: Optional[list] = Field(default=None, sa_column=Column(JSON().with_variant(JSONB(), "postgresql")))
+    summary: Optional[str] = None
+    payload: Optional[str] = None  # the list-endpoint item, already serialized to JSON
+    # [{key, name, hash, tokens, score, suggestions}] per reviewed section; reused for unchanged sections of later versions
+    section_feedback: Optional[list] = Field(default=None, sa_column=Column(JSON().with_variant(JSONB(), "postgresql")))
+    base_review_id: Optional[int] = Field(default=None, foreign_key="reviews.id")  # review of the earlier version it builds on
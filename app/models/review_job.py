@@ -0,0 +1,21 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
+from typing import Optional
+from datetime import datetime
+
+class ReviewJob(SQLModel, table=True):
+    __tablename__ = "review_jobs"
+    __table_args__ = (Index("ix_review_jobs_status_available_at", "status", "available_at"),)
+    id: int = Field(default=None, primary_key=True)
+    resume_id: int = Field(foreign_key="resumes.id")
+    user_id: int = Field(foreign_key="users.id")
+    status: str = Field(default="queued")  # queued, running, done, failed
+    attempts: int = 0
+    max_attempts: int = 3
+    review_id: Optional[int] = Field(default=None, foreign_key="reviews.id")
+    last_error: Optional[str] = None
+    worker_id: Optional[str] = None
+    available_at: datetime = Field(default_factory=datetime.utcnow)  # not claimable before this (retry backoff)
+    locked_until: Optional[datetime] = None  # visibility timeout of a running job
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,14 @@
+from sqlmodel import SQLModel, Field
+
+class SearchPosting(SQLModel, table=True):
+    """One (term, resume) entry of the resume search index."""
+    __tablename__ = "search_postings"
+    term: str = Field(primary_key=True)
+    resume_id: int = Field(primary_key=True, foreign_key="resumes.id", index=True)
+    tf: int
+    positions: str  # space-separated token offsets, for phrase queries
+
+class SearchDocument(SQLModel, table=True):
+    __tablename__ = "search_documents"
+    resume_id: int = Field(primary_key=True, foreign_key="resumes.id")
+    length: int  # indexed terms in the resume, for BM25 length normalisation
@@ -0,0 +1,19 @@
+from sqlmodel import SQLModel, Field
+from datetime import date
+
+# Each counter is split over several rows (shards) so concurrent inserts do not queue on one row lock;
+# readers sum the shards
+
+class StatCounter(SQLModel, table=True):
+    __tablename__ = "stat_counters"
+    name: str = Field(primary_key=True)
+    shard: int = Field(default=0, primary_key=True)
+    value: int = 0
+
+class DailyStat(SQLModel, table=True):
+    __tablename__ = "daily_stats"
+    day: date = Field(primary_key=True)
+    metric: str = Field(primary_key=True)
+    shard: int = Field(default=0, primary_key=True)
+    count: int = 0
+    total: float = 0  # sum of the metric's values (e.g. review scores), for averages
@@ -3,7 +3,7 @@ from sqlmodel import SQLModel, Field
 class User(SQLModel, table=True):
     __tablename__ = "users"
     id: int = Field(default=None, primary_key=True)
-    email: str
+    email: str = Field(unique=True, index=True)
     hashed_password: str
     is_active: bool = True
     role: str = Field(default="user")
\ No newline at end of file
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Any
+from pydantic import BaseModel, Field
+from typing import Any, Optional
 from datetime import datetime
 
 class JobMatchRead(BaseModel):
@@ -8,4 +8,23 @@ class JobMatchRead(BaseModel):
     user_id: int
     job_description: str
     ai_response: Any
-    created_at: datetime
\ No newline at end of file
+    created_at: datetime
+class JobPostingCreate(BaseModel):
+    title: str
+    description: str
+
+class JobPostingRead(BaseModel):
+    id: int
+    title: str
+    description: str
+    created_at: datetime
+
+class RankJobsRequest(BaseModel):
+    posting_ids: Optional[list[int]] = None  # defaults to all of the caller's postings
+    top_k: int = Field(10, ge=1, le=100)
+
+class RankResumesRequest(BaseModel):
+    posting_id: Optional[int] = None
+    job_description: Optional[str] = None
+    user_id: Optional[int] = None  # only rank this user's resumes
+    top_k: int = Field(10, ge=1, le=500)
@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from datetime import datetime
 
 class ResumeUpload(BaseModel):
     filename: str
@@ -7,4 +8,6 @@ class ResumeRead(BaseModel):
     id: int
     filename: str
     content: str
-    uploaded_at: str
\ No newline at end of file
+    uploaded_at: datetime
+    version: int = 1
+    parent_resume_id: int | None = None
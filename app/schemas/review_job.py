@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+class ReviewJobRead(BaseModel):
+    id: int
+    resume_id: int
+    status: str
+    attempts: int
+    review_id: Optional[int] = None
+    last_error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
@@ -1,17 +1,23 @@
-from openai import OpenAI
-import os
+from app.services import llm_cache, llm_router, metrics
 
-client = OpenAI(
-    base_url="https://openrouter.ai/api/v1",
-    api_key=os.getenv("OPENROUTER_API_KEY"),
+REVIEW_MODEL = "deepseek/deepseek-r1-0528:free"
+# Bump whenever the prompt wording changes so stale cached answers are not reused
+REVIEW_PROMPT_VERSION = "2"
+# LLM_REVIEW_MODELS adds fallbacks and latency SLOs; REVIEW_MODEL is the default list
+review_router = llm_router.get_router("review", REVIEW_MODEL)
+
+SECTION_FEEDBACK_FIELD = (
+    "\"sections\": object keyed by the section ids in square brackets, each "
+    "{\"score\": integer (score out of 100), \"suggestions\": list of up to 2 suggestions for that section}.\n"
 )
 
-def review_resume_ai(resume_text: str, job_desc: str = None):
+def build_review_prompt(resume_text: str, job_desc: str = None) -> str:
     prompt = (
         "You are a resume reviewer. Analyze the following resume and return a JSON object with the following fields:\n"
         "\"score\": integer (score out of 100),\n"
         "\"suggestions\": list of 3 suggestions to improve the resume for a Software Engineering role,\n"
-        "\"summary\": a brief summary of the resume's strengths and weaknesses.\n"
+        "\"summary\": a brief summary of the resume's strengths and weaknesses,\n"
+        f"{SECTION_FEEDBACK_FIELD}"
         "Format your response as valid JSON only.\n\n"
         f"Resume:\n{resume_text}"
     )
@@ -20,20 +26,37 @@ def review_resume_ai(resume_text: str, job_desc: str = None):
             f"\n\nJob Description:\n{job_desc}\n"
             "Also include a field \"job_match_suggestions\": list of suggestions to better align the resume with the job description."
         )
+    return prompt
+
+def build_revision_prompt(changed_text: str, unchanged: list, previous_summary: str, previous_suggestions: list) -> str:
+    earlier = "\n".join(f"- {s}" for s in previous_suggestions) or "- none"
+    return (
+        "You are a resume reviewer. The candidate revised their resume after an earlier review.\n"
+        f"Earlier summary: {previous_summary or 'none'}\n"
+        f"Earlier suggestions:\n{earlier}\n"
+        f"Sections that did not change: {', '.join(unchanged) or 'none'}\n"
+        "Only the new and changed sections are shown below. Return a JSON object with the following fields:\n"
+        f"{SECTION_FEEDBACK_FIELD}"
+        "\"suggestions\": list of 3 suggestions to improve the whole resume for a Software Engineering role, "
+        "given the earlier review and these changes,\n"
+        "\"summary\": a brief summary of the whole resume's strengths and weaknesses after these changes.\n"
+        "Format your response as valid JSON only.\n\n"
+        f"Changed sections:\n{changed_text}"
+    )
 
-    completion = client.chat.completions.create(
-        extra_headers={
-            # Optionally set these for openrouter.ai analytics/rankings
-            # "HTTP-Referer": "<YOUR_SITE_URL>",
-            # "X-Title": "<YOUR_SITE_NAME>",
-        },
-        extra_body={},
-        model="deepseek/deepseek-r1-0528:free",
-        messages=[
-            {
-                "role": "user",
-                "content": prompt
-            }
-        ]
+async def _complete(prompt: str, user_id: int = None):
+    return await llm_cache.cached_completion(
+        prompt, review_router.primary, REVIEW_PROMPT_VERSION,
+        lambda p: review_router.complete(p, user_id=user_id)
     )
-    return completion.choices[0].message.content
\ No newline at end of file
+
+@metrics.timed("llm_review")
+async def review_resume_ai(resume_text: str, job_desc: str = None, user_id: int = None):
+    return await _complete(build_review_prompt(resume_text, job_desc), user_id)
+
+@metrics.timed("llm_review")
+async def review_revision_ai(changed_text: str, unchanged: list, previous_summary: str, previous_suggestions: list,
+                             user_id: int = None):
+    """Review only the sections a new version changed, with the earlier review as context."""
+    prompt = build_revision_prompt(changed_text, unchanged, previous_summary, previous_suggestions)
+    return await _complete(prompt, user_id)
@@ -0,0 +1,159 @@
+"""Small key -> bytes stores for rendered artifacts (review PDFs).
+
+``local`` keeps files in a directory with size-bounded LRU eviction; ``s3``
+talks to any S3-compatible endpoint (AWS, MinIO, a moto server in tests) and
+needs the optional ``boto3`` package. Keys are flat names chosen by the app.
+"""
+import os
+import tempfile
+import threading
+
+BLOB_STORE = os.getenv("BLOB_STORE", "local")
+BLOB_STORE_DIR = os.getenv("BLOB_STORE_DIR", "generated_reviews")
+BLOB_STORE_MAX_BYTES = int(os.getenv("BLOB_STORE_MAX_BYTES", str(256 * 1024 * 1024)))
+BLOB_STORE_S3_BUCKET = os.getenv("BLOB_STORE_S3_BUCKET")
+BLOB_STORE_S3_PREFIX = os.getenv("BLOB_STORE_S3_PREFIX", "review-pdfs/")
+# Point at MinIO or another S3-compatible server instead of AWS
+BLOB_STORE_S3_ENDPOINT_URL = os.getenv("BLOB_STORE_S3_ENDPOINT_URL")
+
+
+class LocalBlobStore:
+    """Files under ``root``; reading a blob refreshes its mtime, eviction drops the oldest."""
+
+    def __init__(self, root: str = BLOB_STORE_DIR, max_bytes: int = BLOB_STORE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = None  # computed lazily; other processes may share the directory
+        self.evictions = 0
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        if os.sep in key or (os.altsep and os.altsep in key) or key.startswith("."):
+            raise ValueError(f"Invalid blob key: {key!r}")
+        return os.path.join(self.root, key)
+
+    def get(self, key: str):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return data
+
+    def put(self, key: str, data: bytes):
+        path = self._path(key)
+        handle, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".tmp-")
+        try:
+            with os.fdopen(handle, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)  # atomic, so readers never see a partial file
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def delete(self, key: str):
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _entries(self):
+        with os.scandir(self.root) as it:
+            return [e for e in it if e.is_file() and not e.name.startswith(".")]
+
+    def _scan_size(self) -> int:
+        size = 0
+        for entry in self._entries():
+            try:
+                size += entry.stat().st_size
+            except FileNotFoundError:
+                pass
+        return size
+
+    def _evict(self):
+        entries = []
+        for entry in self._entries():
+            try:
+                info = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((info.st_mtime, info.st_size, entry.path))
+        entries.sort()
+        size = sum(item[1] for item in entries)
+        for _, entry_size, path in entries:
+            if size <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            size -= entry_size
+            self.evictions += 1
+        self._size = size
+
+    def stats(self) -> dict:
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            return {"backend": "local", "bytes": self._size, "max_bytes": self.max_bytes, "evictions": self.evictions}
+
+
+class S3BlobStore:
+    def __init__(self, bucket: str = BLOB_STORE_S3_BUCKET, prefix: str = BLOB_STORE_S3_PREFIX,
+                 endpoint_url: str = BLOB_STORE_S3_ENDPOINT_URL):
+        try:
+            import boto3
+        except ImportError:
+            raise RuntimeError("BLOB_STORE=s3 requires the boto3 package")
+        if not bucket:
+            raise RuntimeError("BLOB_STORE=s3 requires BLOB_STORE_S3_BUCKET")
+        self.bucket = bucket
+        self.prefix = prefix
+        self.client = boto3.client("s3", endpoint_url=endpoint_url)
+
+    def get(self, key: str):
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self.prefix + key)
+        except self.client.exceptions.NoSuchKey:
+            return None
+        return response["Body"].read()
+
+    def put(self, key: str, data: bytes):
+        self.client.put_object(Bucket=self.bucket, Key=self.prefix + key, Body=data)
+
+    def delete(self, key: str):
+        self.client.delete_object(Bucket=self.bucket, Key=self.prefix + key)
+
+    def stats(self) -> dict:
+        # Size limits are left to the bucket's lifecycle rules
+        return {"backend": "s3", "bucket": self.bucket, "prefix": self.prefix}
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_blob_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            if BLOB_STORE == "s3":
+                _store = S3BlobStore()
+            elif BLOB_STORE == "local":
+                _store = LocalBlobStore()
+            else:
+                raise RuntimeError(f"Unknown BLOB_STORE {BLOB_STORE!r}; use 'local' or 's3'")
+        return _store
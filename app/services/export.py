@@ -0,0 +1,68 @@
+import csv
+import io
+import json
+from datetime import datetime
+from sqlmodel import Session, select
+from app.db.session import engine
+from app.models.resume import Resume
+from app.models.review import Review
+
+EXPORT_BATCH_ROWS = 1000
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+REVIEW_EXPORT_COLUMNS = (Review.id, Review.resume_id, Review.user_id, Review.score, Review.created_at, Review.feedback)
+RESUME_EXPORT_COLUMNS = (Resume.id, Resume.user_id, Resume.filename, Resume.uploaded_at)
+
+
+def _plain(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _encode(fmt: str, fields: list[str], rows) -> str:
+    if fmt == "ndjson":
+        return "".join(
+            json.dumps({k: _plain(v) for k, v in zip(fields, row)}, ensure_ascii=False) + "\n" for row in rows
+        )
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([[_plain(v) for v in row] for row in rows])
+    return buffer.getvalue()
+
+
+def stream_rows(statement, fmt: str):
+    """Yield encoded chunks of ``statement``'s rows, one batch at a time.
+
+    ``yield_per`` turns on a server-side cursor on Postgres (a plain cursor
+    fetched in batches on SQLite), so memory stays constant however many
+    rows match.
+    """
+    fields = [column.key for column in statement.selected_columns]
+    if fmt == "csv":
+        yield _encode("csv", fields, [fields])
+    with Session(engine) as session:
+        result = session.execute(statement.execution_options(yield_per=EXPORT_BATCH_ROWS))
+        for batch in result.partitions():
+            yield _encode(fmt, fields, batch)
+
+
+def review_export_statement(start: datetime = None, end: datetime = None, user_id: int = None):
+    statement = select(*REVIEW_EXPORT_COLUMNS).order_by(Review.id)
+    if start is not None:
+        statement = statement.where(Review.created_at >= start)
+    if end is not None:
+        statement = statement.where(Review.created_at < end)
+    if user_id is not None:
+        statement = statement.where(Review.user_id == user_id)
+    return statement
+
+
+def resume_export_statement(start: datetime = None, end: datetime = None, user_id: int = None,
+                            include_content: bool = False):
+    columns = RESUME_EXPORT_COLUMNS + ((Resume.content,) if include_content else ())
+    statement = select(*columns).order_by(Resume.id)
+    if start is not None:
+        statement = statement.where(Resume.uploaded_at >= start)
+    if end is not None:
+        statement = statement.where(Resume.uploaded_at < end)
+    if user_id is not None:
+        statement = statement.where(Resume.user_id == user_id)
+    return statement
@@ -1,34 +1,68 @@
-from openai import OpenAI
-import os
+import json
 
-client = OpenAI(
-    base_url="https://openrouter.ai/api/v1",
-    api_key=os.getenv("OPENROUTER_API_KEY"),
-)
+from app.services import llm_cache, llm_router
+from app.services.review_download import ensure_list
+from app.services.review_pipeline import clean_ai_json_response
 
-def match_resume_with_job_desc(resume_text: str, job_desc: str):
-    prompt = (
+MATCH_MODEL = "deepseek/deepseek-r1-0528:free"
+# Bump whenever the prompt wording changes so stale cached answers are not reused
+MATCH_PROMPT_VERSION = "2"
+# LLM_MATCH_MODELS adds fallbacks and latency SLOs; MATCH_MODEL is the default list
+match_router = llm_router.get_router("match", MATCH_MODEL)
+
+def build_suggestions_prompt(resume_text: str, job_desc: str, matching: list, missing: list) -> str:
+    return (
         "You are an expert resume reviewer. Compare the following resume and job description.\n"
         "Respond ONLY with a valid JSON object, no explanations, no markdown, no code block, no extra text.\n"
-        "The JSON must have these keys:\n"
-        "  \"matching_keywords\": (list of keywords/skills present in both),\n"
-        "  \"missing_keywords\": (list of important keywords from the job description missing in the resume),\n"
+        "The JSON must have one key:\n"
         "  \"suggestions\": (list of 3 suggestions to better align the resume with the job description).\n"
         "Example:\n"
         "{\n"
-        "  \"matching_keywords\": [\"Python\", \"project management\"],\n"
-        "  \"missing_keywords\": [\"AWS\", \"Docker\"],\n"
         "  \"suggestions\": [\n"
         "    \"Add AWS experience to your resume.\",\n"
         "    \"Highlight any Docker usage.\",\n"
         "    \"Emphasize relevant project management achievements.\"\n"
         "  ]\n"
         "}\n"
+        f"Skills already covered: {', '.join(matching) or 'none'}\n"
+        f"Skills the job asks for that the resume lacks: {', '.join(missing) or 'none'}\n"
         "Now, here is the data:\n"
         f"Resume:\n{resume_text}\n\nJob Description:\n{job_desc}"
     )
-    completion = client.chat.completions.create(
-        model="deepseek/deepseek-r1-0528:free",
-        messages=[{"role": "user", "content": prompt}]
+
+def parse_suggestions(ai_response: str) -> list:
+    try:
+        parsed = json.loads(clean_ai_json_response(ai_response))
+    except (TypeError, ValueError):
+        return [ai_response] if ai_response else []
+    if isinstance(parsed, dict):
+        parsed = parsed.get("suggestions", [])
+    return ensure_list(parsed)
+
+async def suggest_improvements(resume_text: str, job_desc: str, matching: list, missing: list,
+                               user_id: int = None) -> list:
+    prompt = build_suggestions_prompt(resume_text, job_desc, matching, missing)
+    ai_response = await llm_cache.cached_completion(
+        prompt, match_router.primary, MATCH_PROMPT_VERSION,
+        lambda p: match_router.complete(p, user_id=user_id)
     )
-    return completion.choices[0].message.content
\ No newline at end of file
+    return parse_suggestions(ai_response)
+
+
+def parse_match_result(ai_response: str) -> dict:
+    """The stored result of a match saved before results had their own column."""
+    try:
+        parsed = json.loads(ai_response) if ai_response else {}
+    except ValueError:
+        return {}
+    return parsed if isinstance(parsed, dict) else {}
+
+
+def match_payload(match_id: int, job_description: str, result: dict, created_at) -> str:
+    """One item of ``GET /job_match/{id}/matches``, serialized the way the endpoint would."""
+    return json.dumps({
+        "id": match_id,
+        "job_description": job_description,
+        "ai_response": result,
+        "created_at": created_at.isoformat(),
+    }, ensure_ascii=False)
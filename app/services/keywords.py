@@ -0,0 +1,172 @@
+"""Local skill extraction for job matching.
+
+Text is tokenized once, then scanned left to right against a phrase table
+built from ``SKILLS`` and their aliases, taking the longest phrase that matches
+at each position. The result is deterministic and needs no network round-trip.
+"""
+import re
+
+# Canonical display name -> extra spellings that mean the same skill
+SKILLS = {
+    # languages
+    "Python": [], "Java": [], "JavaScript": ["js", "ecmascript", "es6"], "TypeScript": [],
+    "Go": ["golang"], "Rust": [], "C": [], "C++": ["cpp"], "C#": ["csharp", "c sharp"],
+    "Ruby": [], "PHP": [], "Kotlin": [], "Swift": [], "Scala": [], "R": [], "Elixir": [],
+    "Haskell": [], "Perl": [], "Bash": ["shell scripting", "shell script"], "SQL": [],
+    "MATLAB": [], "Objective-C": ["objc"], "Dart": [], "Lua": [],
+    # web and frameworks
+    "HTML": ["html5"], "CSS": ["css3"], "React": ["reactjs", "react.js"], "Angular": ["angularjs"],
+    "Vue": ["vuejs", "vue.js"], "Svelte": [], "Next.js": ["nextjs"], "Node.js": ["nodejs", "node js"],
+    "Express.js": ["expressjs"], "Django": [], "Flask": [], "FastAPI": [],
+    "Spring": ["spring boot", "springboot"], "Ruby on Rails": ["rails", "ror"], "Laravel": [],
+    ".NET": ["dotnet", "asp.net", ".net core"], "GraphQL": [],
+    "REST APIs": ["REST", "restful", "rest api", "restful api", "rest service", "rest endpoint", "rest interface"],
+    "gRPC": [], "WebSockets": ["websocket"], "Redux": [], "Tailwind": ["tailwindcss"],
+    "jQuery": [], "Webpack": [], "Flutter": [], "React Native": [],
+    # data stores and messaging
+    "PostgreSQL": ["postgres", "psql"], "MySQL": [], "SQLite": [], "MongoDB": ["mongo"],
+    "Redis": [], "Elasticsearch": ["elastic search", "opensearch"], "Cassandra": [], "DynamoDB": [],
+    "Oracle": [], "SQL Server": ["mssql", "ms sql"], "Snowflake": [], "BigQuery": [],
+    "Kafka": ["apache kafka"], "RabbitMQ": [], "Celery": [], "SQLAlchemy": [],
+    # cloud and infrastructure
+    "AWS": ["amazon web services"], "GCP": ["google cloud", "google cloud platform"],
+    "Azure": ["microsoft azure"], "Docker": ["containerization", "dockerfile"],
+    "Kubernetes": ["k8s", "kube"], "Terraform": [], "Ansible": [], "Helm": [], "Linux": [],
+    "Nginx": [], "Serverless": ["aws lambda", "lambda functions"], "CI/CD": ["cicd", "CI", "ci pipeline", "ci workflow", "ci server",
+                                                                     "continuous integration", "continuous delivery", "continuous deployment"],
+    "Jenkins": [], "GitHub Actions": [], "GitLab CI": [], "Git": ["github", "gitlab"],
+    "Prometheus": [], "Grafana": [], "Datadog": [], "OpenTelemetry": ["otel"],
+    "microservices": ["microservice", "micro services", "service oriented architecture", "soa"],
+    "distributed systems": [], "infrastructure as code": ["iac"],
+    "observability": ["monitoring and alerting", "monitoring tool", "monitoring stack", "infrastructure monitoring",
+                      "application monitoring", "production monitoring", "apm"],
+    # data and ML
+    "machine learning": ["ml"], "deep learning": [], "natural language processing": ["nlp"],
+    "computer vision": [], "data analysis": ["data analytics"], "data engineering": [],
+    "ETL": ["elt", "data pipelines", "data pipeline"], "pandas": [], "NumPy": [], "SciPy": [],
+    "scikit-learn": ["sklearn", "scikit learn"], "TensorFlow": [], "PyTorch": [],
+    "Spark": ["apache spark", "pyspark"], "Hadoop": [], "Airflow": ["apache airflow"],
+    "dbt": [], "Tableau": [], "Power BI": ["powerbi"], "statistics": ["statistical analysis"], "LLMs": ["llm", "large language models"],
+    # practices
+    "unit testing": ["unit tests", "pytest", "junit"], "test-driven development": ["tdd"],
+    "system design": [], "API design": [], "performance optimization": ["performance tuning"],
+    "security": ["application security", "appsec"], "OAuth": ["oauth2", "oidc", "openid connect"],
+    "agile": ["agile methodologies"], "Scrum": [], "Kanban": [], "code review": ["code reviews"],
+    "project management": [], "product management": [], "stakeholder management": [],
+    "leadership": ["team leadership", "technical leadership"], "mentoring": ["mentorship", "mentored"],
+    "communication": ["communication skills"], "Jira": [],
+}
+
+# Spellings that are also ordinary words; only counted when written exactly as listed.
+# Aliases need context instead ("rest api", "ci pipeline"), except in capitals here
+CASE_SENSITIVE = {"Go", "R", "C", "Rust", "Swift", "Spring", "Oracle", "Helm", "Dart", "Lua", "Spark", "ETL",
+                  "REST", "CI"}
+
+# Capitalized, these still start sentences ("Go to market") or name other things ("R&D", "grade C"),
+# so they only count in a skills list: next to another skill with just a comma, slash, "and" or "or"
+# between them, after a heading such as "Languages:" on the same line, or right after "experience with"
+LIST_ONLY = {"Go", "R", "C"}
+_LIST_SEPARATOR = re.compile(r"\s*(?:(?:[,;|/&\u2022\u00b7]|\band\b|\bor\b)\s*){0,2}", re.IGNORECASE)
+_LIST_HEADING = re.compile(
+    r"\b(?:languages?|skills|stack|technolog(?:y|ies)|tools)\b[^\n.]*$"
+    r"|\b(?:experience (?:in|with)|written in|programming in|proficient in|knowledge of)\s*$", re.IGNORECASE)
+
+# Words too common to carry weight when ranking or searching free text
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or our that the their "
+    "this to was we will with you your who what which about into over under using used "
+    "experience years year work working team teams role ability strong knowledge".split()
+)
+
+_TOKEN = re.compile(r"[a-z0-9.#+\-]*[a-z0-9#+]|[.#]?[a-z0-9]+", re.IGNORECASE)
+
+
+def fold(token: str) -> str:
+    # Fold simple plurals so "REST APIs" and "REST API" meet in the middle
+    token = token.lower()
+    if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN.findall(text.replace("/", " "))
+
+
+def _token_spans(text: str) -> list[tuple[int, int]]:
+    # Same tokens as tokenize(); "/" is swapped for a space of the same length, so offsets still fit ``text``
+    return [match.span() for match in _TOKEN.finditer(text.replace("/", " "))]
+
+
+def _build_phrases():
+    phrases = {}
+    exact = {}
+    for name, aliases in SKILLS.items():
+        for spelling in [name, *aliases]:
+            tokens = tokenize(spelling)
+            if not tokens:
+                continue
+            if spelling in CASE_SENSITIVE:
+                exact[tuple(tokens)] = name
+            else:
+                phrases.setdefault(tuple(fold(t) for t in tokens), name)
+    longest = max(len(key) for key in [*phrases, *exact])
+    return phrases, exact, longest
+
+
+_PHRASES, _EXACT, _MAX_PHRASE = _build_phrases()
+
+
+def _in_list(text: str, spans: list, matches: list, k: int) -> bool:
+    start, end = spans[matches[k][0]][0], spans[matches[k][1] - 1][1]
+    if _LIST_HEADING.search(text[text.rfind("\n", 0, start) + 1:start]):
+        return True
+    for other in (k - 1, k + 1):
+        if not 0 <= other < len(matches):
+            continue
+        # Only a neighbouring skill with nothing but a separator in between
+        if other < k:
+            gap = text[spans[matches[other][1] - 1][1]:start]
+        else:
+            gap = text[end:spans[matches[other][0]][0]]
+        if _LIST_SEPARATOR.fullmatch(gap):
+            return True
+    return False
+
+
+def extract_keywords(text: str) -> list[str]:
+    """Canonical skill names found in ``text``, in order of first appearance."""
+    text = text or ""
+    tokens = tokenize(text)
+    folded = [fold(t) for t in tokens]
+    # (first token, end token, name)
+    matches = []
+    i = 0
+    while i < len(tokens):
+        width = 0
+        for n in range(min(_MAX_PHRASE, len(tokens) - i), 0, -1):
+            name = _PHRASES.get(tuple(folded[i:i + n])) or _EXACT.get(tuple(tokens[i:i + n]))
+            if name is not None:
+                matches.append((i, i + n, name))
+                width = n
+                break
+        i += width or 1
+    spans = _token_spans(text) if any(name in LIST_ONLY for _, _, name in matches) else None
+    found = {}
+    for k, (_, _, name) in enumerate(matches):
+        if name in LIST_ONLY and not _in_list(text, spans, matches, k):
+            continue
+        found.setdefault(name, None)
+    return list(found)
+
+
+def match_keywords(resume_text: str, job_desc: str) -> dict:
+    """Job-description skills split into those the resume has and those it lacks."""
+    wanted = extract_keywords(job_desc)
+    have = set(extract_keywords(resume_text))
+    matching = [k for k in wanted if k in have]
+    return {
+        "matching_keywords": matching,
+        "missing_keywords": [k for k in wanted if k not in have],
+        "keyword_coverage": round(len(matching) / len(wanted), 2) if wanted else None,
+    }
@@ -0,0 +1,121 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import datetime, timedelta
+
+from sqlmodel import Session
+
+from app.db.session import engine
+from app.models.llm_cache import LLMCacheEntry
+from app.services.singleflight import SingleFlight
+from app.utils.cache import LRUCache
+
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "1024"))
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+LLM_CACHE_PERSIST = os.getenv("LLM_CACHE_PERSIST", "false").lower() in ("1", "true", "yes")
+
+_memory = LRUCache(maxsize=LLM_CACHE_SIZE, ttl=LLM_CACHE_TTL_SECONDS)
+_lock = threading.Lock()
+_counters = {"persistent_hits": 0, "persistent_misses": 0, "stores": 0}
+# Identical prompts already being answered are joined instead of sent again
+_flights = SingleFlight()
+
+
+def _incr(name: str):
+    with _lock:
+        _counters[name] += 1
+
+
+def normalize_prompt(prompt: str) -> str:
+    # Whitespace differences in extracted resume text should not produce distinct keys
+    lines = [re.sub(r"\s+", " ", line).strip() for line in prompt.strip().splitlines()]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines))
+
+
+def make_key(prompt: str, model: str, prompt_version: str) -> str:
+    payload = json.dumps([prompt_version, model, normalize_prompt(prompt)], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _get_persistent(key: str):
+    with Session(engine) as session:
+        entry = session.get(LLMCacheEntry, key)
+        if entry is None:
+            return None
+        if entry.created_at < datetime.utcnow() - timedelta(seconds=LLM_CACHE_TTL_SECONDS):
+            session.delete(entry)
+            session.commit()
+            return None
+        return entry.response
+
+
+def _set_persistent(key: str, value: str, model: str):
+    with Session(engine) as session:
+        session.merge(LLMCacheEntry(key=key, model=model, response=value, created_at=datetime.utcnow()))
+        session.commit()
+
+
+def _load_persistent(key: str):
+    value = _get_persistent(key)
+    if value is None:
+        _incr("persistent_misses")
+        return None
+    _incr("persistent_hits")
+    _memory.set(key, value)
+    return value
+
+
+async def get(key: str):
+    value = _memory.get(key)
+    if value is not None or not LLM_CACHE_PERSIST:
+        return value
+    return await asyncio.to_thread(_load_persistent, key)
+
+
+async def put(key: str, value: str, model: str):
+    if not value:
+        return
+    _memory.set(key, value)
+    if LLM_CACHE_PERSIST:
+        await asyncio.to_thread(_set_persistent, key, value, model)
+    _incr("stores")
+
+
+async def cached_completion(prompt: str, model: str, prompt_version: str, fetch):
+    """Return the cached answer for this prompt, awaiting ``fetch(prompt)`` only on a miss.
+
+    Concurrent misses for the same key share a single ``fetch``.
+    """
+    key = make_key(prompt, model, prompt_version)
+    value = _memory.get(key)
+    if value is not None:
+        return value
+
+    async def load():
+        value = None
+        if LLM_CACHE_PERSIST:
+            value = await asyncio.to_thread(_load_persistent, key)
+        if value is None:
+            value = await fetch(prompt)
+            await put(key, value, model)
+        return value
+
+    return await _flights.do(key, load)
+
+
+def clear():
+    _memory.clear()
+
+
+def stats() -> dict:
+    with _lock:
+        counters = dict(_counters)
+    return {
+        "memory": _memory.stats(),
+        "persistent_enabled": LLM_CACHE_PERSIST,
+        "single_flight": _flights.stats(),
+        **counters,
+    }
@@ -0,0 +1,120 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
+import httpx
+import openai
+from openai import AsyncOpenAI
+
+from app.services import metrics
+
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", "https://openrouter.ai/api/v1")
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_MAX_CONCURRENCY_PER_USER = int(os.getenv("LLM_MAX_CONCURRENCY_PER_USER", "2"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "32"))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "120"))
+LLM_CONNECT_TIMEOUT_SECONDS = float(os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", "10"))
+# How long a request may wait for a free slot before we give up on it
+LLM_QUEUE_TIMEOUT_SECONDS = float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "30"))
+
+
+class LLMError(Exception):
+    """The upstream model call failed or timed out."""
+
+
+class LLMBusyError(LLMError):
+    """No in-flight slot became free within LLM_QUEUE_TIMEOUT_SECONDS."""
+
+
+_client: AsyncOpenAI | None = None
+_global_slots = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+_user_slots: dict = {}
+_in_flight = 0
+
+
+def get_client() -> AsyncOpenAI:
+    """Shared client; every call reuses one pooled httpx connection pool."""
+    global _client
+    if _client is None:
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_MAX_CONNECTIONS,
+            ),
+            timeout=httpx.Timeout(LLM_TIMEOUT_SECONDS, connect=LLM_CONNECT_TIMEOUT_SECONDS),
+        )
+        _client = AsyncOpenAI(
+            base_url=LLM_BASE_URL,
+            api_key=os.getenv("OPENROUTER_API_KEY"),
+            http_client=http_client,
+            max_retries=0,
+        )
+    return _client
+
+
+async def aclose():
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+async def _acquire(semaphore: asyncio.Semaphore):
+    try:
+        await asyncio.wait_for(semaphore.acquire(), LLM_QUEUE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        raise LLMBusyError("Too many AI requests in flight, try again later")
+
+
+@asynccontextmanager
+async def _slot(user_id: int | None):
+    global _in_flight
+    entry = None
+    if user_id is not None:
+        # [semaphore, users waiting or running]; dropped once nobody references it
+        entry = _user_slots.setdefault(user_id, [asyncio.Semaphore(LLM_MAX_CONCURRENCY_PER_USER), 0])
+        entry[1] += 1
+    try:
+        if entry is not None:
+            await _acquire(entry[0])
+        try:
+            await _acquire(_global_slots)
+            _in_flight += 1
+            try:
+                yield
+            finally:
+                _in_flight -= 1
+                _global_slots.release()
+        finally:
+            if entry is not None:
+                entry[0].release()
+    finally:
+        if entry is not None:
+            entry[1] -= 1
+            if entry[1] == 0:
+                _user_slots.pop(user_id, None)
+
+
+@metrics.timed("llm_request")
+async def complete(prompt: str, model: str, user_id: int | None = None, **kwargs) -> str:
+    async with _slot(user_id):
+        try:
+            completion = await get_client().chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                **kwargs
+            )
+        except (openai.APIError, httpx.HTTPError) as exc:
+            raise LLMError(str(exc)) from exc
+    if not completion.choices:
+        raise LLMError("Model returned no choices")
+    return completion.choices[0].message.content
+
+
+def stats() -> dict:
+    return {
+        "in_flight": _in_flight,
+        "max_concurrency": LLM_MAX_CONCURRENCY,
+        "max_concurrency_per_user": LLM_MAX_CONCURRENCY_PER_USER,
+        "users_waiting_or_running": len(_user_slots),
+    }
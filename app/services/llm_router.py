@@ -0,0 +1,267 @@
+"""Model routing for one kind of completion: fallback, hedging and circuit breakers.
+
+Each route (``review``, ``match``) has an ordered list of models, read from
+``LLM_<ROUTE>_MODELS`` as ``model=slo_seconds`` pairs separated by commas:
+
+    LLM_REVIEW_MODELS="deepseek/deepseek-r1-0528:free=60,meta-llama/llama-3.3-70b-instruct:free=30"
+
+A call goes to the first model whose circuit is closed. If that attempt fails,
+the next model is tried straight away. If it is still running after the
+model's recent p95 latency (its SLO until enough calls were seen), the same
+prompt is also sent to the next model and the first answer wins; the other
+attempt is cancelled. An attempt that takes longer than
+``LLM_SLO_TIMEOUT_FACTOR`` times its SLO is a failure.
+
+A model that fails ``LLM_BREAKER_FAILURES`` times in a row is taken out of
+rotation for ``LLM_BREAKER_COOLDOWN_SECONDS``; after that a single trial call
+decides whether it comes back. State is per process, like the other limits in
+``llm_client``.
+"""
+import asyncio
+import os
+import time
+from collections import deque
+
+import httpx
+import openai
+
+from app.services import llm_client, metrics
+from app.services.llm_client import LLMBusyError, LLMError
+
+LLM_DEFAULT_SLO_SECONDS = float(os.getenv("LLM_DEFAULT_SLO_SECONDS", "60"))
+LLM_SLO_TIMEOUT_FACTOR = float(os.getenv("LLM_SLO_TIMEOUT_FACTOR", "2"))
+LLM_HEDGE = os.getenv("LLM_HEDGE", "true").lower() in ("1", "true", "yes")
+# Below this many recent successes the SLO stands in for the p95
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+LLM_HEDGE_MIN_DELAY_SECONDS = float(os.getenv("LLM_HEDGE_MIN_DELAY_SECONDS", "0.5"))
+# Hedges running at once per route, so a slow primary cannot double the load
+LLM_HEDGE_MAX_IN_FLIGHT = int(os.getenv("LLM_HEDGE_MAX_IN_FLIGHT", "4"))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_COOLDOWN_SECONDS = float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", "30"))
+# Recent successful latencies kept per model for the percentiles
+LLM_LATENCY_WINDOW = int(os.getenv("LLM_LATENCY_WINDOW", "200"))
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+OUTCOMES = ("ok", "error", "timeout", "cancelled", "skipped")
+
+
+def parse_models(spec: str) -> list[tuple[str, float]]:
+    """``[(model, slo_seconds)]`` from ``model=slo,model2=slo2``; a missing SLO is the default."""
+    models = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, slo = item.rpartition("=") if "=" in item else (item, "", "")
+        models.append((name.strip(), float(slo) if slo.strip() else LLM_DEFAULT_SLO_SECONDS))
+    if not models:
+        raise ValueError(f"No models in {spec!r}")
+    return models
+
+
+class CircuitBreaker:
+    def __init__(self, failures: int = LLM_BREAKER_FAILURES, cooldown: float = LLM_BREAKER_COOLDOWN_SECONDS):
+        self.threshold = failures
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial = False
+        self._state = CLOSED
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+            self._state = HALF_OPEN
+        return self._state
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self.trial:
+            self.trial = True
+            return True
+        return False
+
+    def success(self):
+        self._state = CLOSED
+        self.failures = 0
+        self.trial = False
+
+    def failure(self):
+        self.failures += 1
+        if self._state == HALF_OPEN or self.failures >= self.threshold:
+            self._state = OPEN
+            self.opened_at = time.monotonic()
+        self.trial = False
+
+    def release(self):
+        """The attempt ended without a verdict (cancelled, or no free slot)."""
+        self.trial = False
+
+
+class ModelState:
+    def __init__(self, route: str, name: str, slo: float):
+        self.route = route
+        self.name = name
+        self.slo = slo
+        self.timeout = slo * LLM_SLO_TIMEOUT_FACTOR
+        self.breaker = CircuitBreaker()
+        self.latencies = deque(maxlen=LLM_LATENCY_WINDOW)
+        self.counts = dict.fromkeys(OUTCOMES + ("slo_missed",), 0)
+
+    def percentile(self, fraction: float):
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+    def hedge_delay(self) -> float:
+        p95 = self.percentile(0.95) if len(self.latencies) >= LLM_HEDGE_MIN_SAMPLES else None
+        return max(min(p95 if p95 is not None else self.slo, self.slo), LLM_HEDGE_MIN_DELAY_SECONDS)
+
+    def record(self, outcome: str, elapsed: float = None):
+        self.counts[outcome] += 1
+        metrics.LLM_MODEL_REQUESTS.inc(self.route, self.name, outcome)
+        if outcome == "ok":
+            self.latencies.append(elapsed)
+            metrics.LLM_MODEL_LATENCY.observe(elapsed, self.route, self.name)
+            if elapsed > self.slo:
+                self.counts["slo_missed"] += 1
+                metrics.LLM_MODEL_SLO_MISSED.inc(self.route, self.name)
+        metrics.LLM_CIRCUIT_OPEN.set(1 if self.breaker.state == OPEN else 0, self.route, self.name)
+
+    def stats(self) -> dict:
+        p50, p95 = self.percentile(0.5), self.percentile(0.95)
+        return {
+            "model": self.name,
+            "slo_seconds": self.slo,
+            "timeout_seconds": self.timeout,
+            "circuit": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "p50_seconds": round(p50, 3) if p50 is not None else None,
+            "p95_seconds": round(p95, 3) if p95 is not None else None,
+            "hedge_delay_seconds": round(self.hedge_delay(), 3),
+            **self.counts,
+        }
+
+
+def _timed_out(exc: LLMError) -> bool:
+    return isinstance(exc.__cause__, (openai.APITimeoutError, httpx.TimeoutException))
+
+
+class Router:
+    def __init__(self, route: str, models: list[tuple[str, float]], hedge: bool = LLM_HEDGE):
+        self.route = route
+        self.models = [ModelState(route, name, slo) for name, slo in models]
+        self.hedge = hedge and len(self.models) > 1
+        self.hedges_in_flight = 0
+        self.hedges = {"launched": 0, "won": 0}
+
+    @property
+    def primary(self) -> str:
+        """The model answers are cached under, whichever model actually wrote them."""
+        return self.models[0].name
+
+    async def _attempt(self, model: ModelState, prompt: str, user_id, kwargs) -> str:
+        started = time.perf_counter()
+        try:
+            result = await llm_client.complete(prompt, model.name, user_id=user_id, timeout=model.timeout, **kwargs)
+        except LLMBusyError:
+            # Our own slot limits, not the model's fault
+            model.breaker.release()
+            raise
+        except LLMError as exc:
+            model.breaker.failure()
+            model.record("timeout" if _timed_out(exc) else "error")
+            raise
+        except asyncio.CancelledError:
+            model.breaker.release()
+            model.record("cancelled")
+            raise
+        model.breaker.success()
+        model.record("ok", time.perf_counter() - started)
+        return result
+
+    async def _hedged(self, model: ModelState, prompt: str, kwargs) -> str:
+        self.hedges_in_flight += 1
+        try:
+            # No user id: the hedge must not take the caller's second per-user slot
+            return await self._attempt(model, prompt, None, kwargs)
+        finally:
+            self.hedges_in_flight -= 1
+
+    async def complete(self, prompt: str, user_id: int | None = None, **kwargs) -> str:
+        remaining = iter(self.models)
+        pending = {}
+
+        def launch(hedge: bool) -> bool:
+            for model in remaining:
+                if not model.breaker.allow():
+                    model.record("skipped")
+                    continue
+                attempt = self._hedged(model, prompt, kwargs) if hedge else self._attempt(model, prompt, user_id, kwargs)
+                pending[asyncio.ensure_future(attempt)] = (model, hedge)
+                return True
+            return False
+
+        if not launch(False):
+            raise LLMError(f"No {self.route} model available, every circuit is open")
+        loop = asyncio.get_running_loop()
+        first = next(iter(pending.values()))[0]
+        hedge_at = loop.time() + first.hedge_delay() if self.hedge else None
+        error = None
+        try:
+            while pending:
+                timeout = max(hedge_at - loop.time(), 0) if hedge_at is not None else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedge_at = None
+                    if self.hedges_in_flight < LLM_HEDGE_MAX_IN_FLIGHT and launch(True):
+                        self.hedges["launched"] += 1
+                        metrics.LLM_HEDGES.inc(self.route, "launched")
+                    continue
+                for task in done:
+                    _, hedge = pending.pop(task)
+                    try:
+                        result = task.result()
+                    except LLMError as exc:
+                        error = exc
+                        continue
+                    if hedge:
+                        self.hedges["won"] += 1
+                        metrics.LLM_HEDGES.inc(self.route, "won")
+                    return result
+                # Fall back to the next model unless an attempt is still running or we are out of slots
+                if not pending and not isinstance(error, LLMBusyError) and launch(False):
+                    hedge_at = None
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "hedging": self.hedge,
+            "hedges_in_flight": self.hedges_in_flight,
+            "hedges": dict(self.hedges),
+            "models": [model.stats() for model in self.models],
+        }
+
+
+_routers: dict = {}
+
+
+def get_router(route: str, default_model: str) -> Router:
+    """The process-wide router for ``route``, configured from ``LLM_<ROUTE>_MODELS``."""
+    router = _routers.get(route)
+    if router is None:
+        spec = os.getenv(f"LLM_{route.upper()}_MODELS") or default_model
+        router = _routers[route] = Router(route, parse_models(spec))
+    return router
+
+
+def stats() -> dict:
+    return {route: router.stats() for route, router in _routers.items()}
@@ -0,0 +1,327 @@
+"""Request, stage and database timings exposed in the Prometheus text format.
+
+A small in-process registry (counters, gauges and histograms with labels)
+rendered on ``GET /metrics``. ``MetricsMiddleware`` times every request by
+route template and keeps a per-request record in a context variable that
+``stage()`` timers and the SQLAlchemy query hooks add to. Context variables
+follow requests into the threadpool and into tasks, so stages and queries are
+attributed to the request that caused them. Each process has its own
+registry; scrape every API process.
+"""
+import functools
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+# Seconds; spans cache hits through slow model calls
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+TOKEN_BUCKETS = (250, 500, 1000, 1500, 2000, 3000, 4000, 6000, 8000, 12000, 16000, 32000, 64000)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, label_values) -> tuple:
+        if len(label_values) != len(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}")
+        return tuple(str(value) for value in label_values)
+
+    def collect(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._samples(key, value))
+        return lines
+
+    def _samples(self, key, value):
+        return [f"{self.name}{_labels(self.label_names, key)} {_number(value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *label_values, amount: float = 1.0):
+        key = self._key(label_values)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def inc(self, *label_values, amount: float = 1.0):
+        key = self._key(label_values)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, *label_values, amount: float = 1.0):
+        self.inc(*label_values, amount=-amount)
+
+    def set(self, value: float, *label_values):
+        key = self._key(label_values)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *label_values):
+        key = self._key(label_values)
+        index = bisect_left(self.buckets, value)  # first bucket with bound >= value
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def _samples(self, key, value):
+        counts, total = value
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            le = 'le="' + ("+Inf" if bound == float("inf") else _number(bound)) + '"'
+            lines.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {cumulative}")
+        lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {_number(total)}")
+        lines.append(f"{self.name}_count{_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+REQUEST_DURATION = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "Request latency by route template.", ("method", "route", "status")))
+REQUESTS_IN_FLIGHT = REGISTRY.register(Gauge("http_requests_in_flight", "Requests being handled."))
+REQUEST_QUERIES = REGISTRY.register(Histogram(
+    "http_request_db_queries", "Database queries issued per request.", ("route",), QUERY_COUNT_BUCKETS))
+STAGE_DURATION = REGISTRY.register(Histogram(
+    "app_stage_duration_seconds", "Time spent in instrumented stages.", ("stage",)))
+DB_QUERY_DURATION = REGISTRY.register(Histogram(
+    "db_query_duration_seconds", "Database statement latency by statement type.", ("operation",)))
+SLOW_REQUESTS = REGISTRY.register(Counter(
+    "http_slow_requests_total", "Requests slower than the profiling threshold.", ("route",)))
+PROMPT_INPUT_TOKENS = REGISTRY.register(Histogram(
+    "llm_prompt_input_tokens", "Estimated tokens of prompt inputs as extracted (raw) and as sent.",
+    ("prompt", "text"), TOKEN_BUCKETS))
+PROMPT_TOKENS_SAVED = REGISTRY.register(Counter(
+    "llm_prompt_tokens_saved_total", "Estimated prompt tokens removed by normalization and budgeting.", ("prompt",)))
+REVIEW_RUNS = REGISTRY.register(Counter(
+    "review_runs_total", "Reviews by what went to the model: the whole resume, changed sections, or nothing.",
+    ("mode",)))
+LLM_MODEL_LATENCY = REGISTRY.register(Histogram(
+    "llm_model_latency_seconds", "Latency of successful model calls by route and model.", ("route", "model")))
+LLM_MODEL_REQUESTS = REGISTRY.register(Counter(
+    "llm_model_requests_total", "Model call attempts by outcome (ok, error, timeout, cancelled, skipped).",
+    ("route", "model", "outcome")))
+LLM_MODEL_SLO_MISSED = REGISTRY.register(Counter(
+    "llm_model_slo_missed_total", "Successful model calls slower than the model's latency SLO.", ("route", "model")))
+LLM_CIRCUIT_OPEN = REGISTRY.register(Gauge(
+    "llm_circuit_open", "1 while a model is out of rotation after repeated failures.", ("route", "model")))
+LLM_HEDGES = REGISTRY.register(Counter(
+    "llm_hedges_total", "Hedged requests sent to the next model, and those that answered first.", ("route", "outcome")))
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+class RequestRecord:
+    """What one request spent its time on; stages are summed by name."""
+
+    __slots__ = ("queries", "db_seconds", "stages")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.stages = {}
+
+    def summary(self) -> str:
+        stages = ", ".join(f"{name}={seconds * 1000:.1f}ms" for name, seconds in sorted(
+            self.stages.items(), key=lambda item: -item[1]))
+        return f"{self.queries} queries ({self.db_seconds * 1000:.1f}ms){', ' + stages if stages else ''}"
+
+
+_current: ContextVar[RequestRecord | None] = ContextVar("request_record", default=None)
+
+
+def _record_stage(name: str, elapsed: float):
+    STAGE_DURATION.observe(elapsed, name)
+    record = _current.get()
+    if record is not None:
+        record.stages[name] = record.stages.get(name, 0.0) + elapsed
+
+
+@contextmanager
+def stage(name: str):
+    """Time a block as stage ``name``."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record_stage(name, time.perf_counter() - started)
+
+
+def timed(name: str):
+    """Decorator form of ``stage`` for plain and async functions."""
+    def decorate(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    _record_stage(name, time.perf_counter() - started)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _record_stage(name, time.perf_counter() - started)
+        return wrapper
+    return decorate
+
+
+def _query_started(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _query_finished(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+    DB_QUERY_DURATION.observe(elapsed, operation)
+    record = _current.get()
+    if record is not None:
+        record.queries += 1
+        record.db_seconds += elapsed
+
+
+def _query_failed(context):
+    # after_cursor_execute does not run for a failed statement, so its start time is dropped here
+    started = context.connection.info.get("query_started") if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+def instrument_engine(engine):
+    """Count and time every statement ``engine`` executes."""
+    if not event.contains(engine, "before_cursor_execute", _query_started):
+        event.listen(engine, "before_cursor_execute", _query_started)
+        event.listen(engine, "after_cursor_execute", _query_finished)
+        event.listen(engine, "handle_error", _query_failed)
+
+
+def route_template(scope) -> str:
+    """``/resume/{resume_id}`` for ``/resume/42``: labels by template keep cardinality bounded.
+
+    Rebuilt from the matched path parameters because included routers do not
+    expose their prefixed path the same way across FastAPI versions.
+    """
+    if scope.get("route") is None:
+        return "unmatched"
+    pending = [(str(value), name) for name, value in (scope.get("path_params") or {}).items()]
+    segments = []
+    for segment in scope["path"].split("/"):
+        if pending and segment == pending[0][0]:
+            segments.append("{" + pending.pop(0)[1] + "}")
+        else:
+            segments.append(segment)
+    return "/".join(segments)
+
+
+class MetricsMiddleware:
+    """Times each HTTP request and hands slow ones to the profiler, if one is configured."""
+
+    def __init__(self, app, profiler=None):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        record = RequestRecord()
+        token = _current.set(record)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        window = self.profiler.begin() if self.profiler is not None else None
+        REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            REQUESTS_IN_FLIGHT.dec()
+            _current.reset(token)
+            route = route_template(scope)
+            REQUEST_DURATION.observe(elapsed, scope["method"], route, status)
+            REQUEST_QUERIES.observe(record.queries, route)
+            if window is not None:
+                label = f"{scope['method']} {route}"
+                if await self.profiler.end(window, elapsed, label, record):
+                    SLOW_REQUESTS.inc(route)
@@ -1,12 +1,138 @@
+import asyncio
+import hashlib
 import io
+import multiprocessing
+import os
+import signal
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pdfminer.high_level import extract_text
 from docx import Document
+from app.services import metrics
+from app.utils.cache import LRUCache
 
-def parse_resume_file(filename: str, content: bytes) -> str:
+PARSER_MAX_WORKERS = int(os.getenv("PARSER_MAX_WORKERS", str(min(4, os.cpu_count() or 1))))
+PARSER_TIMEOUT_SECONDS = float(os.getenv("PARSER_TIMEOUT_SECONDS", "20"))
+PARSER_MAX_PAGES = int(os.getenv("PARSER_MAX_PAGES", "10"))
+PARSER_CACHE_SIZE = int(os.getenv("PARSER_CACHE_SIZE", "256"))
+# A worker still busy this long after its own deadline is stuck outside Python and the pool is recycled
+PARSER_KILL_GRACE_SECONDS = float(os.getenv("PARSER_KILL_GRACE_SECONDS", "5"))
+
+
+class ParseTimeout(Exception):
+    pass
+
+
+_executor: ProcessPoolExecutor | None = None
+# Pools terminated because a parse hung; their other in-flight parses are resubmitted for free
+_aborted = weakref.WeakSet()
+_cache = LRUCache(maxsize=PARSER_CACHE_SIZE)
+
+def parse_resume_file(filename: str, content, max_pages: int = PARSER_MAX_PAGES) -> str:
+    """``content`` is the raw bytes, or the path of a spooled upload (read straight from disk)."""
+    source = content if isinstance(content, str) else io.BytesIO(content)
     if filename.endswith(".pdf"):
-        return extract_text(io.BytesIO(content))
+        return extract_text(source, maxpages=max_pages)
     elif filename.endswith(".docx"):
-        doc = Document(io.BytesIO(content))
+        doc = Document(source)
         return "\n".join([para.text for para in doc.paragraphs])
     else:
-        return ""
\ No newline at end of file
+        return ""
+
+def _deadline_reached(signum, frame):
+    raise ParseTimeout()
+
+def _parse_with_deadline(filename: str, content, timeout: float) -> str:
+    """Runs in a pool worker, which stops its own parse at the deadline so the other workers keep going."""
+    if not hasattr(signal, "setitimer"):
+        return parse_resume_file(filename, content)
+    previous = signal.signal(signal.SIGALRM, _deadline_reached)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return parse_resume_file(filename, content)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+def content_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn, not fork: the API process has threads (uvicorn, DB pool) that must not be forked
+        _executor = ProcessPoolExecutor(
+            max_workers=PARSER_MAX_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+def shutdown_executor(kill: bool = False):
+    global _executor
+    executor, _executor = _executor, None
+    if executor is None:
+        return
+    if kill:
+        for process in list(getattr(executor, "_processes", {}).values()):
+            process.terminate()
+    # Queued parses fail with BrokenProcessPool rather than being cancelled, so their callers resubmit them
+    executor.shutdown(wait=not kill)
+
+def _cache_key(filename: str, sha256: str) -> str:
+    return f"{os.path.splitext(filename)[1].lower()}:{sha256}"
+
+def get_cached_text(filename: str, sha256: str):
+    return _cache.get(_cache_key(filename, sha256))
+
+def cache_parsed_text(filename: str, sha256: str, text: str):
+    _cache.set(_cache_key(filename, sha256), text)
+
+def _kill_if_stuck(executor: ProcessPoolExecutor, future):
+    # The worker's own deadline did not fire (stuck in C code, or no SIGALRM on this platform)
+    if future.running() and executor is _executor:
+        _aborted.add(executor)
+        shutdown_executor(kill=True)
+
+async def _run_in_pool(filename: str, content) -> str:
+    retried = False
+    while True:
+        executor = get_executor()
+        future = executor.submit(_parse_with_deadline, filename, content, PARSER_TIMEOUT_SECONDS)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # Timed out here: a queued parse is cancelled, a running one gets until its deadline
+            if future.running():
+                asyncio.get_running_loop().call_later(
+                    PARSER_TIMEOUT_SECONDS + PARSER_KILL_GRACE_SECONDS, _kill_if_stuck, executor, future)
+            raise
+        except BrokenProcessPool:
+            if executor is _executor:
+                # A worker crashed; replace the pool for everyone
+                shutdown_executor(kill=True)
+            # A pool killed because of another upload's hung parse does not use up this upload's retry
+            if executor not in _aborted:
+                if retried:
+                    raise
+                retried = True
+
+@metrics.timed("parse")
+async def parse_resume_file_async(filename: str, content, sha256: str | None = None) -> str:
+    """Parse in the process pool, reusing the result for byte-identical uploads.
+
+    ``content`` is bytes or a spooled-upload path; pass ``sha256`` for paths.
+    """
+    sha256 = sha256 or content_hash(content)
+    cached = get_cached_text(filename, sha256)
+    if cached is not None:
+        return cached
+    try:
+        text = await asyncio.wait_for(_run_in_pool(filename, content), PARSER_TIMEOUT_SECONDS)
+    except (asyncio.TimeoutError, ParseTimeout):
+        raise ParseTimeout(f"Parsing {filename} took longer than {PARSER_TIMEOUT_SECONDS:g}s")
+    cache_parsed_text(filename, sha256, text)
+    return text
+
+def stats() -> dict:
+    return {"cache": _cache.stats(), "max_workers": PARSER_MAX_WORKERS}
@@ -0,0 +1,130 @@
+"""Text layout for the review PDFs.
+
+Glyph widths are looked up once per font and size and cached, so measuring a
+word is a few dictionary lookups and wrapping a paragraph is a single pass
+over its words. ``PageWriter`` owns the cursor: every line checks for room
+*before* it is drawn, and each new page gets the same running header, so
+page breaks look the same wherever they fall. Several reviews can be written
+through one writer to produce a single report in one pass.
+"""
+from functools import lru_cache
+
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfgen import canvas
+
+BODY_FONT = "Helvetica"
+BOLD_FONT = "Helvetica-Bold"
+MARGIN = 40
+HEADER_SIZE = 9
+
+
+class FontMetrics:
+    """Per-glyph advance widths (in points) for one font at one size."""
+
+    def __init__(self, font: str, size: float):
+        self.font = font
+        self.size = size
+        face = pdfmetrics.getFont(font)
+        self._measure = lambda ch: face.stringWidth(ch, size)
+        self._widths = {chr(code): self._measure(chr(code)) for code in range(32, 256)}
+
+    def width(self, text: str) -> float:
+        widths = self._widths
+        total = 0.0
+        for ch in text:
+            w = widths.get(ch)
+            if w is None:
+                w = widths[ch] = self._measure(ch)
+            total += w
+        return total
+
+
+@lru_cache(maxsize=32)
+def metrics(font: str, size: float) -> FontMetrics:
+    return FontMetrics(font, size)
+
+
+def wrap(text: str, font_metrics: FontMetrics, max_width: float) -> list[str]:
+    """Greedy word wrap in one pass; a word wider than the line gets a line of its own."""
+    space = font_metrics.width(" ")
+    lines = []
+    for paragraph in text.splitlines():
+        words = []
+        line_width = 0.0
+        for word in paragraph.split():
+            word_width = font_metrics.width(word)
+            if words and line_width + space + word_width > max_width:
+                lines.append(" ".join(words))
+                words, line_width = [], 0.0
+            line_width += word_width + (space if words else 0.0)
+            words.append(word)
+        if words:
+            lines.append(" ".join(words))
+    return lines
+
+
+class PageWriter:
+    """Top-down writer over a reportlab canvas with consistent page breaks."""
+
+    def __init__(self, output, title: str, pagesize=letter, margin: float = MARGIN):
+        self.canvas = canvas.Canvas(output, pagesize=pagesize)
+        self.width, self.height = pagesize
+        self.margin = margin
+        self.title = title
+        self.page = 0
+        self._font = None
+        self._new_page()
+
+    @property
+    def text_width(self) -> float:
+        return self.width - 2 * self.margin
+
+    def _new_page(self):
+        if self.page:
+            self.canvas.showPage()
+            self._font = None  # reportlab resets the font on a new page
+        self.page += 1
+        self.set_font(BODY_FONT, HEADER_SIZE)
+        top = self.height - self.margin / 2
+        self.canvas.drawString(self.margin, top, self.title)
+        self.canvas.drawRightString(self.width - self.margin, top, f"Page {self.page}")
+        self.y = self.height - self.margin
+
+    def set_font(self, font: str, size: float):
+        if self._font != (font, size):
+            self.canvas.setFont(font, size)
+            self._font = (font, size)
+
+    def ensure(self, height: float):
+        """Start a new page unless ``height`` points still fit above the bottom margin."""
+        if self.y - height < self.margin:
+            self._new_page()
+
+    def space(self, height: float):
+        self.y -= height
+
+    def line(self, text: str, font: str = BODY_FONT, size: float = 12, leading: float = 18, indent: float = 0):
+        self.ensure(size)
+        self.set_font(font, size)
+        self.canvas.drawString(self.margin + indent, self.y, text)
+        self.y -= leading
+
+    def paragraph(self, text: str, font: str = BODY_FONT, size: float = 12, leading: float = 15, indent: float = 0):
+        for text_line in wrap(text, metrics(font, size), self.text_width - indent):
+            self.line(text_line, font, size, leading, indent)
+
+    def save(self):
+        self.canvas.save()
+
+
+def write_review(writer: PageWriter, filename: str, score, suggestions: list, summary: str):
+    writer.ensure(16 + 25 + 20)  # keep the heading with the start of its body
+    writer.line(f"AI Resume Review for: {filename}", BOLD_FONT, 16, leading=30)
+    writer.line(f"Score: {score if score is not None else 'N/A'}", leading=25)
+    writer.line("Suggestions:", leading=20)
+    for idx, suggestion in enumerate(suggestions, 1):
+        writer.paragraph(f"{idx}. {suggestion}", leading=18, indent=20)
+    writer.space(10)
+    writer.line("Summary:", leading=20)
+    writer.paragraph(summary or "", leading=15, indent=20)
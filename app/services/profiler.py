@@ -0,0 +1,100 @@
+"""Opt-in sampling profiler for slow requests.
+
+Set ``SLOW_REQUEST_PROFILE_SECONDS`` to turn it on. While any request is in
+flight a background thread samples the stacks of every other thread each
+``SLOW_REQUEST_PROFILE_INTERVAL`` seconds; each request collects the samples
+taken during its lifetime. When a request ends over the threshold, its samples
+are written to ``SLOW_REQUEST_PROFILE_DIR`` in collapsed-stack format
+(``frame;frame;frame count``, readable by flamegraph.pl and speedscope) and a
+warning with its stage and query breakdown is logged. The event loop and the
+threadpool are shared, so samples from concurrent requests overlap; profile
+under low concurrency for a clean picture.
+"""
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+from fastapi.concurrency import run_in_threadpool
+
+SLOW_REQUEST_PROFILE_SECONDS = os.getenv("SLOW_REQUEST_PROFILE_SECONDS")
+SLOW_REQUEST_PROFILE_INTERVAL = float(os.getenv("SLOW_REQUEST_PROFILE_INTERVAL", "0.005"))
+SLOW_REQUEST_PROFILE_DIR = os.getenv("SLOW_REQUEST_PROFILE_DIR", "slow_requests")
+MAX_STACK_DEPTH = 64
+
+logger = logging.getLogger(__name__)
+
+
+def _collapsed(frame) -> str:
+    names = []
+    while frame is not None and len(names) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class SamplingProfiler:
+    def __init__(self, threshold: float, interval: float = SLOW_REQUEST_PROFILE_INTERVAL,
+                 directory: str = SLOW_REQUEST_PROFILE_DIR):
+        self.threshold = threshold
+        self.interval = interval
+        self.directory = directory
+        self._windows = {}  # id -> Counter of collapsed stacks
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._thread = None
+
+    def begin(self) -> Counter:
+        window = Counter()
+        with self._lock:
+            self._windows[id(window)] = window
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="slow-request-profiler", daemon=True)
+                self._thread.start()
+            self._wake.notify()
+        return window
+
+    async def end(self, window: Counter, elapsed: float, label: str, record=None) -> bool:
+        """Stop sampling for one request; dump its profile if it was slow. Returns whether it was."""
+        with self._lock:
+            self._windows.pop(id(window), None)
+        if elapsed < self.threshold:
+            return False
+        # File I/O stays off the event loop
+        path = await run_in_threadpool(self._dump, window, label, elapsed)
+        logger.warning("Slow request %s took %.0fms: %s; %d samples in %s", label, elapsed * 1000,
+                       record.summary() if record is not None else "", sum(window.values()), path)
+        return True
+
+    def _run(self):
+        me = threading.get_ident()
+        while True:
+            with self._lock:
+                while not self._windows:
+                    self._wake.wait()
+            stacks = [_collapsed(frame) for ident, frame in sys._current_frames().items() if ident != me]
+            with self._lock:
+                # A window that ended meanwhile is gone, so it is never written to while being dumped
+                for window in self._windows.values():
+                    window.update(stacks)
+            time.sleep(self.interval)
+
+    def _dump(self, window: Counter, label: str, elapsed: float) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", label).strip("_")[:80]
+        path = os.path.join(self.directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{int(elapsed * 1000)}ms-{slug}.folded")
+        with open(path, "w") as f:
+            for stack, count in window.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+
+def from_env():
+    """The profiler configured by the environment, or None when it is off."""
+    if not SLOW_REQUEST_PROFILE_SECONDS:
+        return None
+    return SamplingProfiler(float(SLOW_REQUEST_PROFILE_SECONDS))
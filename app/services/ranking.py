@@ -0,0 +1,103 @@
+"""BM25 ranking of resumes against job descriptions, with no model calls.
+
+Documents are turned into one sparse term-weight matrix; a batch of queries
+is scored against all of them with a single sparse product, so ranking one
+resume against hundreds of postings (or one posting against thousands of
+resumes) is a matrix multiply rather than a loop of pairwise comparisons.
+"""
+from collections import Counter
+
+import numpy as np
+from scipy import sparse
+
+from app.services import keywords
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+def terms(text: str) -> list[str]:
+    return [t for t in (keywords.fold(tok) for tok in keywords.tokenize(text or "")) if t not in keywords.STOPWORDS]
+
+
+class BM25Index:
+    def __init__(self, documents: list[str], k1: float = BM25_K1, b: float = BM25_B):
+        self.vocabulary = {}
+        indptr, indices, counts = [0], [], []
+        for document in documents:
+            for term, count in Counter(terms(document)).items():
+                indices.append(self.vocabulary.setdefault(term, len(self.vocabulary)))
+                counts.append(count)
+            indptr.append(len(indices))
+        shape = (len(documents), len(self.vocabulary))
+        tf = sparse.csr_matrix(
+            (np.asarray(counts, dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr)),
+            shape=shape,
+        )
+        df = np.bincount(tf.indices, minlength=shape[1])
+        self.idf = np.log1p((shape[0] - df + 0.5) / (df + 0.5)).astype(np.float32)
+        lengths = np.asarray(tf.sum(axis=1)).ravel()
+        norm = k1 * (1 - b + b * lengths / max(lengths.mean(), 1.0)) if shape[0] else lengths
+        # Saturated, length-normalised tf times idf, computed once per document term
+        row_norm = np.repeat(norm, np.diff(tf.indptr)).astype(np.float32)
+        tf.data = tf.data * (k1 + 1) / (tf.data + row_norm) * self.idf[tf.indices]
+        self.weights = tf.T.tocsr()  # terms x documents
+
+    def __len__(self) -> int:
+        return self.weights.shape[1]
+
+    def query_matrix(self, queries: list[str]):
+        indptr, indices = [0], []
+        for query in queries:
+            known = {self.vocabulary[t] for t in terms(query) if t in self.vocabulary}
+            indices.extend(sorted(known))
+            indptr.append(len(indices))
+        data = np.ones(len(indices), dtype=np.float32)
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(queries), len(self.vocabulary)))
+
+    def score(self, queries: list[str]) -> np.ndarray:
+        """Dense (queries x documents) score matrix."""
+        return (self.query_matrix(queries) @ self.weights).toarray()
+
+
+def top_k(scores: np.ndarray, k: int) -> list[int]:
+    """Indices of the k highest scores, best first; zero scores are dropped."""
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return []
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    ordered = candidates[np.argsort(-scores[candidates], kind="stable")]
+    return [int(i) for i in ordered if scores[i] > 0]
+
+
+def rank(query: str, documents: list[str], k: int = 10) -> list[tuple[int, float]]:
+    """(document index, score) for the k best ``documents`` for ``query``."""
+    if not documents:
+        return []
+    scores = BM25Index(documents).score([query])[0]
+    return [(i, round(float(scores[i]), 4)) for i in top_k(scores, k)]
+
+
+def _split(wanted: list[str], have: set) -> dict:
+    return {
+        "matched_terms": [s for s in wanted if s in have],
+        "missing_terms": [s for s in wanted if s not in have],
+    }
+
+
+def rank_jobs(resume_text: str, job_descriptions: list[str], k: int = 10) -> list[dict]:
+    """Best postings for one resume, with each posting's skills split by what the resume covers."""
+    have = set(keywords.extract_keywords(resume_text))
+    return [
+        {"index": i, "score": score, **_split(keywords.extract_keywords(job_descriptions[i]), have)}
+        for i, score in rank(resume_text, job_descriptions, k)
+    ]
+
+
+def rank_resumes(job_description: str, resumes: list[str], k: int = 10) -> list[dict]:
+    """Best resumes for one posting, with the posting's skills split per resume."""
+    wanted = keywords.extract_keywords(job_description)
+    return [
+        {"index": i, "score": score, **_split(wanted, set(keywords.extract_keywords(resumes[i])))}
+        for i, score in rank(job_description, resumes, k)
+    ]
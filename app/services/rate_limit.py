@@ -0,0 +1,130 @@
+import math
+import os
+import threading
+import time
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select
+from app.db.session import engine
+from app.models.rate_limit import RateLimitBucket
+from app.services import metrics
+
+# "sql" shares buckets between processes and API replicas through the database and survives restarts;
+# "memory" is per process, so N workers allow N times the limit
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "sql")
+
+
+def _window(timestamp: float, period: float) -> int:
+    # Windows are aligned to the epoch, so a one-day period resets at UTC midnight
+    return int(timestamp // period)
+
+
+def _refill(tokens: float, updated_at: float, now: float, capacity: int, period: float) -> float:
+    """The whole budget comes back at the start of each window, not gradually."""
+    return capacity if _window(now, period) != _window(updated_at, period) else tokens
+
+
+def _retry_after(now: float, period: float) -> float:
+    return (_window(now, period) + 1) * period - now
+
+
+class InMemoryTokenBucket:
+    """Buckets in a dict; reserve() is a few float ops under a lock."""
+
+    blocking = False
+
+    def __init__(self, max_keys: int = 100_000):
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self.max_keys = max_keys
+
+    def reserve(self, key: str, capacity: int, period: float):
+        """Take one token. Returns (allowed, seconds until a token is available)."""
+        now = time.time()
+        with self._lock:
+            tokens, updated_at, _, _ = self._buckets.get(key, (capacity, now, capacity, period))
+            tokens = _refill(tokens, updated_at, now, capacity, period)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            # Each bucket keeps its own limit, so pruning never applies one scope's limit to another's buckets
+            self._buckets[key] = (tokens, now, capacity, period)
+            if len(self._buckets) > self.max_keys:
+                self._prune(now)
+        return allowed, 0.0 if allowed else _retry_after(now, period)
+
+    def _prune(self, now: float):
+        # A full bucket, or one from an earlier window, is the same as no bucket at all
+        for key, (tokens, updated_at, capacity, period) in list(self._buckets.items()):
+            if _refill(tokens, updated_at, now, capacity, period) >= capacity:
+                del self._buckets[key]
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class SQLTokenBucket:
+    """Token buckets in the rate_limit_buckets table, one row per key.
+
+    The row is created if missing, then locked (SELECT ... FOR UPDATE on
+    Postgres; SQLite serializes writers) so concurrent reservations from any
+    replica are applied one at a time.
+    """
+
+    blocking = True
+
+    def reserve(self, key: str, capacity: int, period: float):
+        now = time.time()
+        with Session(engine) as session:
+            connection = session.connection()
+            insert = postgresql.insert if connection.dialect.name == "postgresql" else sqlite.insert
+            session.execute(
+                insert(RateLimitBucket.__table__)
+                .values(key=key, tokens=capacity, updated_at=now)
+                .on_conflict_do_nothing(index_elements=["key"])
+            )
+            bucket = session.exec(
+                select(RateLimitBucket).where(RateLimitBucket.key == key).with_for_update()
+            ).one()
+            tokens = _refill(bucket.tokens, bucket.updated_at, now, capacity, period)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            bucket.tokens = tokens
+            bucket.updated_at = now
+            session.add(bucket)
+            session.commit()
+        return allowed, 0.0 if allowed else _retry_after(now, period)
+
+
+_limiter = None
+
+def get_rate_limiter():
+    global _limiter
+    if _limiter is None:
+        _limiter = SQLTokenBucket() if RATE_LIMIT_BACKEND == "sql" else InMemoryTokenBucket()
+    return _limiter
+
+
+async def enforce_rate_limit(scope: str, limit: int, user_id: int, period: float = 86400):
+    """Spend one of ``limit`` requests per ``period`` seconds (per UTC day by default) for the user, or raise 429.
+
+    Called by the route once it knows the request is valid (the resume exists
+    and is the user's), so a 404 does not use up the budget. The token is
+    still taken before the work starts, so a burst is cut off at the limit.
+    """
+    limiter = get_rate_limiter()
+    key = f"{scope}:{user_id}"
+    with metrics.stage("rate_limit"):
+        if limiter.blocking:
+            allowed, retry_after = await run_in_threadpool(limiter.reserve, key, limit, period)
+        else:
+            allowed, retry_after = limiter.reserve(key, limit, period)
+    if not allowed:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Rate limit reached: {limit} {scope} requests per {period / 3600:g}h",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
@@ -0,0 +1,262 @@
+"""Normalized, sectioned resume text and token-bounded prompt inputs.
+
+Extracted text is noisy: pdfminer leaves a blank line between paragraphs,
+form feeds between pages, page numbers and the same header or footer on every
+page. ``segment`` cleans that up and splits the text into sections by their
+headings; it runs once at upload and the result is stored on the resume.
+Prompts are then filled section by section, most useful first, until the
+token budget runs out, instead of pasting the whole text.
+
+Token counts are a local estimate (about four characters per token, at least
+one per word, symbol run or line break), close enough to size prompts without shipping
+the model's tokenizer.
+"""
+import hashlib
+import os
+import re
+import unicodedata
+from collections import Counter
+
+from app.services import metrics
+
+PROMPT_RESUME_TOKEN_BUDGET = int(os.getenv("PROMPT_RESUME_TOKEN_BUDGET", "2500"))
+PROMPT_JOB_DESC_TOKEN_BUDGET = int(os.getenv("PROMPT_JOB_DESC_TOKEN_BUDGET", "1000"))
+# A section cut to fewer tokens than this is dropped instead
+MIN_PARTIAL_SECTION_TOKENS = 40
+# A line at a page edge on this many pages (and on all pages but one) is a page header or footer
+REPEATED_LINE_THRESHOLD = 2
+# Lines at the top and at the bottom of a page that may be a header or footer
+PAGE_EDGE_LINES = 2
+MAX_HEADING_LENGTH = 50
+TRUNCATION_MARK = "[...]"
+
+SECTION_HEADINGS = {
+    "summary": ("summary", "professional summary", "profile", "professional profile", "about me", "about",
+                "objective", "career objective", "overview"),
+    "experience": ("experience", "work experience", "professional experience", "employment", "employment history",
+                   "work history", "career history", "relevant experience"),
+    "education": ("education", "academic background", "education and training", "qualifications"),
+    "skills": ("skills", "technical skills", "core skills", "key skills", "skills and tools", "competencies",
+               "core competencies", "technologies", "tech stack", "tools"),
+    "projects": ("projects", "personal projects", "selected projects", "side projects", "open source"),
+    "certifications": ("certifications", "certificates", "licenses and certifications", "courses", "training"),
+    "awards": ("awards", "honors", "honors and awards", "achievements"),
+    "publications": ("publications", "talks", "publications and talks"),
+    "languages": ("languages",),
+    "interests": ("interests", "hobbies", "activities", "volunteering", "volunteer experience"),
+}
+_HEADINGS = {alias: name for name, aliases in SECTION_HEADINGS.items() for alias in aliases}
+
+# Text before the first heading: name and contact details
+HEADER = "header"
+REVIEW_PRIORITY = ("header", "summary", "experience", "skills", "projects", "education", "certifications",
+                   "awards", "publications", "languages", "interests")
+MATCH_PRIORITY = ("skills", "experience", "summary", "projects", "certifications", "education", "header",
+                  "awards", "publications", "languages", "interests")
+
+_TOKEN_PIECE = re.compile(r"\w+|[^\w\s]+|\n+")
+_SPACES = re.compile(r"[ \t\u00a0\u2000-\u200b\u3000]+")
+_CONTROL = re.compile(r"[\x00-\x08\x0b\x0e-\x1f\x7f]")
+_BULLET = re.compile(r"^[\u2022\u25aa\u25cf\u25e6\u2023\u2043\u25a0\uf0b7*\u00b7]\s*")
+_PAGE_NUMBER = re.compile(r"(page\s*)?\d{1,3}(\s*(of|/)\s*\d{1,3})?|[-–]\s*\d{1,3}\s*[-–]", re.IGNORECASE)
+
+
+def estimate_tokens(text: str) -> int:
+    return sum((len(piece) + 3) // 4 for piece in _TOKEN_PIECE.findall(text))
+
+
+def _clean_lines(page: str) -> list[str]:
+    lines = []
+    for line in re.split(r"\r\n|[\r\n\v]", page):
+        line = _SPACES.sub(" ", line).strip()
+        if not line or _PAGE_NUMBER.fullmatch(line):
+            continue
+        lines.append(_BULLET.sub("- ", line))
+    return lines
+
+
+def _edges(lines: list[str]) -> list[tuple[int, str]]:
+    """``(index, "top" or "bottom")`` for the lines where a header or footer would sit."""
+    count = min(PAGE_EDGE_LINES, len(lines))
+    return [(i, "top") for i in range(count)] + [(len(lines) - 1 - i, "bottom") for i in range(count)]
+
+
+def normalize_text(text: str) -> list[str]:
+    """Non-empty, whitespace-collapsed lines, without page numbers and repeated headers or footers.
+
+    Pages are split on form feeds. A line at the top (or bottom) of nearly
+    every page is a header (or footer) and only its first copy is kept; the
+    same line anywhere else, like a job title held twice, stays.
+    """
+    # NFKC also folds ligatures (fi, fl) and full-width characters from PDF fonts
+    text = _CONTROL.sub("", unicodedata.normalize("NFKC", text))
+    pages = [_clean_lines(page) for page in text.split("\f")]
+    pages = [lines for lines in pages if lines]
+    # A different first page (no header on it) is common, so one page may miss the line
+    threshold = max(REPEATED_LINE_THRESHOLD, len(pages) - 1)
+    counts = Counter()
+    for lines in pages:
+        counts.update({(edge, lines[i]) for i, edge in _edges(lines)})
+    repeated = [{i for i, edge in _edges(lines) if counts[edge, lines[i]] >= threshold} for lines in pages]
+    seen = set()
+    kept = []
+    for lines, edges in zip(pages, repeated):
+        for i, line in enumerate(lines):
+            if i in edges and _heading(line) is None:
+                if line in seen:
+                    continue
+                seen.add(line)
+            kept.append(line)
+    return kept
+
+
+def _heading(line: str):
+    if len(line) > MAX_HEADING_LENGTH:
+        return None
+    key = re.sub(r"[^a-z ]+", " ", line.lower().replace("&", " and "))
+    return _HEADINGS.get(" ".join(key.split()))
+
+
+def split_sections(lines: list[str]) -> list[dict]:
+    sections = []
+    current = {"name": HEADER, "title": "", "lines": []}
+    for line in lines:
+        name = _heading(line)
+        if name is not None:
+            if current["lines"]:
+                sections.append(current)
+            current = {"name": name, "title": line.rstrip(":"), "lines": []}
+        else:
+            current["lines"].append(line)
+    if current["lines"]:
+        sections.append(current)
+    return [_section(s["name"], s["title"], "\n".join(s["lines"])) for s in sections]
+
+
+def _render(title: str, text: str) -> str:
+    return f"{title}\n{text}" if title else text
+
+
+def _section(name: str, title: str, text: str) -> dict:
+    return {"name": name, "title": title, "text": text, "tokens": estimate_tokens(_render(title, text))}
+
+
+def segment(text: str) -> list[dict]:
+    """What is stored on ``Resume.sections``: ``[{name, title, text, tokens}]`` in document order."""
+    return split_sections(normalize_text(text))
+
+
+def truncate_to_tokens(text: str, budget: int) -> str:
+    """Whole lines of ``text`` up to ``budget`` tokens, marked when something was cut."""
+    if estimate_tokens(text) <= budget:
+        return text
+    # The mark goes on a line of its own
+    budget -= estimate_tokens(TRUNCATION_MARK) + 1
+    kept = []
+    for line in text.split("\n"):
+        # Every line after the first also costs its line break
+        budget -= 1 if kept else 0
+        tokens = estimate_tokens(line)
+        if tokens > budget:
+            words = []
+            for word in line.split(" "):
+                tokens = estimate_tokens(word)
+                if tokens > budget:
+                    break
+                words.append(word)
+                budget -= tokens
+            if words:
+                kept.append(" ".join(words))
+            break
+        kept.append(line)
+        budget -= tokens
+    kept.append(TRUNCATION_MARK)
+    return "\n".join(kept)
+
+
+def select_sections(sections: list[dict], budget: int, priority=REVIEW_PRIORITY, labels=None) -> list[tuple]:
+    """``(index, block, whole)`` for the sections that fit ``budget``, in document order.
+
+    Sections are chosen by ``priority``; those not in it come last, and the
+    first one that does not fit whole is cut down to the remaining budget.
+    With ``labels``, each block starts with ``[label]`` so the model can refer to it.
+    """
+    rank = {name: i for i, name in enumerate(priority)}
+    order = sorted(range(len(sections)), key=lambda i: (rank.get(sections[i]["name"], len(priority)), i))
+    chosen = {}
+    remaining = budget
+    for i in order:
+        section = sections[i]
+        prefix = f"[{labels[i]}]\n" if labels is not None else ""
+        # The label, and the blank line between sections
+        overhead = estimate_tokens(prefix) + 1
+        if section["tokens"] + overhead <= remaining:
+            chosen[i] = (prefix + _render(section["title"], section["text"]), True)
+            remaining -= section["tokens"] + overhead
+            continue
+        available = remaining - overhead - estimate_tokens(_render(section["title"], ""))
+        if available >= MIN_PARTIAL_SECTION_TOKENS:
+            chosen[i] = (prefix + _render(section["title"], truncate_to_tokens(section["text"], available)), False)
+            remaining = 0
+    return [(i, *chosen[i]) for i in sorted(chosen)]
+
+
+def fit_sections(sections: list[dict], budget: int, priority=REVIEW_PRIORITY, labels=None) -> str:
+    return "\n\n".join(block for _, block, _ in select_sections(sections, budget, priority, labels))
+
+
+def sections_of(resume) -> list[dict]:
+    # Rows stored before sections existed are segmented on the fly
+    return resume.sections if resume.sections is not None else segment(resume.content)
+
+
+def resume_for_prompt(resume, budget: int = PROMPT_RESUME_TOKEN_BUDGET, priority=REVIEW_PRIORITY) -> str:
+    return fit_sections(sections_of(resume), budget, priority)
+
+
+def section_keys(sections: list[dict]) -> list[str]:
+    """Ids that stay put between versions: ``experience``, then ``experience-2`` for a second one."""
+    seen = Counter()
+    keys = []
+    for section in sections:
+        seen[section["name"]] += 1
+        count = seen[section["name"]]
+        keys.append(section["name"] if count == 1 else f"{section['name']}-{count}")
+    return keys
+
+
+def section_hash(section: dict) -> str:
+    return hashlib.sha256(_render(section["title"], section["text"]).encode("utf-8")).hexdigest()[:16]
+
+
+def diff_sections(previous: list[dict], current: list[dict]) -> dict:
+    """Section-level diff of two versions, matched by key.
+
+    Every current section is ``added``, ``changed`` or ``unchanged``; keys
+    that only the previous version has are listed as ``removed``.
+    """
+    before = {key: section_hash(section) for key, section in zip(section_keys(previous), previous)}
+    keys = section_keys(current)
+    result = []
+    for key, section in zip(keys, current):
+        if key not in before:
+            status = "added"
+        elif before[key] == section_hash(section):
+            status = "unchanged"
+        else:
+            status = "changed"
+        result.append({"key": key, "name": section["name"], "title": section["title"],
+                       "tokens": section["tokens"], "status": status})
+    return {"sections": result, "removed": [key for key in before if key not in set(keys)]}
+
+
+def job_description_for_prompt(job_desc: str, budget: int = PROMPT_JOB_DESC_TOKEN_BUDGET) -> str:
+    return truncate_to_tokens("\n".join(normalize_text(job_desc)), budget)
+
+
+def record_reduction(prompt: str, raw_text: str, prompt_text: str):
+    """Count what budgeting saved for one prompt kind (``review``, ``match``)."""
+    raw, sent = estimate_tokens(raw_text), estimate_tokens(prompt_text)
+    metrics.PROMPT_INPUT_TOKENS.observe(raw, prompt, "raw")
+    metrics.PROMPT_INPUT_TOKENS.observe(sent, prompt, "sent")
+    metrics.PROMPT_TOKENS_SAVED.inc(prompt, amount=max(raw - sent, 0))
@@ -1,6 +1,5 @@
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-import os
+from app.services import metrics
+from app.services.pdf_layout import PageWriter, write_review
 
 def ensure_list(obj):
     if isinstance(obj, list):
@@ -14,56 +13,23 @@ def ensure_list(obj):
         return [s.strip() for s in re.split(r"[\n;]", obj) if s.strip()]
     return []
 
-def wrap_text(text, font, font_size, max_width, canvas_obj):
-    """Wrap text for PDF based on actual string width in points."""
-    lines = []
-    for paragraph in text.splitlines():
-        line = ''
-        for word in paragraph.split():
-            test_line = f"{line} {word}".strip()
-            if canvas_obj.stringWidth(test_line, font, font_size) <= max_width:
-                line = test_line
-            else:
-                if line:
-                    lines.append(line)
-                line = word
-        if line:
-            lines.append(line)
-    return lines
+@metrics.timed("pdf_render")
+def generate_review_pdf(filename, score, suggestions, summary, output):
+    """Render one review; ``output`` is a path or a writable binary file object."""
+    writer = PageWriter(output, title=f"AI Resume Review - {filename}")
+    write_review(writer, filename, score, ensure_list(suggestions), summary)
+    writer.save()
 
-def generate_review_pdf(resume, score, suggestions, summary, pdf_path):
-    suggestions = ensure_list(suggestions)
-    c = canvas.Canvas(pdf_path, pagesize=letter)
-    width, height = letter
-    margin = 40
-    max_width = width - 2 * margin
+@metrics.timed("pdf_report")
+def generate_reviews_report(reviews, output, title="AI Resume Reviews"):
+    """Render many reviews into one PDF in a single pass.
 
-    y = height - margin
-    c.setFont("Helvetica-Bold", 16)
-    c.drawString(margin, y, f"AI Resume Review for: {resume.filename}")
-    y -= 30
-    c.setFont("Helvetica", 12)
-    c.drawString(margin, y, f"Score: {score if score is not None else 'N/A'}")
-    y -= 25
-    c.drawString(margin, y, "Suggestions:")
-    y -= 20
-    for idx, suggestion in enumerate(suggestions, 1):
-        wrapped_lines = wrap_text(f"{idx}. {suggestion}", "Helvetica", 12, max_width-20, c)
-        for line in wrapped_lines:
-            c.drawString(margin + 20, y, line)
-            y -= 18
-            if y < margin:
-                c.showPage()
-                c.setFont("Helvetica", 12)
-                y = height - margin
-    y -= 10
-    c.drawString(margin, y, "Summary:")
-    y -= 20
-    for line in wrap_text(summary or "", "Helvetica", 12, max_width-20, c):
-        c.drawString(margin + 20, y, line)
-        y -= 15
-        if y < margin:
-            c.showPage()
-            c.setFont("Helvetica", 12)
-            y = height - margin
-    c.save()
\ No newline at end of file
+    ``reviews`` is any iterable of (filename, score, suggestions, summary),
+    consumed as it is drawn, so rows can be streamed straight from a query.
+    """
+    writer = PageWriter(output, title=title)
+    for index, (filename, score, suggestions, summary) in enumerate(reviews):
+        if index:
+            writer.space(20)
+        write_review(writer, filename, score, ensure_list(suggestions), summary)
+    writer.save()
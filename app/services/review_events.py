@@ -0,0 +1,129 @@
+"""Completion notifications for review jobs.
+
+Requests waiting on a job subscribe to its id and are woken with the finished
+job (and its parsed review) as soon as it is done or failed. Two things
+publish: the embedded worker (``REVIEW_WORKER_EMBEDDED``) right after it
+commits a result, and ``watch()``, which covers separate ``app.worker``
+processes by checking every waited-on job in one query per tick. The watcher
+only queries while something is waiting, so any number of waiting clients
+costs one query per interval instead of one poll each.
+"""
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from contextlib import aclosing
+
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import Session
+
+from app.crud.review_job import get_finished_jobs
+from app.db.session import engine
+from app.services.review_pipeline import review_fields
+
+REVIEW_EVENTS_POLL_INTERVAL = float(os.getenv("REVIEW_EVENTS_POLL_INTERVAL", "0.5"))
+LOOKUP_CHUNK_SIZE = 500
+
+logger = logging.getLogger(__name__)
+
+_waiters: dict[int, set[asyncio.Future]] = defaultdict(set)
+
+
+def subscribe(job_id: int) -> asyncio.Future:
+    future = asyncio.get_running_loop().create_future()
+    _waiters[job_id].add(future)
+    return future
+
+
+def unsubscribe(job_id: int, future: asyncio.Future):
+    waiters = _waiters.get(job_id)
+    if waiters is not None:
+        waiters.discard(future)
+        if not waiters:
+            del _waiters[job_id]
+
+
+def publish(job_id: int, event: dict):
+    for future in _waiters.pop(job_id, ()):
+        if not future.done():
+            future.set_result(event)
+
+
+def job_event(row) -> dict:
+    """The payload sent to waiters, from a ``get_finished_jobs`` row."""
+    review = None
+    if row.review_id is not None:
+        score, suggestions, summary = review_fields(row)
+        review = {
+            "id": row.review_id,
+            "score": score,
+            "created_at": row.created_at,
+            "suggestions": suggestions,
+            "summary": summary,
+        }
+    return {
+        "job_id": row.id,
+        "resume_id": row.resume_id,
+        "status": row.status,
+        "last_error": row.last_error,
+        "review": review,
+    }
+
+
+def load_finished(job_ids: list[int]) -> dict:
+    """job id -> event for the jobs among ``job_ids`` that are done or failed."""
+    events = {}
+    with Session(engine) as session:
+        for i in range(0, len(job_ids), LOOKUP_CHUNK_SIZE):
+            for row in get_finished_jobs(session, job_ids[i:i + LOOKUP_CHUNK_SIZE]):
+                events[row.id] = job_event(row)
+    return events
+
+
+async def publish_finished(job_ids: list[int]):
+    """Load and publish the finished jobs among ``job_ids`` that someone is waiting for."""
+    wanted = [job_id for job_id in job_ids if job_id in _waiters]
+    if not wanted:
+        return
+    for job_id, event in (await run_in_threadpool(load_finished, wanted)).items():
+        publish(job_id, event)
+
+
+async def follow(job_id: int, heartbeat: float):
+    """Yield None every ``heartbeat`` seconds until the job finishes, then its event.
+
+    Subscribed before the one status check, so a job that finishes in between
+    is still published to us.
+    """
+    future = subscribe(job_id)
+    try:
+        await publish_finished([job_id])
+        while True:
+            try:
+                yield await asyncio.wait_for(asyncio.shield(future), heartbeat)
+                return
+            except asyncio.TimeoutError:
+                yield None
+    finally:
+        unsubscribe(job_id, future)
+
+
+async def wait(job_id: int, timeout: float):
+    """The job's event once it finishes, or None after ``timeout`` seconds."""
+    async with aclosing(follow(job_id, timeout)) as events:
+        async for event in events:
+            return event
+
+
+async def watch(interval: float = REVIEW_EVENTS_POLL_INTERVAL):
+    """Publish jobs finished by other processes; runs for the lifetime of the app."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await publish_finished(list(_waiters))
+        except Exception:
+            logger.exception("Review job watcher failed")
+
+
+def stats() -> dict:
+    return {"jobs": len(_waiters), "waiters": sum(map(len, _waiters.values()))}
@@ -0,0 +1,108 @@
+"""Review PDFs, rendered on first download and cached in the blob store.
+
+Blobs are keyed by a digest of everything that affects the output, which is
+also the ETag: a changed review gets a new key instead of a stale PDF, and
+conditional GETs are answered without touching the store.
+"""
+import hashlib
+import io
+import json
+
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import Session, select
+
+from app.db.session import engine
+from app.models.review import Review
+from app.services.blob_store import get_blob_store
+from app.services.review_download import generate_review_pdf, generate_reviews_report
+from app.services.review_pipeline import review_fields
+from app.services.singleflight import SingleFlight
+
+# Bump when generate_review_pdf's output changes so cached renders are replaced
+PDF_LAYOUT_VERSION = "2"
+
+REPORT_BATCH_SIZE = 200
+
+_renders = SingleFlight()
+
+
+def pdf_etag(review_id: int, filename: str, feedback: str, score) -> str:
+    payload = json.dumps([PDF_LAYOUT_VERSION, review_id, filename, feedback, score], ensure_ascii=False)
+    return '"' + hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def report_etag(resume_id: int, filename: str, reviews) -> str:
+    """``reviews`` are the report's ``(id, created_at)`` rows in id order.
+
+    A review's content never changes once written, but reviews can be deleted
+    (see ``discard_review``) and SQLite may then hand a deleted id to the next
+    one, so every id goes into the digest together with its creation time.
+    """
+    payload = json.dumps([PDF_LAYOUT_VERSION, "report", resume_id, filename,
+                          [[review_id, created_at.isoformat()] for review_id, created_at in reviews]])
+    return '"' + hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    return "*" in candidates or etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+def render_review_pdf(filename: str, score, suggestions: list, summary: str) -> bytes:
+    buffer = io.BytesIO()
+    generate_review_pdf(filename, score, suggestions, summary, buffer)
+    return buffer.getvalue()
+
+
+def render_report_pdf(resume_id: int, user_id: int, filename: str) -> bytes:
+    """All of a resume's reviews in one PDF, streamed from the database into the layout."""
+    statement = (
+        select(Review.feedback, Review.score, Review.suggestions, Review.summary)
+        .where(Review.resume_id == resume_id, Review.user_id == user_id)
+        .order_by(Review.id)
+        .execution_options(yield_per=REPORT_BATCH_SIZE)
+    )
+    buffer = io.BytesIO()
+    with Session(engine) as session:
+        rows = session.exec(statement)
+        generate_reviews_report(
+            ((filename, *review_fields(row)) for row in rows),
+            buffer,
+            title=f"AI Resume Reviews - {filename}",
+        )
+    return buffer.getvalue()
+
+
+async def _cached(key: str, render) -> bytes:
+    store = get_blob_store()
+    data = await run_in_threadpool(store.get, key)
+    if data is None:
+        # Concurrent first downloads of the same document share one render
+        data = await _renders.do(key, lambda: run_in_threadpool(_render_and_store, store, key, render))
+    return data
+
+
+def _render_and_store(store, key: str, render) -> bytes:
+    data = render()
+    store.put(key, data)
+    return data
+
+
+async def get_review_pdf(row) -> bytes:
+    """``row`` has the review's id, feedback, score, suggestions and summary and the resume filename."""
+    digest = pdf_etag(row.id, row.filename, row.feedback, row.score).strip('"')
+    return await _cached(
+        f"review-{row.id}-{digest}.pdf",
+        lambda: render_review_pdf(row.filename, *review_fields(row)),
+    )
+
+
+async def get_report_pdf(resume_id: int, user_id: int, filename: str, etag: str) -> bytes:
+    digest = etag.strip('"')
+    return await _cached(
+        f"report-{resume_id}-{digest}.pdf",
+        lambda: render_report_pdf(resume_id, user_id, filename),
+    )
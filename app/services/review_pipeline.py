@@ -0,0 +1,229 @@
+import json
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import Session, select
+from app.db.session import engine
+from app.models.resume import Resume
+from app.models.review import Review
+from app.services import metrics, resume_sections
+from app.services.ai_review import review_resume_ai, review_revision_ai
+from app.services.review_download import ensure_list
+
+# Earlier versions searched for a review to build on
+MAX_VERSION_DEPTH = 20
+
+
+class ResumeNotFound(Exception):
+    pass
+
+
+@metrics.timed("clean_json")
+def clean_ai_json_response(ai_response: str):
+    # Remove code block markers if present
+    if ai_response.strip().startswith("```"):
+        ai_response = ai_response.strip().split('\n', 1)[1]
+        if ai_response.startswith("json"):
+            ai_response = ai_response[4:]
+        ai_response = ai_response.rsplit("```", 1)[0]
+    return ai_response.strip()
+
+def feedback_json(score, suggestions, summary) -> str:
+    return json.dumps({"score": score, "suggestions": suggestions, "summary": summary}, ensure_ascii=False)
+
+def summary_text(summary) -> str:
+    """Models sometimes answer the summary as a list, or not as text at all."""
+    if summary is None:
+        return ""
+    if isinstance(summary, list):
+        return " ".join(str(s) for s in summary)
+    return summary if isinstance(summary, str) else json.dumps(summary, ensure_ascii=False)
+
+def normalize_review(ai_response: str):
+    """Return (score, suggestions, summary, feedback_to_store) for a raw model answer."""
+    cleaned = clean_ai_json_response(ai_response)
+    try:
+        parsed = json.loads(cleaned)
+        
+        suggestions = parsed.get("suggestions", [])
+        suggestions = ensure_list(suggestions)
+        summary = summary_text(parsed.get("summary", ""))
+        score = parsed.get("score")
+        # Save normalized JSON
+        feedback_to_store = feedback_json(score, suggestions, summary)
+    except Exception:
+        # fallback: store raw
+        score = None
+        suggestions = []
+        summary = ""
+        feedback_to_store = ai_response
+    return score, suggestions, summary, feedback_to_store
+
+def parse_feedback(feedback: str, score=None):
+    """(score, suggestions, summary) from a stored review; raw fallbacks keep the score column."""
+    try:
+        parsed = json.loads(feedback)
+        return parsed.get("score"), ensure_list(parsed.get("suggestions", [])), summary_text(parsed.get("summary", ""))
+    except Exception:
+        return score, [], ""
+
+def review_fields(row):
+    """(score, suggestions, summary) of a review row, from its columns when it has been normalized."""
+    if row.suggestions is None:
+        return parse_feedback(row.feedback, row.score)
+    return row.score, row.suggestions, row.summary or ""
+
+def review_payload(review_id: int, created_at, score, suggestions, summary) -> str:
+    """One item of ``GET /resume/{id}/reviews``, serialized the way the endpoint would."""
+    return json.dumps({
+        "id": review_id,
+        "score": score,
+        "created_at": created_at.isoformat(),
+        "suggestions": suggestions,
+        "summary": summary
+    }, ensure_ascii=False)
+
+def _parsed(ai_response: str) -> dict:
+    try:
+        parsed = json.loads(clean_ai_json_response(ai_response))
+    except (TypeError, ValueError):
+        return {}
+    return parsed if isinstance(parsed, dict) else {}
+
+def _as_score(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def section_entries(parsed: dict, sections: list, keys: list, hashes: list, indexes) -> list:
+    """Per-section feedback from a model answer, for the sections at ``indexes`` (those it saw whole)."""
+    answered = parsed.get("sections")
+    if not isinstance(answered, dict):
+        return []
+    entries = []
+    for i in indexes:
+        item = answered.get(keys[i])
+        if not isinstance(item, dict):
+            continue
+        entries.append({
+            "key": keys[i], "name": sections[i]["name"], "hash": hashes[i], "tokens": sections[i]["tokens"],
+            "score": _as_score(item.get("score")), "suggestions": ensure_list(item.get("suggestions", [])),
+        })
+    return entries
+
+def _weighted_score(entries: list):
+    scored = [(entry["score"], max(entry["tokens"], 1)) for entry in entries if entry["score"] is not None]
+    if not scored:
+        return None
+    return sum(score * weight for score, weight in scored) / sum(weight for _, weight in scored)
+
+def merged_score(base_score, base_entries: list, entries: list):
+    """The earlier overall score moved by how the section scores moved, weighted by section size."""
+    before, after = _weighted_score(base_entries), _weighted_score(entries)
+    if base_score is None:
+        return round(after) if after is not None else None
+    if before is None or after is None:
+        return base_score
+    return max(0, min(100, round(base_score + after - before)))
+
+def load_review_inputs(resume_id: int, user_id: int, max_depth: int = MAX_VERSION_DEPTH):
+    """The resume, and the newest section-level review of it or of its nearest earlier version that has one."""
+    with Session(engine) as session:
+        resume = session.exec(select(Resume).where(Resume.id == resume_id, Resume.user_id == user_id)).first()
+        if resume is None:
+            return None, None
+        version_id = resume.id
+        for _ in range(max_depth):
+            base = session.exec(
+                select(Review)
+                .where(Review.resume_id == version_id, Review.user_id == user_id, Review.section_feedback.is_not(None))
+                .order_by(Review.id.desc())
+                .limit(1)
+            ).first()
+            if base is not None:
+                return resume, base
+            version_id = session.exec(select(Resume.parent_resume_id).where(Resume.id == version_id)).first()
+            if version_id is None:
+                break
+        return resume, None
+
+def save_review(resume_id: int, user_id: int, score, suggestions, summary, feedback: str,
+                section_feedback: list, base_review_id: int = None) -> int:
+    with Session(engine) as session:
+        review = Review(
+            resume_id=resume_id,
+            user_id=user_id,
+            feedback=feedback,
+            score=score,
+            suggestions=suggestions,
+            summary=summary,
+            section_feedback=section_feedback,
+            base_review_id=base_review_id
+        )
+        session.add(review)
+        session.flush()
+        review_id = review.id
+        review.payload = review_payload(review_id, review.created_at, score, suggestions, summary)
+        session.commit()
+    # The PDF is rendered on first download (see review_pdf), not here
+    return review_id
+
+async def process_review(resume_id: int, user_id: int) -> int:
+    """Run one review end to end and return the new review id.
+
+    When this resume or an earlier version of it already has a section-level
+    review, only the sections whose text changed go to the model; feedback for
+    the others is reused, and with no changes at all the earlier review is.
+    """
+    resume, base = await run_in_threadpool(load_review_inputs, resume_id, user_id)
+    if not resume:
+        raise ResumeNotFound(f"Resume {resume_id} not found for user {user_id}")
+    sections = resume_sections.sections_of(resume)
+    keys = resume_sections.section_keys(sections)
+    hashes = [resume_sections.section_hash(section) for section in sections]
+
+    if base is None:
+        selected = resume_sections.select_sections(
+            sections, resume_sections.PROMPT_RESUME_TOKEN_BUDGET, resume_sections.REVIEW_PRIORITY, keys)
+        resume_text = "\n\n".join(block for _, block, _ in selected)
+        resume_sections.record_reduction("review", resume.content, resume_text)
+        ai_response = await review_resume_ai(resume_text, user_id=user_id)
+        score, suggestions, summary, feedback_to_store = normalize_review(ai_response)
+        entries = section_entries(_parsed(ai_response), sections, keys, hashes, [i for i, _, whole in selected if whole])
+        metrics.REVIEW_RUNS.inc("full")
+        return await run_in_threadpool(
+            save_review, resume.id, user_id, score, suggestions, summary, feedback_to_store, entries)
+
+    # Matched by content, so a section that only moved or was renumbered still counts as unchanged
+    cached = {entry["hash"]: entry for entry in base.section_feedback}
+    changed = [i for i, digest in enumerate(hashes) if digest not in cached]
+    base_score, suggestions, summary = review_fields(base)
+    answered = {}
+    if changed:
+        changed_sections = [sections[i] for i in changed]
+        changed_keys = [keys[i] for i in changed]
+        selected = resume_sections.select_sections(
+            changed_sections, resume_sections.PROMPT_RESUME_TOKEN_BUDGET, resume_sections.REVIEW_PRIORITY,
+            changed_keys)
+        changed_text = "\n\n".join(block for _, block, _ in selected)
+        resume_sections.record_reduction("review", resume.content, changed_text)
+        unchanged = [key for key, digest in zip(keys, hashes) if digest in cached]
+        ai_response = await review_revision_ai(changed_text, unchanged, summary, suggestions, user_id=user_id)
+        parsed = _parsed(ai_response)
+        whole = [i for i, _, is_whole in selected if is_whole]
+        for entry in section_entries(parsed, changed_sections, changed_keys, [hashes[i] for i in changed], whole):
+            answered[entry["hash"]] = entry
+        # A malformed answer keeps the earlier overall feedback; its sections are retried next version
+        suggestions = ensure_list(parsed.get("suggestions", [])) or suggestions
+        if parsed.get("summary"):
+            summary = summary_text(parsed["summary"])
+    metrics.REVIEW_RUNS.inc("revision" if changed else "reused")
+
+    entries = []
+    for key, digest in zip(keys, hashes):
+        entry = answered.get(digest) or cached.get(digest)
+        if entry is not None:
+            entries.append({**entry, "key": key})
+    score = merged_score(base_score, base.section_feedback, entries)
+    return await run_in_threadpool(
+        save_review, resume.id, user_id, score, suggestions, summary, feedback_json(score, suggestions, summary),
+        entries, base.id)
@@ -0,0 +1,235 @@
+"""Full-text search over resume content.
+
+The index lives in two tables: ``search_postings`` (term -> resume, term
+frequency and token offsets) and ``search_documents`` (indexed length per
+resume). A resume is (re)indexed in the same transaction that stores it, so
+search never lags uploads. Queries are evaluated from the postings of the
+query terms only and ranked with BM25.
+
+Query syntax: terms are ANDed; ``OR`` separates alternatives; ``-term`` or
+``NOT term`` excludes; ``"quoted words"`` must appear as a phrase.
+"""
+import argparse
+import heapq
+import math
+import re
+from collections import defaultdict
+
+from sqlalchemy import delete, func, insert, select
+from sqlmodel import Session
+
+from app.models.resume import Resume
+from app.models.search import SearchDocument, SearchPosting
+from app.services import keywords, metrics
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+REINDEX_BATCH_SIZE = 500
+# Below this many candidate resumes, the remaining query terms are fetched per candidate
+CANDIDATE_LOOKUP_LIMIT = 5000
+LOOKUP_CHUNK_SIZE = 500
+
+_CLAUSE = re.compile(r'(-?)"([^"]*)"|(\S+)')
+
+
+def analyze(text: str):
+    """Yield (term, offset) pairs; offsets count stopwords so phrases keep their gaps."""
+    for offset, token in enumerate(keywords.tokenize(text or "")):
+        term = keywords.fold(token)
+        if term not in keywords.STOPWORDS:
+            yield term, offset
+
+
+def index_resume(session, resume_id: int, text: str):
+    """Replace the postings for one resume. The caller commits."""
+    session.execute(delete(SearchPosting).where(SearchPosting.resume_id == resume_id))
+    session.execute(delete(SearchDocument).where(SearchDocument.resume_id == resume_id))
+    positions = defaultdict(list)
+    for term, offset in analyze(text):
+        positions[term].append(offset)
+    session.execute(insert(SearchDocument), [{"resume_id": resume_id, "length": sum(map(len, positions.values()))}])
+    if positions:
+        session.execute(insert(SearchPosting), [
+            {"term": term, "resume_id": resume_id, "tf": len(offsets), "positions": " ".join(map(str, offsets))}
+            for term, offsets in positions.items()
+        ])
+
+
+def index_existing(executor, batch_size: int = REINDEX_BATCH_SIZE):
+    """Index every resume in id order, yielding after each batch.
+
+    ``executor`` is a Session or a Connection (migrations pass their own).
+    """
+    last_id = 0
+    while True:
+        rows = executor.execute(
+            select(Resume.id, Resume.content).where(Resume.id > last_id).order_by(Resume.id).limit(batch_size)
+        ).all()
+        if not rows:
+            return
+        for row in rows:
+            index_resume(executor, row.id, row.content)
+        last_id = rows[-1].id
+        yield len(rows)
+
+
+def reindex_all(session: Session, batch_size: int = REINDEX_BATCH_SIZE) -> int:
+    """Rebuild the whole index, committing per batch. Returns the number of resumes indexed."""
+    session.execute(delete(SearchPosting))
+    session.execute(delete(SearchDocument))
+    count = 0
+    for indexed in index_existing(session, batch_size):
+        session.commit()
+        count += indexed
+    return count
+
+
+def parse_query(query: str) -> list[list[tuple[bool, list[tuple[str, int]]]]]:
+    """OR-groups of (negated, [(term, offset), ...]) clauses."""
+    groups = [[]]
+    negate_next = False
+    for match in _CLAUSE.finditer(query):
+        minus, phrase, word = match.groups()
+        if word == "OR":
+            groups.append([])
+            continue
+        if word in ("AND", "NOT"):
+            negate_next = word == "NOT"
+            continue
+        negated = negate_next or bool(minus)
+        negate_next = False
+        if word is not None and word.startswith("-") and len(word) > 1:
+            negated, word = True, word[1:]
+        terms = list(analyze(phrase if phrase is not None else word))
+        if terms:
+            first = terms[0][1]
+            groups[-1].append((negated, [(term, offset - first) for term, offset in terms]))
+    return [group for group in groups if any(not negated for negated, _ in group)]
+
+
+def _document_frequencies(connection, terms: set) -> dict:
+    statement = (
+        select(SearchPosting.term, func.count())
+        .where(SearchPosting.term.in_(sorted(terms)))
+        .group_by(SearchPosting.term)
+    )
+    frequencies = dict.fromkeys(terms, 0)
+    frequencies.update(connection.execute(statement).all())
+    return frequencies
+
+
+def _load_postings(connection, terms: set, phrase_terms: set, resume_ids=None) -> dict:
+    """term -> {resume_id: (tf, length, positions or None)}; positions only for phrase terms.
+
+    With ``resume_ids`` only those resumes' postings are read, in chunks small
+    enough for every driver's bound-parameter limit.
+    """
+    postings = {term: {} for term in terms}
+    chunks = [None] if resume_ids is None else [
+        resume_ids[i:i + LOOKUP_CHUNK_SIZE] for i in range(0, len(resume_ids), LOOKUP_CHUNK_SIZE)
+    ]
+    for wanted, with_positions in ((terms - phrase_terms, False), (terms & phrase_terms, True)):
+        if not wanted:
+            continue
+        columns = [SearchPosting.term, SearchPosting.resume_id, SearchPosting.tf, SearchDocument.length]
+        if with_positions:
+            columns.append(SearchPosting.positions)
+        statement = (
+            select(*columns)
+            .join(SearchDocument, SearchDocument.resume_id == SearchPosting.resume_id)
+            .where(SearchPosting.term.in_(sorted(wanted)))
+        )
+        for chunk in chunks:
+            chunk_statement = statement if chunk is None else statement.where(SearchPosting.resume_id.in_(chunk))
+            # Core rows, not ORM ones: a common term can have postings in most resumes
+            for row in connection.execute(chunk_statement):
+                postings[row[0]][row[1]] = (row[2], row[3], row[4] if with_positions else None)
+    return postings
+
+
+def _phrase_matches(postings, phrase: list[tuple[str, int]]) -> set:
+    candidates = set.intersection(*(set(postings[term]) for term, _ in phrase))
+    matched = set()
+    for resume_id in candidates:
+        offsets = {term: set(map(int, postings[term][resume_id][2].split())) for term, _ in phrase}
+        first_term = phrase[0][0]
+        if any(all(start + rel in offsets[term] for term, rel in phrase[1:]) for start in offsets[first_term]):
+            matched.add(resume_id)
+    return matched
+
+
+def _clause_matches(postings, clause: list[tuple[str, int]]) -> set:
+    if len(clause) == 1:
+        return set(postings[clause[0][0]])
+    return _phrase_matches(postings, clause)
+
+
+@metrics.timed("search")
+def search(session: Session, query: str, offset: int = 0, limit: int = 50):
+    """Return (total, [(resume_id, score), ...]) for one page of ranked results."""
+    groups = parse_query(query)
+    if not groups:
+        return 0, []
+    terms, phrase_terms, scored_terms = set(), set(), set()
+    for group in groups:
+        for negated, clause in group:
+            terms.update(term for term, _ in clause)
+            if len(clause) > 1:
+                phrase_terms.update(term for term, _ in clause)
+            if not negated:
+                scored_terms.update(term for term, _ in clause)
+    connection = session.connection()
+    frequencies = _document_frequencies(connection, terms)
+    # Every match of a group contains that group's rarest positive term, so reading
+    # those postings first bounds the candidates; the other terms are then looked
+    # up for the candidates only, unless that bound is still too wide to help
+    seeds = {
+        min((term for negated, clause in group if not negated for term, _ in clause), key=frequencies.get)
+        for group in groups
+    }
+    postings = _load_postings(connection, seeds, phrase_terms)
+    candidates = sorted(set().union(*postings.values()))
+    if terms - seeds:
+        restrict = candidates if len(candidates) <= CANDIDATE_LOOKUP_LIMIT else None
+        postings.update(_load_postings(connection, terms - seeds, phrase_terms, restrict))
+
+    matched = set()
+    for group in groups:
+        positive = [_clause_matches(postings, clause) for negated, clause in group if not negated]
+        hits = set.intersection(*positive)
+        for negated, clause in group:
+            if negated and hits:
+                hits -= _clause_matches(postings, clause)
+        matched |= hits
+    if not matched:
+        return 0, []
+
+    documents, average_length = connection.execute(
+        select(func.count(), func.avg(SearchDocument.length))
+    ).one()
+    average_length = float(average_length or 1) or 1.0
+    scores = dict.fromkeys(matched, 0.0)
+    for term in scored_terms:
+        entries = postings[term]
+        idf = math.log1p((documents - frequencies[term] + 0.5) / (frequencies[term] + 0.5))
+        for resume_id in matched.intersection(entries):
+            tf, length, _ = entries[resume_id]
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+            scores[resume_id] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+    ranked = heapq.nsmallest(offset + limit, scores.items(), key=lambda item: (-item[1], item[0]))
+    return len(scores), [(resume_id, round(score, 4)) for resume_id, score in ranked[offset:]]
+
+
+def main():
+    from app.db.session import engine
+
+    parser = argparse.ArgumentParser(description="Resume search index maintenance")
+    parser.add_argument("command", choices=["reindex"])
+    args = parser.parse_args()
+    if args.command == "reindex":
+        with Session(engine) as session:
+            print(f"Indexed {reindex_all(session)} resumes")
+
+
+if __name__ == "__main__":
+    main()
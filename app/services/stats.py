@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import os
+import random
+from collections import Counter
+from datetime import date, datetime, timedelta
+from sqlalchemy import delete, event, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel import Session, select
+from app.db.session import engine
+from app.models.job_desc import JobMatch
+from app.models.resume import Resume
+from app.models.review import Review
+from app.models.stats import DailyStat, StatCounter
+from app.models.user import User
+
+STATS_RECONCILE_INTERVAL_SECONDS = float(os.getenv("STATS_RECONCILE_INTERVAL_SECONDS", "3600"))
+STATS_RECONCILE_DAYS = int(os.getenv("STATS_RECONCILE_DAYS", "30"))
+# Rows each counter is spread over; concurrent write transactions only wait for each other on the same shard
+STATS_COUNTER_SHARDS = int(os.getenv("STATS_COUNTER_SHARDS", "16"))
+
+# Table model -> (counter / daily metric name, timestamp attribute)
+TRACKED = {
+    User: ("users", None),
+    Resume: ("resumes", "uploaded_at"),
+    Review: ("reviews", "created_at"),
+    JobMatch: ("job_matches", "created_at"),
+}
+REVIEW_SCORES = "review_scores"
+
+logger = logging.getLogger(__name__)
+
+
+def _day(value) -> date:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        return value.date()
+    return datetime.utcnow().date()
+
+
+def _increment(connection, model, keys: dict, values: dict):
+    dialect = connection.dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    table = model.__table__
+    statement = insert(table).values(**keys, **values)
+    updates = {name: table.c[name] + statement.excluded[name] for name in values}
+    connection.execute(statement.on_conflict_do_update(index_elements=list(keys), set_=updates))
+
+
+@event.listens_for(OrmSession, "after_flush")
+def _count_new_rows(session, flush_context):
+    """Bump counters in the same transaction that inserts the rows they count."""
+    totals = Counter()
+    daily = Counter()
+    scores = {}
+    for obj in session.new:
+        tracked = TRACKED.get(type(obj))
+        if tracked is None:
+            continue
+        name, timestamp_attr = tracked
+        totals[name] += 1
+        day = _day(getattr(obj, timestamp_attr) if timestamp_attr else None)
+        daily[(day, name)] += 1
+        if isinstance(obj, Review) and obj.score is not None:
+            count, total = scores.get(day, (0, 0))
+            scores[day] = (count + 1, total + obj.score)
+    if not totals:
+        return
+    connection = session.connection()
+    # One shard per flush; the row lock it takes is held until this transaction commits
+    shard = random.randrange(STATS_COUNTER_SHARDS)
+    for name, delta in totals.items():
+        _increment(connection, StatCounter, {"name": name, "shard": shard}, {"value": delta})
+    for (day, name), delta in daily.items():
+        _increment(connection, DailyStat, {"day": day, "metric": name, "shard": shard}, {"count": delta, "total": 0})
+    for day, (count, total) in scores.items():
+        _increment(connection, DailyStat, {"day": day, "metric": REVIEW_SCORES, "shard": shard},
+                   {"count": count, "total": total})
+
+
+def get_stats(session: Session, days: int = 30) -> dict:
+    counters = dict(session.exec(
+        select(StatCounter.name, func.sum(StatCounter.value)).group_by(StatCounter.name)
+    ).all())
+    since = datetime.utcnow().date() - timedelta(days=days - 1)
+    rows = session.exec(
+        select(DailyStat.day, DailyStat.metric, func.sum(DailyStat.count), func.sum(DailyStat.total))
+        .where(DailyStat.day >= since)
+        .group_by(DailyStat.day, DailyStat.metric)
+    ).all()
+    series = {}
+    for day, metric, count, total in rows:
+        series.setdefault(day, {})[metric] = (count, total)
+    daily = []
+    for day in sorted(series):
+        metrics = series[day]
+        count, total = metrics.get(REVIEW_SCORES, (0, 0))
+        daily.append({
+            "day": day,
+            "reviews": metrics.get("reviews", (0, 0))[0],
+            "average_score": round(total / count, 2) if count else None,
+            "job_matches": metrics.get("job_matches", (0, 0))[0],
+            "resumes": metrics.get("resumes", (0, 0))[0],
+        })
+    return {
+        "review_count": counters.get("reviews", 0),
+        "user_count": counters.get("users", 0),
+        "resume_count": counters.get("resumes", 0),
+        "job_match_count": counters.get("job_matches", 0),
+        "daily": daily,
+    }
+
+
+def reconcile_stats(session: Session, days: int = STATS_RECONCILE_DAYS):
+    """Rebuild the counters and the recent daily series from the real tables.
+
+    Every shard is replaced by one row, and every day in the range is rebuilt,
+    so days whose rows were all deleted drop out of the series.
+    """
+    since = datetime.utcnow().date() - timedelta(days=days - 1)
+    since_start = datetime.combine(since, datetime.min.time())
+    counters = []
+    daily = []
+    for model, (name, timestamp_attr) in TRACKED.items():
+        counters.append({"name": name, "shard": 0, "value": session.exec(select(func.count()).select_from(model)).one()})
+        if timestamp_attr is None:
+            continue
+        column = getattr(model, timestamp_attr)
+        day = func.date(column)
+        for row_day, count in session.exec(
+            select(day, func.count()).where(column >= since_start).group_by(day)
+        ).all():
+            daily.append({"day": _day(str(row_day)), "metric": name, "shard": 0, "count": count, "total": 0})
+    day = func.date(Review.created_at)
+    for row_day, count, total in session.exec(
+        select(day, func.count(), func.sum(Review.score))
+        .where(Review.created_at >= since_start, Review.score.is_not(None))
+        .group_by(day)
+    ).all():
+        daily.append({"day": _day(str(row_day)), "metric": REVIEW_SCORES, "shard": 0,
+                      "count": count, "total": total or 0})
+    connection = session.connection()
+    connection.execute(delete(StatCounter))
+    connection.execute(StatCounter.__table__.insert(), counters)
+    connection.execute(delete(DailyStat).where(DailyStat.day >= since))
+    if daily:
+        connection.execute(DailyStat.__table__.insert(), daily)
+    session.commit()
+
+
+def _reconcile():
+    with Session(engine) as session:
+        reconcile_stats(session)
+
+
+async def reconcile_periodically(interval: float = STATS_RECONCILE_INTERVAL_SECONDS):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(_reconcile)
+        except Exception:
+            logger.exception("Stats reconciliation failed")
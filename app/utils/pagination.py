@@ -0,0 +1,60 @@
+import base64
+import json
+from dataclasses import dataclass
+from fastapi import HTTPException, Query, Response
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+@dataclass
+class PageParams:
+    cursor: str | None
+    limit: int
+
+
+def page_params(
+    cursor: str | None = Query(None, description="Opaque cursor from the previous page's next_cursor"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+) -> PageParams:
+    return PageParams(cursor=cursor, limit=limit)
+
+
+def encode_cursor(last_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"id": last_id}).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str | None):
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(padded))["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def paginate(session, statement, id_column, page: PageParams):
+    """Keyset pagination on an increasing id: ``WHERE id > :last ORDER BY id LIMIT n``.
+
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    after = decode_cursor(page.cursor)
+    if after is not None:
+        statement = statement.where(id_column > after)
+    rows = session.exec(statement.order_by(id_column).limit(page.limit + 1)).all()
+    next_cursor = None
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        next_cursor = encode_cursor(rows[-1].id)
+    return rows, next_cursor
+
+
+def page_response(items: list, next_cursor):
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def raw_page_response(payloads: list[str], next_cursor) -> Response:
+    """The ``page_response`` shape built from items that are already JSON, without re-encoding them."""
+    body = '{"items":[' + ",".join(payloads) + '],"next_cursor":' + json.dumps(next_cursor) + "}"
+    return Response(content=body, media_type="application/json")
@@ -0,0 +1,154 @@
+import hashlib
+import io
+import os
+import tempfile
+import zipfile
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(5 * 1024 * 1024)))
+# Uploads larger than this are spooled to a temp file instead of being held in memory
+UPLOAD_SPOOL_BYTES = int(os.getenv("UPLOAD_SPOOL_BYTES", str(512 * 1024)))
+UPLOAD_CHUNK_BYTES = 64 * 1024
+# Room for multipart boundaries and headers on top of the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+PDF_MAGIC = b"%PDF-"
+ZIP_MAGIC = b"PK\x03\x04"
+EXTENSIONS = {"pdf": ".pdf", "docx": ".docx"}
+
+
+def sniff_kind(head: bytes):
+    if head.startswith(PDF_MAGIC):
+        return "pdf"
+    if head.startswith(ZIP_MAGIC):
+        return "docx"  # confirmed against the zip directory once the whole file is in
+    return None
+
+
+class UploadBuffer:
+    """Upload bytes hashed as they arrive, kept in memory until they outgrow UPLOAD_SPOOL_BYTES."""
+
+    def __init__(self, spool_bytes: int = UPLOAD_SPOOL_BYTES):
+        self.spool_bytes = spool_bytes
+        self.size = 0
+        self.kind = None
+        self.path = None
+        self._memory = bytearray()
+        self._file = None
+        self._hash = hashlib.sha256()
+
+    @property
+    def sha256(self) -> str:
+        return self._hash.hexdigest()
+
+    def write(self, chunk: bytes):
+        self._hash.update(chunk)
+        self.size += len(chunk)
+        if self._file is None and self.size > self.spool_bytes:
+            self._file = tempfile.NamedTemporaryFile(prefix="upload-", delete=False)
+            self.path = self._file.name
+            self._file.write(self._memory)
+            self._memory = bytearray()
+        if self._file is not None:
+            self._file.write(chunk)
+        else:
+            self._memory += chunk
+
+    def finish(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def source(self):
+        """What the parser reads: the temp file path once spooled, otherwise the buffer itself (no copy)."""
+        return self.path if self.path is not None else self._memory
+
+    def is_docx(self) -> bool:
+        target = self.path if self.path is not None else io.BytesIO(self._memory)
+        try:
+            with zipfile.ZipFile(target) as archive:
+                return "word/document.xml" in archive.namelist()
+        except zipfile.BadZipFile:
+            return False
+
+    def close(self):
+        self.finish()
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+            self.path = None
+        self._memory = bytearray()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+async def read_upload(file: UploadFile, max_bytes: int = UPLOAD_MAX_BYTES,
+                      spool_bytes: int = UPLOAD_SPOOL_BYTES) -> UploadBuffer:
+    """Stream an upload in chunks, rejecting it as soon as it is too big or not a PDF/DOCX."""
+    buffer = UploadBuffer(spool_bytes)
+    try:
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            if buffer.size == 0:
+                buffer.kind = sniff_kind(chunk)
+                if buffer.kind is None:
+                    raise HTTPException(status_code=400, detail="Invalid file type")
+            if buffer.size + len(chunk) > max_bytes:
+                raise HTTPException(status_code=413, detail=f"File is larger than {max_bytes} bytes")
+            buffer.write(chunk)
+        buffer.finish()
+        if buffer.size == 0:
+            raise HTTPException(status_code=400, detail="File is empty")
+        if buffer.kind == "docx" and not buffer.is_docx():
+            raise HTTPException(status_code=400, detail="Invalid file type")
+        if file.filename and not file.filename.lower().endswith(EXTENSIONS[buffer.kind]):
+            raise HTTPException(status_code=400, detail="File extension does not match its content")
+    except BaseException:
+        buffer.close()
+        raise
+    return buffer
+
+
+class UploadSizeLimitMiddleware:
+    """Reject oversized request bodies on upload routes before they are buffered.
+
+    Checks Content-Length up front and counts streamed (chunked) bodies as they
+    are received, so a large upload is cut off instead of spooled in full.
+    """
+
+    def __init__(self, app, paths, max_bytes: int = UPLOAD_MAX_BYTES + MULTIPART_OVERHEAD_BYTES):
+        self.app = app
+        self.paths = set(paths)
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_bytes:
+            response = JSONResponse({"detail": "Request body too large"}, status_code=413)
+            await response(scope, receive, send)
+            return
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # FastAPI re-raises HTTPExceptions from body parsing as-is
+                    raise HTTPException(status_code=413, detail="Request body too large")
+            return message
+
+        await self.app(scope, limited_receive, send)
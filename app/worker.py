@@ -0,0 +1,134 @@
+"""Review worker: claims queued review jobs from the database and processes them.
+
+Run one or more of these next to the API:
+
+    python -m app.worker --concurrency 4
+
+or set ``REVIEW_WORKER_EMBEDDED=true`` to run the pool inside the API process,
+where finished jobs are pushed to waiting clients without the watcher's delay.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import Session
+from app.db.base import run_migrations
+from app.db.session import engine
+from app.crud.review_job import (
+    claim_next_job, complete_job, discard_review, extend_job_lease, fail_abandoned_jobs, fail_job
+)
+from app.services import llm_client, review_events, stats  # noqa: F401  stats registers the counter hooks
+from app.services.review_pipeline import ResumeNotFound, process_review
+
+REVIEW_WORKER_CONCURRENCY = int(os.getenv("REVIEW_WORKER_CONCURRENCY", "4"))
+REVIEW_JOB_VISIBILITY_TIMEOUT = float(os.getenv("REVIEW_JOB_VISIBILITY_TIMEOUT", "300"))
+REVIEW_JOB_RETRY_BACKOFF = float(os.getenv("REVIEW_JOB_RETRY_BACKOFF", "10"))
+REVIEW_WORKER_POLL_INTERVAL = float(os.getenv("REVIEW_WORKER_POLL_INTERVAL", "1"))
+
+logger = logging.getLogger("app.worker")
+
+
+def _with_session(fn, *args):
+    with Session(engine) as session:
+        return fn(session, *args)
+
+
+async def _heartbeat(job_id: int, worker_id: str, visibility_timeout: float):
+    # Keep the lease alive while a slow model call is still making progress
+    while True:
+        await asyncio.sleep(visibility_timeout / 2)
+        try:
+            await run_in_threadpool(_with_session, extend_job_lease, job_id, worker_id, visibility_timeout)
+        except Exception:
+            # A missed beat is retried at the next one; the lease only lapses if they all fail
+            logger.exception("Could not extend the lease of review job %s", job_id)
+
+
+async def run_job(job, worker_id: str, visibility_timeout: float, retry_backoff: float):
+    heartbeat = asyncio.create_task(_heartbeat(job.id, worker_id, visibility_timeout))
+    try:
+        review_id = await process_review(job.resume_id, job.user_id)
+    except ResumeNotFound as exc:
+        if await run_in_threadpool(_with_session, fail_job, job.id, worker_id, str(exc), retry_backoff, False):
+            logger.warning("Review job %s failed permanently: %s", job.id, exc)
+        else:
+            logger.warning("Review job %s was reclaimed by another worker before it failed", job.id)
+    except Exception as exc:
+        if await run_in_threadpool(_with_session, fail_job, job.id, worker_id, repr(exc), retry_backoff):
+            logger.exception("Review job %s failed (attempt %s)", job.id, job.attempts)
+        else:
+            logger.warning("Review job %s was reclaimed by another worker before it failed", job.id)
+    else:
+        try:
+            completed = await run_in_threadpool(_with_session, complete_job, job.id, worker_id, review_id)
+        except Exception:
+            # The job is retried once its lease lapses; without this its review would be written twice
+            await run_in_threadpool(_with_session, discard_review, review_id)
+            raise
+        if completed:
+            logger.info("Review job %s done, review %s", job.id, review_id)
+        else:
+            # The worker that reclaimed the job writes its own review
+            await run_in_threadpool(_with_session, discard_review, review_id)
+            logger.warning("Review job %s was reclaimed by another worker; discarded review %s", job.id, review_id)
+    finally:
+        heartbeat.cancel()
+    # Only does anything when this worker is embedded in the web process and a client is waiting
+    await review_events.publish_finished([job.id])
+
+
+async def worker_loop(worker_id: str, visibility_timeout: float, retry_backoff: float,
+                      poll_interval: float, stop: asyncio.Event):
+    while not stop.is_set():
+        try:
+            job = await run_in_threadpool(_with_session, claim_next_job, worker_id, visibility_timeout)
+            if job is not None:
+                await run_job(job, worker_id, visibility_timeout, retry_backoff)
+                continue
+        except Exception:
+            # A database outage must not end the loop; the queue drains again once it is back
+            logger.exception("Review worker %s failed, retrying in %ss", worker_id, poll_interval)
+        try:
+            await asyncio.wait_for(stop.wait(), poll_interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_pool(concurrency: int = REVIEW_WORKER_CONCURRENCY,
+                   visibility_timeout: float = REVIEW_JOB_VISIBILITY_TIMEOUT,
+                   retry_backoff: float = REVIEW_JOB_RETRY_BACKOFF,
+                   poll_interval: float = REVIEW_WORKER_POLL_INTERVAL,
+                   stop: asyncio.Event | None = None):
+    stop = stop or asyncio.Event()
+    prefix = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    await run_in_threadpool(_with_session, fail_abandoned_jobs)
+    loops = [
+        asyncio.create_task(worker_loop(f"{prefix}-{i}", visibility_timeout, retry_backoff, poll_interval, stop))
+        for i in range(concurrency)
+    ]
+    try:
+        await asyncio.gather(*loops)
+    finally:
+        await llm_client.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Process queued resume reviews.")
+    parser.add_argument("--concurrency", type=int, default=REVIEW_WORKER_CONCURRENCY)
+    parser.add_argument("--visibility-timeout", type=float, default=REVIEW_JOB_VISIBILITY_TIMEOUT)
+    parser.add_argument("--retry-backoff", type=float, default=REVIEW_JOB_RETRY_BACKOFF)
+    parser.add_argument("--poll-interval", type=float, default=REVIEW_WORKER_POLL_INTERVAL)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    run_migrations()
+    try:
+        asyncio.run(run_pool(args.concurrency, args.visibility_timeout, args.retry_backoff, args.poll_interval))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
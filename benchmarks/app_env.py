@@ -0,0 +1,19 @@
+"""Point the app at a throwaway database before anything under ``app`` is imported."""
+import os
+import tempfile
+
+
+def configure_env(database_url: str | None = None, llm_base_url: str | None = None) -> str:
+    if database_url is None:
+        handle, path = tempfile.mkstemp(prefix="bench-", suffix=".db")
+        os.close(handle)
+        database_url = f"sqlite:///{path}"
+    os.environ["SQL_MODEL_DATABASE_URL"] = database_url
+    os.environ.setdefault("SECRET_KEY", "supersecret")
+    os.environ.setdefault("ALGORITHM", "HS256")
+    os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+    os.environ.setdefault("OPENROUTER_API_KEY", "fake")
+    os.environ.setdefault("ADMIN_EMAIL", "admin@example.com")
+    if llm_base_url:
+        os.environ["LLM_BASE_URL"] = llm_base_url
+    return database_url
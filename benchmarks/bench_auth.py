@@ -0,0 +1,75 @@
+"""Authenticated requests/second with and without the principal cache,
+and how much a login burst slows other requests down.
+
+    python benchmarks/bench_auth.py --requests 500 --logins 20
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.app_env import configure_env
+
+
+def authenticated_rps(client, headers, requests: int, threads: int) -> float:
+    def one(_):
+        client.get("/resume/resumes", headers=headers)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(one, range(requests)))
+    return requests / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--logins", type=int, default=20)
+    args = parser.parse_args()
+    configure_env()
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+    from app.auth import dependencies
+    from app.db.session import engine
+    from app.main import app
+
+    queries = [0]
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count(*_):
+        queries[0] += 1
+
+    with TestClient(app) as client:
+        credentials = {"email": "bench@example.com", "password": "secret"}
+        client.post("/auth/register", json=credentials)
+        token = client.post("/auth/login", json=credentials).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        for label, ttl in [("no principal cache", 0), ("principal cache", 30)]:
+            dependencies.PRINCIPAL_CACHE_TTL_SECONDS = ttl
+            dependencies._principals.clear()
+            queries[0] = 0
+            rps = authenticated_rps(client, headers, args.requests, args.threads)
+            print(f"{label:<20} {rps:8.1f} req/s, {queries[0] / args.requests:.2f} queries/request")
+
+        # Latency of a cheap request while a burst of bcrypt logins is in flight
+        def login(_):
+            client.post("/auth/login", json=credentials)
+
+        with ThreadPoolExecutor(args.logins) as pool:
+            burst = [pool.submit(login, i) for i in range(args.logins)]
+            started = time.perf_counter()
+            client.get("/", headers=headers)
+            during = time.perf_counter() - started
+            for future in burst:
+                future.result()
+        print(f"GET / during a burst of {args.logins} logins: {during * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
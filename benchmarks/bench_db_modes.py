@@ -0,0 +1,137 @@
+"""Throughput of the resume and job-match routes with the sync and the async database path.
+
+Each mode runs in its own process (``DB_ASYNC`` is read at import) against a
+fresh database, or against ``--database-url`` when given. Requests go through
+the full ASGI app from one event loop at several concurrency levels; the mix
+is read-heavy (resume list and detail, job-match and posting lists) with a
+share of job-posting writes.
+
+    python benchmarks/bench_db_modes.py --requests 2000 --concurrency 10 50 200
+    python benchmarks/bench_db_modes.py --database-url postgresql://user:pw@localhost/bench
+
+SQLite answers in microseconds, so locally the numbers mostly show per-request
+overhead (threadpool hops versus greenlet switches); the async path pays off
+when queries wait on the network and concurrency exceeds the threadpool.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.app_env import configure_env
+
+MODES = {"sync": "false", "async": "true"}
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    index = min(int(q * len(sorted_values)), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+async def login(client, email: str) -> dict:
+    credentials = {"email": email, "password": "bench-password"}
+    await client.post("/auth/register", json=credentials)
+    token = (await client.post("/auth/login", json=credentials)).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def run_level(client, headers: dict, resume_ids: list, requests: int, concurrency: int) -> dict:
+    def request_for(i: int):
+        resume_id = resume_ids[i % len(resume_ids)]
+        kind = i % 10
+        if kind < 3:
+            return client.get("/resume/resumes", params={"limit": 50}, headers=headers)
+        if kind < 6:
+            return client.get(f"/resume/{resume_id}", headers=headers)
+        if kind < 8:
+            return client.get(f"/job_match/{resume_id}/matches", params={"limit": 50}, headers=headers)
+        if kind < 9:
+            return client.get("/job_match/postings", params={"limit": 50}, headers=headers)
+        return client.post("/job_match/postings", json={"title": f"Role {i}", "description": "python postgres"},
+                           headers=headers)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, failures = [], 0
+
+    async def one(i: int):
+        nonlocal failures
+        async with semaphore:
+            started = time.perf_counter()
+            response = await request_for(i)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                failures += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "failures": failures,
+    }
+
+
+async def measure(args) -> list[dict]:
+    import httpx
+    from app.main import app
+    from benchmarks.fixtures import generate_pdf
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            headers = await login(client, "db-modes@example.com")
+            resume_ids = []
+            for i in range(args.resumes):
+                response = await client.post("/resume/upload", headers=headers,
+                                             files={"file": (f"resume{i}.pdf", generate_pdf(i), "application/pdf")})
+                resume_ids.append(response.json()["resume_id"])
+            await run_level(client, headers, resume_ids, min(args.requests, 200), 10)  # warm-up
+            return [await run_level(client, headers, resume_ids, args.requests, concurrency)
+                    for concurrency in args.concurrency]
+
+
+def run_mode(mode: str, argv: list[str]) -> list[dict]:
+    env = {**os.environ, "DB_ASYNC": MODES[mode]}
+    completed = subprocess.run([sys.executable, os.path.abspath(__file__), "--mode", mode, *argv],
+                               env=env, capture_output=True, text=True)
+    if completed.returncode != 0:
+        sys.exit(f"{mode} mode failed:\n{completed.stderr[-2000:]}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000, help="requests per concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--resumes", type=int, default=20)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode is not None:
+        configure_env(args.database_url)
+        os.environ["PRINCIPAL_CACHE_TTL_SECONDS"] = "0"  # every request resolves its user from the database
+        print(json.dumps(asyncio.run(measure(args))))
+        return
+
+    argv = sys.argv[1:]
+    results = {mode: run_mode(mode, argv) for mode in MODES}
+    print(f"{'concurrency':>11} {'sync req/s':>11} {'async req/s':>12} {'sync p95 ms':>12} {'async p95 ms':>13}")
+    for sync, async_ in zip(results["sync"], results["async"]):
+        print(f"{sync['concurrency']:>11} {sync['throughput_rps']:>11.1f} {async_['throughput_rps']:>12.1f} "
+              f"{sync['p95_ms']:>12.1f} {async_['p95_ms']:>13.1f}")
+        if sync["failures"] or async_["failures"]:
+            print(f"{'':>11} failures: sync {sync['failures']}, async {async_['failures']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Memory and throughput of the streaming admin export.
+
+Seeds a temp SQLite database with N reviews, then drains stream_rows() and
+reports the peak traced allocation. The peak should stay flat as N grows.
+
+    python benchmarks/bench_export.py --rows 1000 100000 1000000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.app_env import configure_env
+
+
+def seed_reviews(engine, total: int, already: int):
+    from sqlalchemy import insert
+    from app.models.review import Review
+
+    base = datetime(2025, 1, 1)
+    feedback = '{"score": 80, "suggestions": ["a", "b", "c"], "summary": "' + "x" * 400 + '"}'
+    with engine.begin() as connection:
+        for start in range(already, total, 10_000):
+            connection.execute(insert(Review), [
+                {"resume_id": 1, "user_id": 1 + i % 50, "feedback": feedback, "score": i % 100,
+                 "created_at": base + timedelta(seconds=i)}
+                for i in range(start, min(total, start + 10_000))
+            ])
+
+
+def drain(fmt: str):
+    from app.services.export import review_export_statement, stream_rows
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    rows = 0
+    size = 0
+    for chunk in stream_rows(review_export_statement(), fmt):
+        rows += chunk.count("\n")
+        size += len(chunk)
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return rows, size, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 100_000])
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    args = parser.parse_args()
+    configure_env()
+
+    from app.db.base import run_migrations
+    from app.db.session import engine
+
+    run_migrations()
+    seeded = 0
+    for total in sorted(args.rows):
+        seed_reviews(engine, total, seeded)
+        seeded = total
+        rows, size, elapsed, peak = drain(args.format)
+        print(f"{total:>9} reviews: {rows:>9} lines, {size / 1e6:8.1f} MB in {elapsed:6.2f}s, "
+              f"peak traced memory {peak / 1024:8.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
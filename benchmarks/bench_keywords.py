@@ -0,0 +1,206 @@
+"""Accuracy and latency of the local keyword matcher.
+
+Two sets: hand-labelled sentences written the way job descriptions and
+resumes are, including ordinary prose that contains skill-like words ("the
+rest of the team", "R&D"); and generated pairs built from known skills
+written with the spellings people use (aliases, plurals, odd casing), which
+measure recall and latency at volume. The generated pairs come from the
+lexicon itself, so only the hand-labelled set says anything about precision.
+
+    python benchmarks/bench_keywords.py --pairs 500
+    python benchmarks/bench_keywords.py --pairs 50 --llm-latency 1.5   # also time the AI suggestions path
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services import keywords
+
+# Distractors that contain skill-like words used in their ordinary sense
+DISTRACTORS = [
+    "Ready to go the extra mile and spring into action.",
+    "Consulted the oracle of team lore before every retro.",
+    "Would rather rust in peace than swift-boat a colleague.",
+    "Express interest in go-to-market strategy and scale-ups.",
+    "Plays the dart board at lunch and reads a spark of news.",
+]
+
+
+# Sentence -> the skills a reader would say it names
+LABELLED = [
+    ("We're looking for an engineer to join the rest of the team in Berlin.", set()),
+    ("Build and maintain REST APIs consumed by our mobile apps.", {"REST APIs"}),
+    ("Designed RESTful services and a GraphQL gateway.", {"REST APIs", "GraphQL"}),
+    ("You will own our CI pipelines and release tooling.", {"CI/CD"}),
+    ("Set up CI/CD with GitHub Actions and Docker.", {"CI/CD", "GitHub Actions", "Docker"}),
+    ("Our ci bot posts results on every merge request.", set()),
+    ("Experience with monitoring and alerting (Prometheus, Grafana).", {"observability", "Prometheus", "Grafana"}),
+    ("Responsible for monitoring vendor contracts and budgets.", set()),
+    ("Trained models in PyTorch and scikit-learn.", {"PyTorch", "scikit-learn"}),
+    ("Ready to carry the torch for engineering quality.", set()),
+    ("Led the R&D group through two product launches.", set()),
+    ("Graduated with grade C in chemistry.", set()),
+    ("Go to market with confidence: you will partner with sales.", set()),
+    ("Languages: Go, Python, R", {"Go", "Python", "R"}),
+    ("Skills: C, C++, embedded Linux", {"C", "C++", "Linux"}),
+    ("Experience with Go and Kubernetes is a plus.", {"Go", "Kubernetes"}),
+    ("Statistical analysis in R and SQL for the growth team.", {"R", "SQL", "statistics"}),
+    ("Wrote firmware in C for ARM microcontrollers.", {"C"}),
+    ("Plan A failed, so we moved to plan B and then plan C.", set()),
+    ("Spring Boot microservices on AWS behind Nginx.", {"Spring", "microservices", "AWS", "Nginx"}),
+    ("We spring into action when incidents happen.", set()),
+    ("Deployed services to k8s with Helm charts and Terraform.", {"Kubernetes", "Helm", "Terraform"}),
+    ("Consulted the oracle of team lore before every retro.", set()),
+    ("Migrated reporting from Oracle to PostgreSQL.", {"Oracle", "PostgreSQL"}),
+    ("Mentored three junior engineers and ran code reviews.", {"mentoring", "code review"}),
+    ("Built data pipelines in Airflow and dbt on Snowflake.", {"ETL", "Airflow", "dbt", "Snowflake"}),
+    ("Rest assured, we offer flexible hours.", set()),
+    ("Strong communication skills and stakeholder management.", {"communication", "stakeholder management"}),
+    ("Node.js and TypeScript backend with Redis caching.", {"Node.js", "TypeScript", "Redis"}),
+    ("Exposure to ML and NLP, ideally LLMs.", {"machine learning", "natural language processing", "LLMs"}),
+]
+
+
+def naive_extract(text: str) -> list[str]:
+    return [n for n in keywords.SKILLS if n.lower() in text.lower()]
+
+
+def score_labelled(extract):
+    tp = fp = fn = 0
+    errors = []
+    for sentence, expected in LABELLED:
+        got = set(extract(sentence))
+        tp += len(got & expected)
+        fp += len(got - expected)
+        fn += len(expected - got)
+        if got != expected:
+            errors.append((sentence, sorted(got - expected), sorted(expected - got)))
+    precision = tp / (tp + fp) if tp + fp else 1.0
+    recall = tp / (tp + fn) if tp + fn else 1.0
+    return precision, recall, errors
+
+
+def spellings(name: str) -> list[str]:
+    variants = [name] + keywords.SKILLS[name]
+    if name not in keywords.CASE_SENSITIVE:
+        variants += [name.lower(), name.upper()]
+    return variants
+
+
+def make_pair(rng: random.Random):
+    # Go, R and C need a skills-list context; the hand-labelled set covers them
+    names = [n for n in keywords.SKILLS if n not in keywords.LIST_ONLY]
+    wanted = rng.sample(names, rng.randint(4, 12))
+    have = set(rng.sample(wanted, rng.randint(0, len(wanted))))
+    extra = rng.sample([n for n in names if n not in wanted], 5)
+
+    def mention(name):
+        return rng.choice(spellings(name))
+
+    job_desc = " ".join(
+        f"Experience with {mention(n)} is required." for n in wanted
+    ) + " " + rng.choice(DISTRACTORS)
+    resume = " ".join(
+        f"Used {mention(n)} to ship features." for n in [*have, *extra]
+    ) + " " + " ".join(rng.sample(DISTRACTORS, 2))
+    expected_matching = {n for n in wanted if n in have}
+    return resume, job_desc, expected_matching, set(wanted) - expected_matching
+
+
+def naive_match(resume: str, job_desc: str) -> dict:
+    """Baseline: case-insensitive substring test of canonical names only."""
+    resume, job_desc = resume.lower(), job_desc.lower()
+    wanted = [n for n in keywords.SKILLS if n.lower() in job_desc]
+    return {
+        "matching_keywords": [n for n in wanted if n.lower() in resume],
+        "missing_keywords": [n for n in wanted if n.lower() not in resume],
+    }
+
+
+def score(engine, pairs):
+    tp = fp = fn = 0
+    timings = []
+    for resume, job_desc, matching, missing in pairs:
+        start = time.perf_counter()
+        result = engine(resume, job_desc)
+        timings.append(time.perf_counter() - start)
+        for got, expected in ((result["matching_keywords"], matching), (result["missing_keywords"], missing)):
+            got = set(got)
+            tp += len(got & expected)
+            fp += len(got - expected)
+            fn += len(expected - got)
+    precision = tp / (tp + fp) if tp + fp else 1.0
+    recall = tp / (tp + fn) if tp + fn else 1.0
+    timings.sort()
+    return precision, recall, statistics.median(timings), timings[int(len(timings) * 0.99) - 1]
+
+
+async def time_suggestions(pairs, port: int, latency: float):
+    from benchmarks.app_env import configure_env
+    from benchmarks.fake_llm_server import serve
+
+    server, _ = serve(port=port, latency=latency)
+    configure_env(llm_base_url=f"http://127.0.0.1:{port}/v1")
+    from app.services import jd_match, llm_client
+
+    timings = []
+    try:
+        for i, (resume, job_desc, _, _) in enumerate(pairs):
+            start = time.perf_counter()
+            result = keywords.match_keywords(resume, job_desc)
+            await jd_match.suggest_improvements(
+                f"{resume} #{i}", job_desc, result["matching_keywords"], result["missing_keywords"]
+            )
+            timings.append(time.perf_counter() - start)
+        await llm_client.aclose()
+    finally:
+        server.shutdown()
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pairs", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--min-recall", type=float, default=0.95)
+    parser.add_argument("--min-labelled-precision", type=float, default=0.95)
+    parser.add_argument("--min-labelled-recall", type=float, default=0.9)
+    parser.add_argument("--llm-latency", type=float, default=None,
+                        help="also time keyword+suggestions against the fake server with this latency")
+    parser.add_argument("--port", type=int, default=8092)
+    args = parser.parse_args()
+
+    print(f"hand-labelled: {len(LABELLED)} sentences")
+    print(f"{'engine':<12} {'precision':>9} {'recall':>7}")
+    labelled = {}
+    for name, extract in (("lexicon", keywords.extract_keywords), ("naive", naive_extract)):
+        precision, recall, errors = labelled[name] = score_labelled(extract)
+        print(f"{name:<12} {precision:>9.3f} {recall:>7.3f}")
+    for sentence, wrong, missed in labelled["lexicon"][2]:
+        print(f"  {sentence!r}: extra {wrong}, missed {missed}")
+
+    print(f"\ngenerated: {args.pairs} pairs")
+    rng = random.Random(args.seed)
+    pairs = [make_pair(rng) for _ in range(args.pairs)]
+    print(f"{'engine':<12} {'precision':>9} {'recall':>7} {'p50 ms':>8} {'p99 ms':>8}")
+    results = {}
+    for name, engine in (("lexicon", keywords.match_keywords), ("naive", naive_match)):
+        precision, recall, p50, p99 = results[name] = score(engine, pairs)
+        print(f"{name:<12} {precision:>9.3f} {recall:>7.3f} {p50 * 1000:>8.3f} {p99 * 1000:>8.3f}")
+    if args.llm_latency is not None:
+        p50 = asyncio.run(time_suggestions(pairs[:50], args.port, args.llm_latency))
+        print(f"{'+ AI tips':<12} {'-':>9} {'-':>7} {p50 * 1000:>8.1f}")
+    if results["lexicon"][1] < args.min_recall:
+        sys.exit(f"lexicon recall below {args.min_recall}")
+    if labelled["lexicon"][0] < args.min_labelled_precision or labelled["lexicon"][1] < args.min_labelled_recall:
+        sys.exit("lexicon below the precision/recall floor on the hand-labelled set")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Latency of the review and job-match list endpoints with many rows per resume.
+
+Compares the current endpoints (pre-serialized payload column) with the old
+implementation, which loaded ``feedback`` / ``ai_response`` and ran
+``json.loads`` on every row of every request. The old handlers are mounted
+on a bench-only route so both run through the same app and database.
+
+    python benchmarks/bench_list_reviews.py --reviews 1000 --limit 50 200
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.app_env import configure_env
+
+SUMMARY = ("Strong backend engineer with production Kubernetes and PostgreSQL experience; "
+           "achievements would read better with concrete numbers. ") * 4
+SUGGESTIONS = [
+    "Quantify the impact of your most recent project with latency or cost figures.",
+    "Move the skills section above education and group it by domain.",
+    "Add links to public code samples or talks.",
+    "Trim the summary to three lines that match the roles you apply for.",
+]
+
+
+def populate(engine, user_id: int, resume_id: int, count: int):
+    from sqlalchemy import insert
+    from app.models.job_desc import JobMatch
+    from app.models.review import Review
+    from app.services.jd_match import match_payload
+    from app.services.review_pipeline import review_payload
+
+    start = datetime(2026, 1, 1)
+    reviews, matches = [], []
+    for i in range(1, count + 1):
+        review_id = resume_id * count + i
+        created_at = start + timedelta(minutes=i)
+        feedback = {"score": i % 100, "suggestions": SUGGESTIONS, "summary": SUMMARY}
+        reviews.append({
+            "id": review_id, "resume_id": resume_id, "user_id": user_id, "created_at": created_at,
+            "feedback": json.dumps(feedback), "score": i % 100, "suggestions": SUGGESTIONS, "summary": SUMMARY,
+            "payload": review_payload(review_id, created_at, i % 100, SUGGESTIONS, SUMMARY),
+        })
+        result = {"matching_keywords": ["Python", "Kubernetes", "PostgreSQL"], "missing_keywords": ["Go", "Terraform"],
+                  "keyword_coverage": 0.6, "suggestions": SUGGESTIONS}
+        matches.append({
+            "id": review_id, "resume_id": resume_id, "user_id": user_id, "created_at": created_at,
+            "job_description": "Backend engineer, Python and Kubernetes", "ai_response": json.dumps(result),
+            "result": result, "payload": match_payload(review_id, "Backend engineer, Python and Kubernetes", result, created_at),
+        })
+    with engine.begin() as connection:
+        connection.execute(insert(Review), reviews)
+        connection.execute(insert(JobMatch), matches)
+
+
+def mount_legacy_routes(app):
+    from fastapi import Depends
+    from sqlmodel import select
+    from app.auth.dependencies import get_current_user
+    from app.db.session import get_session
+    from app.models.job_desc import JobMatch
+    from app.models.review import Review
+    from app.services.review_pipeline import parse_feedback
+    from app.utils.pagination import PageParams, page_params, page_response, paginate
+
+    @app.get("/bench/legacy/reviews/{resume_id}")
+    def legacy_reviews(resume_id: int, page: PageParams = Depends(page_params),
+                       session=Depends(get_session), user=Depends(get_current_user)):
+        statement = select(Review.id, Review.score, Review.created_at, Review.feedback).where(
+            Review.resume_id == resume_id, Review.user_id == user.id)
+        reviews, next_cursor = paginate(session, statement, Review.id, page)
+        result = []
+        for r in reviews:
+            score, suggestions, summary = parse_feedback(r.feedback, r.score)
+            result.append({"id": r.id, "score": score, "created_at": r.created_at,
+                           "suggestions": suggestions, "summary": summary})
+        return page_response(result, next_cursor)
+
+    @app.get("/bench/legacy/matches/{resume_id}")
+    def legacy_matches(resume_id: int, page: PageParams = Depends(page_params),
+                       session=Depends(get_session), user=Depends(get_current_user)):
+        statement = select(JobMatch.id, JobMatch.job_description, JobMatch.ai_response, JobMatch.created_at).where(
+            JobMatch.resume_id == resume_id, JobMatch.user_id == user.id)
+        matches, next_cursor = paginate(session, statement, JobMatch.id, page)
+        return page_response([
+            {"id": m.id, "job_description": m.job_description,
+             "ai_response": json.loads(m.ai_response) if m.ai_response else {}, "created_at": m.created_at}
+            for m in matches
+        ], next_cursor)
+
+
+def walk(client, url: str, headers: dict, limit: int):
+    """Fetch every page; returns (items, per-page seconds)."""
+    items, timings, cursor = [], [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        started = time.perf_counter()
+        response = client.get(url, params=params, headers=headers)
+        timings.append(time.perf_counter() - started)
+        body = response.json()
+        items.extend(body["items"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return items, timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reviews", type=int, default=1000, help="reviews and job matches per resume")
+    parser.add_argument("--limit", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+    configure_env(args.database_url)
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import insert
+    from app.db.session import engine
+    from app.main import app
+    from app.models.resume import Resume
+
+    mount_legacy_routes(app)
+    with TestClient(app) as client:
+        credentials = {"email": "bench@example.com", "password": "secret"}
+        client.post("/auth/register", json=credentials)
+        token = client.post("/auth/login", json=credentials).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        with engine.begin() as connection:
+            connection.execute(insert(Resume), [{"id": 1, "user_id": 1, "filename": "resume.pdf",
+                                                 "content": "python", "uploaded_at": datetime.utcnow()}])
+        populate(engine, 1, 1, args.reviews)
+
+        print(f"{args.reviews} rows per resume")
+        print(f"{'endpoint':<12} {'limit':>5} {'legacy p50 ms':>14} {'payload p50 ms':>15} {'speedup':>8}")
+        for name, legacy_url, url in [
+            ("reviews", "/bench/legacy/reviews/1", "/resume/1/reviews"),
+            ("job matches", "/bench/legacy/matches/1", "/job_match/1/matches"),
+        ]:
+            for limit in args.limit:
+                legacy_items, _ = walk(client, legacy_url, headers, limit)
+                items, _ = walk(client, url, headers, limit)
+                if legacy_items != items:
+                    sys.exit(f"{name}: payload differs from the legacy response")
+                legacy, current = [], []
+                for _ in range(args.repeat):
+                    legacy.extend(walk(client, legacy_url, headers, limit)[1])
+                    current.extend(walk(client, url, headers, limit)[1])
+                old, new = statistics.median(legacy), statistics.median(current)
+                print(f"{name:<12} {limit:>5} {old * 1000:>14.2f} {new * 1000:>15.2f} {old / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Drive app.services.llm_client against the fake server and check its limits.
+
+    python benchmarks/bench_llm_client.py --requests 60 --users 6 --latency 0.2
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_llm_server import serve
+
+
+async def run(args):
+    from app.services import llm_client
+
+    async def one(i: int):
+        return await llm_client.complete(f"Resume #{i}", "fake-model", user_id=i % args.users)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(one(i) for i in range(args.requests)), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    await llm_client.aclose()
+    errors = [r for r in results if isinstance(r, Exception)]
+    return elapsed, errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=60)
+    parser.add_argument("--users", type=int, default=6)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--max-concurrency", type=int, default=8)
+    parser.add_argument("--max-per-user", type=int, default=2)
+    args = parser.parse_args()
+
+    server, state = serve(port=args.port, latency=args.latency)
+    os.environ["LLM_BASE_URL"] = f"http://127.0.0.1:{args.port}/v1"
+    os.environ.setdefault("OPENROUTER_API_KEY", "fake")
+    os.environ["LLM_MAX_CONCURRENCY"] = str(args.max_concurrency)
+    os.environ["LLM_MAX_CONCURRENCY_PER_USER"] = str(args.max_per_user)
+    try:
+        elapsed, errors = asyncio.run(run(args))
+    finally:
+        server.shutdown()
+
+    stats = state.snapshot()
+    allowed = min(args.max_concurrency, args.users * args.max_per_user)
+    print(f"requests={args.requests} elapsed={elapsed:.2f}s throughput={args.requests / elapsed:.1f}/s errors={len(errors)}")
+    print(f"server peak in-flight={stats['peak_in_flight']} (limit {allowed})")
+    if stats["peak_in_flight"] > allowed:
+        sys.exit("in-flight limit exceeded")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Hedging and circuit breaking in app.services.llm_router against the fake server.
+
+Two models, ``fake-a`` first: a share of fake-a's answers are slow, so the
+tail latency is compared with hedging off and on. Then fake-a fails every call:
+requests must still succeed through fake-b while fake-a's circuit opens, and
+once fake-a is healthy again the circuit must close after the cooldown.
+
+    python benchmarks/bench_llm_router.py --requests 300 --concurrency 8 --slow-rate 0.05
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_llm_server import serve
+
+MODELS = [("fake-a", 1.0), ("fake-b", 1.0)]
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+async def drive(router, requests: int, concurrency: int):
+    """Latencies and failures of ``requests`` calls, ``concurrency`` at a time."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], []
+
+    async def one(i: int):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await router.complete(f"Resume #{i}")
+            except Exception as exc:
+                errors.append(exc)
+                return
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return latencies, errors
+
+
+async def run(args, state) -> list[str]:
+    from app.services import llm_client, llm_router
+
+    problems = []
+    print(f"{'hedging':<8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'hedges':>7} {'won':>5} {'extra load':>10}")
+    tails = {}
+    for hedge in (False, True):
+        router = llm_router.Router("bench", MODELS, hedge=hedge)
+        before = state.snapshot()["requests"]
+        latencies, errors = await drive(router, args.requests, args.concurrency)
+        sent = state.snapshot()["requests"] - before
+        tails[hedge] = percentile(latencies, 0.99)
+        print(f"{'on' if hedge else 'off':<8} {statistics.median(latencies) * 1000:>6.0f}ms "
+              f"{percentile(latencies, 0.95) * 1000:>6.0f}ms {tails[hedge] * 1000:>6.0f}ms "
+              f"{max(latencies) * 1000:>6.0f}ms {router.hedges['launched']:>7} {router.hedges['won']:>5} "
+              f"{sent / args.requests - 1:>10.1%}")
+        if errors:
+            problems.append(f"hedging {'on' if hedge else 'off'}: {len(errors)} failed requests")
+    if tails[True] >= tails[False]:
+        problems.append("hedging did not lower p99")
+
+    router = llm_router.Router("bench", MODELS)
+    state.set_fault("fake-a", error_rate=1.0)
+    _, errors = await drive(router, args.requests // 4, args.concurrency)
+    primary = router.models[0]
+    print(f"fake-a failing: {len(errors)} failed requests, fake-a circuit {primary.breaker.state}, "
+          f"attempts error={primary.counts['error']} skipped={primary.counts['skipped']}")
+    if errors:
+        problems.append(f"{len(errors)} requests failed although fake-b was healthy")
+    if primary.breaker.state != llm_router.OPEN:
+        problems.append("fake-a circuit did not open")
+
+    state.set_fault("fake-a", error_rate=0.0)
+    await asyncio.sleep(llm_router.LLM_BREAKER_COOLDOWN_SECONDS)
+    await drive(router, args.concurrency, 1)
+    print(f"fake-a healthy again: circuit {primary.breaker.state}, ok={primary.counts['ok']}")
+    if primary.breaker.state != llm_router.CLOSED:
+        problems.append("fake-a circuit did not close after the cooldown")
+    await llm_client.aclose()
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--slow-rate", type=float, default=0.05, help="share of fake-a answers that are slow")
+    parser.add_argument("--slow-latency", type=float, default=1.0)
+    parser.add_argument("--port", type=int, default=8089)
+    args = parser.parse_args()
+
+    server, state = serve(port=args.port, latency=args.latency, jitter=args.jitter)
+    state.set_fault("fake-a", slow_rate=args.slow_rate, slow_latency=args.slow_latency)
+    os.environ["LLM_BASE_URL"] = f"http://127.0.0.1:{args.port}/v1"
+    os.environ.setdefault("OPENROUTER_API_KEY", "fake")
+    os.environ.setdefault("LLM_HEDGE_MIN_DELAY_SECONDS", "0.05")
+    os.environ.setdefault("LLM_BREAKER_FAILURES", "5")
+    os.environ.setdefault("LLM_BREAKER_COOLDOWN_SECONDS", "1")
+    try:
+        problems = asyncio.run(run(args, state))
+    finally:
+        server.shutdown()
+    if problems:
+        sys.exit("; ".join(problems))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Uploads/second for resume parsing: inline (old path) vs the process pool.
+
+    python benchmarks/bench_parse.py --files 40 --concurrency 8
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import corpus
+from app.services import parser
+
+
+def bench_inline(files) -> float:
+    start = time.perf_counter()
+    for filename, content in files:
+        parser.parse_resume_file(filename, content)
+    return time.perf_counter() - start
+
+
+async def bench_pool(files, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(filename, content):
+        async with semaphore:
+            await parser.parse_resume_file_async(filename, content)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(f, c) for f, c in files))
+    return time.perf_counter() - start
+
+
+async def run_pool(files, concurrency):
+    # Warm the workers up so process spawn time is not counted
+    await parser.parse_resume_file_async(*files[0])
+    parser._cache.clear()
+    cold = await bench_pool(files, concurrency)
+    warm = await bench_pool(files, concurrency)
+    parser.shutdown_executor()
+    return cold, warm
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--files", type=int, default=40)
+    arg_parser.add_argument("--concurrency", type=int, default=8)
+    args = arg_parser.parse_args()
+
+    files = corpus(args.files)
+    total_mb = sum(len(c) for _, c in files) / 1e6
+    print(f"corpus: {len(files)} files, {total_mb:.1f} MB, pool workers={parser.PARSER_MAX_WORKERS}")
+
+    inline = bench_inline(files)
+    cold, warm = asyncio.run(run_pool(files, args.concurrency))
+    for label, elapsed in [("inline", inline), ("pool", cold), ("pool, cached re-upload", warm)]:
+        print(f"{label:<24} {len(files) / elapsed:10.1f} uploads/s  ({elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
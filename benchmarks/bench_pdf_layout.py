@@ -0,0 +1,79 @@
+"""Old prefix-measuring wrap_text vs the width-table wrap in app.services.pdf_layout.
+
+    python benchmarks/bench_pdf_layout.py --words 500 5000 50000
+"""
+import argparse
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+from app.services import pdf_layout
+from app.services.review_download import generate_review_pdf
+
+WORDS = ("candidate demonstrates strong ownership of backend services, improved latency by 40% "
+         "and mentored engineers; however impact statements lack metrics and the summary is "
+         "long-winded. Consider Kubernetes, PostgreSQL, observability, cost-optimisation").split()
+
+
+def legacy_wrap_text(text, font, font_size, max_width, canvas_obj):
+    """The previous implementation from review_download, kept here for comparison."""
+    lines = []
+    for paragraph in text.splitlines():
+        line = ''
+        for word in paragraph.split():
+            test_line = f"{line} {word}".strip()
+            if canvas_obj.stringWidth(test_line, font, font_size) <= max_width:
+                line = test_line
+            else:
+                if line:
+                    lines.append(line)
+                line = word
+        if line:
+            lines.append(line)
+    return lines
+
+
+def summary(words: int, seed: int = 1) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--words", type=int, nargs="+", default=[500, 5000, 50000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    c = canvas.Canvas(io.BytesIO(), pagesize=letter)
+    max_width = letter[0] - 2 * pdf_layout.MARGIN - 20
+    print(f"{'words':>7} {'legacy ms':>10} {'layout ms':>10} {'speedup':>8} {'render ms':>10}")
+    for words in args.words:
+        text = summary(words)
+        old_lines = legacy_wrap_text(text, "Helvetica", 12, max_width, c)
+        new_lines = pdf_layout.wrap(text, pdf_layout.metrics("Helvetica", 12), max_width)
+        if old_lines != new_lines:
+            sys.exit(f"line breaks differ for {words} words")
+        old = best_of(lambda: legacy_wrap_text(text, "Helvetica", 12, max_width, c), args.repeat)
+        new = best_of(lambda: pdf_layout.wrap(text, pdf_layout.metrics("Helvetica", 12), max_width), args.repeat)
+        render = best_of(lambda: generate_review_pdf("resume.pdf", 80, ["Add metrics."] * 3, text, io.BytesIO()), 1)
+        print(f"{words:>7} {old * 1000:>10.2f} {new * 1000:>10.2f} {old / new:>7.1f}x {render * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Prompt-input size before and after normalization and token budgeting.
+
+Parses the generated resume corpus, segments each resume the way uploads do
+and reports the estimated tokens of the raw text against the budgeted review
+and match inputs, plus the segmentation time per resume. First checks that
+page headers and footers are dropped while lines a resume repeats on purpose,
+like the same job title and bullet under three jobs, are kept.
+
+    python benchmarks/bench_prompt_budget.py --count 40 --max-pages 8 --budget 2500
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import corpus
+
+JOB = ["Software Engineer", "Acme Corp, 2019-2021", "- Built APIs in Python"]
+HEADER, FOOTER = "Jane Doe - jane@example.com", "Confidential"
+REPEATED_LINES_RESUME = "\f".join([
+    "\n".join(["Jane Doe", "jane@example.com", "Experience", *JOB, *JOB, FOOTER, "1"]),
+    "\n".join([HEADER, *JOB, "Skills", "Python, SQL", FOOTER, "Page 2 of 3"]),
+    "\n".join([HEADER, "Education", "BSc Computer Science", FOOTER, "3"]),
+])
+
+
+def check_repeated_lines(resume_sections) -> list[str]:
+    lines = resume_sections.normalize_text(REPEATED_LINES_RESUME)
+    problems = []
+    for line in JOB:
+        if lines.count(line) != 3:
+            problems.append(f"{line!r} kept {lines.count(line)} times, expected 3")
+    for line in (HEADER, FOOTER):
+        if lines.count(line) != 1:
+            problems.append(f"page edge line {line!r} kept {lines.count(line)} times, expected 1")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=40)
+    parser.add_argument("--max-pages", type=int, default=8)
+    parser.add_argument("--budget", type=int, default=2500, help="resume tokens per prompt")
+    args = parser.parse_args()
+
+    from app.services import resume_sections
+    from app.services.parser import parse_resume_file
+
+    problems = check_repeated_lines(resume_sections)
+    if problems:
+        sys.exit("; ".join(problems))
+
+    raw, review, match, timings = [], [], [], []
+    for filename, data in corpus(args.count, args.max_pages):
+        text = parse_resume_file(filename, data)
+        started = time.perf_counter()
+        sections = resume_sections.segment(text)
+        timings.append(time.perf_counter() - started)
+        raw.append(resume_sections.estimate_tokens(text))
+        review.append(resume_sections.estimate_tokens(resume_sections.fit_sections(sections, args.budget)))
+        match.append(resume_sections.estimate_tokens(
+            resume_sections.fit_sections(sections, args.budget, resume_sections.MATCH_PRIORITY)))
+        if max(review[-1], match[-1]) > args.budget:
+            sys.exit(f"{filename}: prompt input over budget ({review[-1]} / {match[-1]} > {args.budget})")
+
+    print(f"{len(raw)} resumes, budget {args.budget} tokens")
+    print(f"{'':<8} {'mean':>8} {'max':>8} {'total':>9}")
+    for name, values in [("raw", raw), ("review", review), ("match", match)]:
+        print(f"{name:<8} {statistics.mean(values):>8.0f} {max(values):>8} {sum(values):>9}")
+    print(f"review input is {1 - sum(review) / sum(raw):.1%} smaller; "
+          f"{sum(1 for r in raw if r > args.budget)} resumes were over budget")
+    print(f"segment p50 {statistics.median(timings) * 1000:.2f} ms, max {max(timings) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
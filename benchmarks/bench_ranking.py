@@ -0,0 +1,78 @@
+"""Throughput and sanity of BM25 batch ranking (app.services.ranking).
+
+Each posting asks for a random set of skills; one resume per posting is
+written around that posting's skills, so the source posting should come out
+on top when that resume is ranked against all postings.
+
+    python benchmarks/bench_ranking.py --postings 500 --resumes 2000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import resume_text
+from app.services import keywords, ranking
+
+
+def make_postings(count: int, rng: random.Random) -> list[tuple[list[str], str]]:
+    names = list(keywords.SKILLS)
+    postings = []
+    for i in range(count):
+        skills = rng.sample(names, 8)
+        text = (
+            f"Posting {i}: we are hiring an engineer. Must have {', '.join(skills[:5])}. "
+            f"Nice to have: {', '.join(skills[5:])}. Remote friendly, competitive pay."
+        )
+        postings.append((skills, text))
+    return postings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--postings", type=int, default=500)
+    parser.add_argument("--resumes", type=int, default=2000)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--min-hit-rate", type=float, default=0.9)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    postings = make_postings(args.postings, rng)
+    descriptions = [text for _, text in postings]
+    # The first resumes are written for a known posting; the rest are generic filler
+    targeted = [
+        (i, f"Engineer skilled in {', '.join(skills)}. " + resume_text(i, 6))
+        for i, (skills, _) in enumerate(postings[:min(args.resumes, args.postings)])
+    ]
+    resumes = [text for _, text in targeted] + [resume_text(10_000 + i, 10) for i in range(args.resumes - len(targeted))]
+
+    start = time.perf_counter()
+    index = ranking.BM25Index(descriptions)
+    built = time.perf_counter() - start
+    start = time.perf_counter()
+    scores = index.score(resumes)
+    scored = time.perf_counter() - start
+    pairs = len(resumes) * len(descriptions)
+    hits = sum(source in ranking.top_k(scores[row], 1) for row, (source, _) in enumerate(targeted))
+    print(f"resumes x postings: {len(resumes)} x {len(descriptions)} = {pairs} pairs")
+    print(f"index build {built * 1000:.1f} ms, scoring {scored * 1000:.1f} ms "
+          f"-> {pairs / max(scored, 1e-9):,.0f} pairs/s")
+    print(f"source posting ranked first for {hits}/{len(targeted)} targeted resumes")
+
+    start = time.perf_counter()
+    ranked = ranking.rank_resumes(descriptions[0], resumes, args.top_k)
+    print(f"rank_resumes (one posting vs {len(resumes)} resumes, top {args.top_k}): "
+          f"{(time.perf_counter() - start) * 1000:.1f} ms; best {ranked[0] if ranked else None}")
+    start = time.perf_counter()
+    ranking.rank_jobs(resumes[0], descriptions, args.top_k)
+    print(f"rank_jobs (one resume vs {len(descriptions)} postings): {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    if targeted and hits / len(targeted) < args.min_hit_rate:
+        sys.exit("ranking sanity check failed")
+
+
+if __name__ == "__main__":
+    main()
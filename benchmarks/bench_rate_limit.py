@@ -0,0 +1,48 @@
+"""Rate limiter cost per reservation and correctness under a concurrent burst.
+
+    python benchmarks/bench_rate_limit.py --burst 50 --limit 5
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.app_env import configure_env
+
+
+def check(limiter, name: str, burst: int, limit: int, calls: int):
+    started = time.perf_counter()
+    for i in range(calls):
+        limiter.reserve(f"bench:{i}", limit, 86400)
+    per_call = (time.perf_counter() - started) / calls
+
+    with ThreadPoolExecutor(burst) as pool:
+        results = list(pool.map(lambda _: limiter.reserve("burst:1", limit, 86400)[0], range(burst)))
+    allowed = sum(results)
+    print(f"{name:<7} {per_call * 1e6:8.1f} us/reservation; burst of {burst}: {allowed} allowed (limit {limit})")
+    return allowed == limit
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--burst", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+    configure_env()
+
+    from app.db.base import run_migrations
+    from app.services.rate_limit import InMemoryTokenBucket, SQLTokenBucket
+
+    run_migrations()
+    ok = check(InMemoryTokenBucket(), "memory", args.burst, args.limit, args.calls)
+    ok &= check(SQLTokenBucket(), "sql", args.burst, args.limit, min(args.calls, 500))
+    if not ok:
+        sys.exit("burst let through more (or fewer) requests than the limit")
+
+
+if __name__ == "__main__":
+    main()
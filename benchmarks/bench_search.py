@@ -0,0 +1,88 @@
+"""Index build time and query latency of resume search at scale.
+
+Fills a throwaway SQLite database with synthetic resumes, indexes them the
+way uploads do, and times a mix of term, boolean and phrase queries.
+
+    python benchmarks/bench_search.py --resumes 100000
+    python benchmarks/bench_search.py --database-url postgresql://... --resumes 100000
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.app_env import configure_env
+from benchmarks.fixtures import resume_text
+
+QUERIES = [
+    "kubernetes",
+    "python kafka",
+    "python OR golang",
+    "terraform -docker",
+    '"machine learning"',
+    '"data pipeline" aws',
+    "graphql NOT react",
+    # Selective: the rare term bounds the candidates
+    "candidate4242 python",
+    '"candidate 31337"',
+    "candidate777 OR candidate778",
+]
+
+
+def populate(engine, count: int, paragraphs: int):
+    from sqlalchemy import insert
+    from app.models.resume import Resume
+    from app.models.user import User
+
+    with engine.begin() as connection:
+        connection.execute(insert(User), [{"email": "bench@example.com", "hashed_password": "x", "is_active": True, "role": "user"}])
+        for start in range(0, count, 5000):
+            connection.execute(insert(Resume), [
+                {"user_id": 1, "filename": f"resume_{i}.pdf", "content": resume_text(i, paragraphs),
+                 "uploaded_at": datetime.utcnow()}
+                for i in range(start, min(start + 5000, count))
+            ])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resumes", type=int, default=100_000)
+    parser.add_argument("--paragraphs", type=int, default=6)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    configure_env(args.database_url)
+    from sqlmodel import Session
+    from app.db.base import run_migrations
+    from app.db.session import engine
+    from app.services import search
+
+    run_migrations()
+    start = time.perf_counter()
+    populate(engine, args.resumes, args.paragraphs)
+    print(f"inserted {args.resumes} resumes in {time.perf_counter() - start:.1f}s")
+
+    start = time.perf_counter()
+    with Session(engine) as session:
+        indexed = search.reindex_all(session)
+    elapsed = time.perf_counter() - start
+    print(f"indexed {indexed} resumes in {elapsed:.1f}s ({indexed / elapsed:,.0f} resumes/s)")
+
+    print(f"{'query':<24} {'hits':>8} {'p50 ms':>9} {'max ms':>9}")
+    with Session(engine) as session:
+        for query in QUERIES:
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                total, page = search.search(session, query, 0, 50)
+                timings.append(time.perf_counter() - started)
+            print(f"{query:<24} {total:>8} {statistics.median(timings) * 1000:>9.1f} {max(timings) * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
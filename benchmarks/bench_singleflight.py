@@ -0,0 +1,50 @@
+"""Fire N identical review prompts at once and count upstream calls.
+
+    python benchmarks/bench_singleflight.py --duplicates 20 --latency 0.3
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.app_env import configure_env
+from benchmarks.fake_llm_server import serve
+
+
+async def run(duplicates: int):
+    from app.services import llm_cache, llm_client
+    from app.services.ai_review import review_resume_ai
+
+    started = time.perf_counter()
+    answers = await asyncio.gather(*(
+        review_resume_ai("Same bootcamp template resume", user_id=i) for i in range(duplicates)
+    ))
+    elapsed = time.perf_counter() - started
+    await llm_client.aclose()
+    return elapsed, len(set(answers)), llm_cache.stats()["single_flight"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--duplicates", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--port", type=int, default=8091)
+    args = parser.parse_args()
+    server, state = serve(port=args.port, latency=args.latency)
+    configure_env(llm_base_url=f"http://127.0.0.1:{args.port}/v1")
+    try:
+        elapsed, distinct, flights = asyncio.run(run(args.duplicates))
+    finally:
+        server.shutdown()
+    upstream = state.snapshot()["requests"]
+    print(f"{args.duplicates} identical requests -> {upstream} upstream call(s), "
+          f"{distinct} distinct answer(s), {elapsed:.2f}s; single-flight {flights}")
+    if upstream != 1:
+        sys.exit("identical in-flight requests were not coalesced")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Peak Python memory of the streaming upload path for growing file sizes.
+
+With the spooled reader the peak stays near UPLOAD_SPOOL_BYTES + one chunk no
+matter how big the upload is; the old ``await file.read()`` path grows with it.
+
+    python benchmarks/bench_upload_memory.py --sizes-mb 1 8 32
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.upload import UPLOAD_CHUNK_BYTES, UPLOAD_SPOOL_BYTES, read_upload
+
+
+class FakeUpload:
+    """Just enough of UploadFile: yields a PDF-looking body of ``size`` bytes chunk by chunk."""
+
+    def __init__(self, size: int, filename: str = "resume.pdf"):
+        self.filename = filename
+        self.remaining = size
+        self.first = True
+
+    async def read(self, n: int = -1) -> bytes:
+        if self.remaining <= 0:
+            return b""
+        n = self.remaining if n < 0 else min(n, self.remaining)
+        self.remaining -= n
+        if self.first:
+            self.first = False
+            return b"%PDF-" + b"x" * (n - 5)
+        return b"x" * n
+
+
+async def streamed_peak(size: int) -> int:
+    tracemalloc.start()
+    upload = await read_upload(FakeUpload(size), max_bytes=size)
+    with upload:
+        upload.source()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+async def read_all_peak(size: int) -> int:
+    tracemalloc.start()
+    content = await FakeUpload(size).read()
+    del content
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes-mb", type=float, nargs="+", default=[1, 8, 32])
+    args = parser.parse_args()
+    bound = UPLOAD_SPOOL_BYTES + 2 * UPLOAD_CHUNK_BYTES
+    failed = False
+    for size_mb in args.sizes_mb:
+        size = int(size_mb * 1024 * 1024)
+        streamed = asyncio.run(streamed_peak(size))
+        read_all = asyncio.run(read_all_peak(size))
+        ok = streamed <= bound * 1.5
+        failed |= not ok
+        print(f"{size_mb:6.1f} MB upload: streamed peak {streamed / 1024:8.0f} KiB, "
+              f"read() peak {read_all / 1024:8.0f} KiB {'OK' if ok else 'OVER BOUND'}")
+    print(f"bound: {bound / 1024:.0f} KiB")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""Local stand-in for the OpenAI chat-completions API.
+
+Run it and point the app at it:
+
+    python benchmarks/fake_llm_server.py --port 8089 --latency 0.5 --jitter 0.5 --shape mixed
+    LLM_BASE_URL=http://127.0.0.1:8089/v1 uvicorn app.main:app
+
+Each completion sleeps ``latency`` plus a uniform random ``jitter``. ``--shape``
+picks how answers are written, so the app's cleanup and fallback paths get
+exercised too: plain JSON, a fenced code block, prose that is not JSON,
+suggestions as one numbered string, or an oversized answer (``mixed`` draws one
+per request).
+
+Faults are injected per request: ``--error-rate`` answers that share with a 503,
+``--slow-rate`` adds ``--slow-latency`` to that share (a latency tail), and
+``--fault MODEL latency=2,error_rate=1`` overrides any of these for one model,
+which is how fallback, hedging and the circuit breakers are exercised.
+``POST /faults`` with ``{"model": ..., "error_rate": 0}`` changes them while
+running (no ``model`` changes the defaults).
+
+GET /stats reports request counts, per-model requests and errors and the peak
+number of concurrent requests, which is how the client-side in-flight limits are checked.
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REVIEW_RESPONSE = {
+    "score": 78,
+    "suggestions": [
+        "Quantify the impact of your most recent project.",
+        "Move the skills section above education.",
+        "Add links to public code samples.",
+    ],
+    "summary": "Solid backend experience; achievements could be more concrete.",
+}
+
+MATCH_RESPONSE = {
+    "matching_keywords": ["Python", "SQL"],
+    "missing_keywords": ["Docker", "AWS"],
+    "suggestions": [
+        "Mention any container experience.",
+        "Describe cloud deployments you have done.",
+        "Highlight SQL performance work.",
+    ],
+}
+
+
+SHAPES = ("json", "fenced", "prose", "numbered", "large")
+FAULTS = ("latency", "jitter", "error_rate", "slow_rate", "slow_latency")
+SECTION_LABEL = re.compile(r"^\[([a-z]+(?:-\d+)?)\]$", re.MULTILINE)
+
+
+class FakeLLMState:
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, shape: str = "json", seed: int = 0,
+                 error_rate: float = 0.0, slow_rate: float = 0.0, slow_latency: float = 0.0):
+        if shape not in SHAPES + ("mixed",):
+            raise ValueError(f"Unknown response shape {shape!r}")
+        self.defaults = {"latency": latency, "jitter": jitter, "error_rate": error_rate,
+                         "slow_rate": slow_rate, "slow_latency": slow_latency}
+        # model -> the fault settings that differ from the defaults
+        self.faults = {}
+        self.shape = shape
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.per_model = {}
+
+    def set_fault(self, model: str = None, **fault):
+        unknown = set(fault) - set(FAULTS)
+        if unknown:
+            raise ValueError(f"Unknown fault settings {sorted(unknown)}")
+        with self.lock:
+            target = self.defaults if model is None else self.faults.setdefault(model, {})
+            target.update({key: float(value) for key, value in fault.items()})
+
+    def enter(self):
+        with self.lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def draw(self, model: str = None):
+        """(seconds to sleep, shape, whether to fail) for one completion."""
+        with self.lock:
+            fault = {**self.defaults, **self.faults.get(model, {})}
+            delay = fault["latency"] + self.rng.uniform(0, fault["jitter"])
+            if self.rng.random() < fault["slow_rate"]:
+                delay += fault["slow_latency"]
+            fail = self.rng.random() < fault["error_rate"]
+            shape = self.rng.choice(SHAPES) if self.shape == "mixed" else self.shape
+            counts = self.per_model.setdefault(model, {"requests": 0, "errors": 0})
+            counts["requests"] += 1
+            counts["errors"] += fail
+        return delay, shape, fail
+
+    def leave(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "models": {str(model): dict(counts) for model, counts in self.per_model.items()},
+            }
+
+
+def pick_response(prompt: str) -> dict:
+    if "job description" in prompt.lower() and '"score"' not in prompt:
+        return MATCH_RESPONSE
+    # Per-section feedback for every ``[section-id]`` the review prompt labels
+    sections = {
+        key: {"score": 60 + sum(map(ord, key)) % 40, "suggestions": [f"Tighten the {key} section."]}
+        for key in SECTION_LABEL.findall(prompt)
+    }
+    return {**REVIEW_RESPONSE, "sections": sections} if sections else REVIEW_RESPONSE
+
+
+def render(body: dict, shape: str) -> str:
+    """Write ``body`` the way a model might answer."""
+    if shape == "fenced":
+        return "```json\n" + json.dumps(body, indent=2) + "\n```"
+    if shape == "prose":
+        return "Overall this looks good. " + " ".join(body.get("suggestions", []))
+    if shape == "numbered":
+        suggestions = body.get("suggestions", [])
+        return json.dumps({**body, "suggestions": "\n".join(f"{i}. {s}" for i, s in enumerate(suggestions, 1))})
+    if shape == "large":
+        suggestions = body.get("suggestions", [])
+        large = {**body, "suggestions": suggestions * 10}
+        if "summary" in body:
+            large["summary"] = " ".join([body["summary"]] * 60)
+        return json.dumps(large)
+    return json.dumps(body)
+
+
+def make_handler(state: FakeLLMState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status: int, body: dict):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            try:
+                self.wfile.write(data)
+            except (BrokenPipeError, ConnectionResetError):
+                # The client gave up, e.g. a hedged request that lost the race
+                self.close_connection = True
+
+        def do_GET(self):
+            if self.path.rstrip("/").endswith("/stats"):
+                self._send_json(200, state.snapshot())
+            else:
+                self._send_json(404, {"error": {"message": "not found"}})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if self.path.rstrip("/").endswith("/faults"):
+                try:
+                    state.set_fault(**request)
+                except (TypeError, ValueError) as exc:
+                    self._send_json(400, {"error": {"message": str(exc)}})
+                    return
+                self._send_json(200, {"defaults": state.defaults, "models": state.faults})
+                return
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": "not found"}})
+                return
+            state.enter()
+            try:
+                delay, shape, fail = state.draw(request.get("model"))
+                time.sleep(delay)
+                if fail:
+                    self._send_json(503, {"error": {"message": "Injected failure", "type": "server_error"}})
+                    return
+                prompt = request.get("messages", [{}])[-1].get("content", "")
+                content = render(pick_response(prompt), shape)
+                self._send_json(200, {
+                    "id": f"chatcmpl-{uuid.uuid4().hex}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": request.get("model", "fake"),
+                    "choices": [{
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {"role": "assistant", "content": content},
+                    }],
+                    "usage": {
+                        "prompt_tokens": len(prompt) // 4,
+                        "completion_tokens": len(content) // 4,
+                        "total_tokens": (len(prompt) + len(content)) // 4,
+                    },
+                })
+            finally:
+                state.leave()
+
+    return Handler
+
+
+def serve(host: str = "127.0.0.1", port: int = 8089, latency: float = 0.0, jitter: float = 0.0,
+          shape: str = "json", **faults):
+    """Start the server in a daemon thread and return (server, state)."""
+    state = FakeLLMState(latency, jitter, shape, **faults)
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to sleep per completion")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random delay, up to this many seconds")
+    parser.add_argument("--shape", choices=SHAPES + ("mixed",), default="json")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of completions answered with a 503")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="share of completions delayed by --slow-latency")
+    parser.add_argument("--slow-latency", type=float, default=0.0)
+    parser.add_argument("--fault", nargs=2, action="append", default=[], metavar=("MODEL", "SETTINGS"),
+                        help="per-model overrides, e.g. --fault fake-a latency=2,error_rate=0.5")
+    args = parser.parse_args()
+    state = FakeLLMState(args.latency, args.jitter, args.shape, args.seed,
+                         args.error_rate, args.slow_rate, args.slow_latency)
+    for model, settings in args.fault:
+        state.set_fault(model, **dict(item.split("=", 1) for item in settings.split(",")))
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(state))
+    server.daemon_threads = True
+    print(f"Fake LLM listening on http://{args.host}:{args.port}/v1")
+    server.serve_forever()
@@ -0,0 +1,97 @@
+"""Synthetic resume fixtures shared by the benchmark scripts.
+
+Write a set to disk for manual testing or other tools:
+
+    python benchmarks/fixtures.py --out fixtures/ --count 50 --max-pages 8
+"""
+import argparse
+import io
+import os
+import random
+
+SKILLS = [
+    "Python", "FastAPI", "Django", "PostgreSQL", "Redis", "Docker", "Kubernetes", "AWS",
+    "Terraform", "React", "TypeScript", "Go", "Kafka", "GraphQL", "CI/CD", "Linux",
+    "machine learning", "pandas", "NumPy", "REST APIs", "microservices", "SQL",
+]
+VERBS = ["Built", "Designed", "Led", "Migrated", "Optimized", "Shipped", "Automated", "Scaled"]
+NOUNS = ["billing service", "data pipeline", "search API", "mobile backend", "ETL jobs", "auth system"]
+SECTIONS = ["Summary", "Experience", "Projects", "Education", "Skills", "Certifications"]
+
+
+def resume_lines(seed: int, paragraphs: int = 20) -> list[str]:
+    rng = random.Random(seed)
+    lines = [f"Candidate {seed}", f"candidate{seed}@example.com"]
+    for i in range(paragraphs):
+        if i % 6 == 0:
+            lines.append(SECTIONS[(i // 6) % len(SECTIONS)])
+        skills = ", ".join(rng.sample(SKILLS, 3))
+        lines.append(
+            f"{rng.choice(VERBS)} a {rng.choice(NOUNS)} using {skills}, "
+            f"improving throughput by {rng.randint(5, 90)}% for {rng.randint(2, 40)} teams."
+        )
+    return lines
+
+
+def resume_text(seed: int, paragraphs: int = 20) -> str:
+    return "\n".join(resume_lines(seed, paragraphs))
+
+
+def generate_pdf(seed: int, pages: int = 1) -> bytes:
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=letter)
+    for page in range(pages):
+        y = 750
+        c.setFont("Helvetica", 10)
+        for line in resume_lines(seed * 1000 + page, 40):
+            c.drawString(40, y, line[:110])
+            y -= 16
+            if y < 40:
+                break
+        c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+
+def generate_docx(seed: int, paragraphs: int = 40) -> bytes:
+    from docx import Document
+
+    doc = Document()
+    for line in resume_lines(seed, paragraphs):
+        doc.add_paragraph(line)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def corpus(count: int, max_pages: int = 5) -> list[tuple[str, bytes]]:
+    """Distinct (filename, bytes) pairs, alternating PDF and DOCX of varying size."""
+    files = []
+    for i in range(count):
+        if i % 2 == 0:
+            files.append((f"resume_{i}.pdf", generate_pdf(i, pages=1 + i % max_pages)))
+        else:
+            files.append((f"resume_{i}.docx", generate_docx(i, paragraphs=20 + 20 * (i % max_pages))))
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write generated PDF/DOCX resumes to a directory.")
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--count", type=int, default=20)
+    parser.add_argument("--max-pages", type=int, default=5)
+    args = parser.parse_args()
+    os.makedirs(args.out, exist_ok=True)
+    total = 0
+    for filename, data in corpus(args.count, args.max_pages):
+        with open(os.path.join(args.out, filename), "wb") as f:
+            f.write(data)
+        total += len(data)
+    print(f"wrote {args.count} files, {total / 1024:.0f} KiB, to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
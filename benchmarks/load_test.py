@@ -0,0 +1,268 @@
+"""Load test of the main API paths against the fake LLM server.
+
+Runs the app in-process on a throwaway SQLite database (or ``--database-url``)
+with the review worker embedded, and drives each scenario from a thread pool:
+
+    upload  POST /resume/upload with generated PDF/DOCX resumes of varying size
+    review  queue a review and long-poll until its result is saved
+    match   POST /job_match/{id}/match with AI suggestions
+    list    resume, review and job-match list pages
+    admin   stats, search, review and user listings
+
+For each scenario it reports p50/p95/p99 latency, throughput and the peak RSS
+reached so far, then compares them with a stored baseline:
+
+    python benchmarks/load_test.py --requests 200 --concurrency 8 --llm-latency 0.2
+    python benchmarks/load_test.py --save-baseline benchmarks/baseline.json
+
+Exits non-zero when a scenario is more than ``--tolerance`` slower (p95) or
+lower in throughput than the baseline, or fails requests it did not fail before.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.app_env import configure_env
+from benchmarks.fake_llm_server import SHAPES, serve
+from benchmarks.fixtures import SKILLS, corpus
+
+SCENARIOS = ("upload", "review", "match", "list", "admin")
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+ADMIN_QUERIES = ["python", "kubernetes aws", '"data pipeline"', "react -django"]
+
+
+def peak_rss_mb(who=resource.RUSAGE_SELF) -> float:
+    peak = resource.getrusage(who).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = q * (len(sorted_values) - 1)
+    low = int(index)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (index - low)
+
+
+class Context:
+    """Logged-in users and the resumes they own, shared by the scenarios."""
+
+    def __init__(self, client, users: int):
+        self.client = client
+        self.users = [self._login(f"load{i}@example.com") for i in range(users)]
+        self.admin = self._login("admin@example.com")
+        self.resumes = []  # (headers, resume_id)
+        self.next_file = 0
+
+    def _login(self, email: str) -> dict:
+        credentials = {"email": email, "password": "load-test-pw"}
+        self.client.post("/auth/register", json=credentials)
+        token = self.client.post("/auth/login", json=credentials).json()["access_token"]
+        return {"Authorization": f"Bearer {token}"}
+
+    def check(self, response, *expected):
+        if response.status_code not in (expected or (200,)):
+            raise RuntimeError(f"{response.request.method} {response.request.url.path}: "
+                               f"{response.status_code} {response.text[:200]}")
+        return response
+
+
+def prepare_uploads(ctx: Context, count: int, max_pages: int):
+    files = corpus(ctx.next_file + count, max_pages)[ctx.next_file:]
+    ctx.next_file += count
+    return files
+
+
+def upload(ctx: Context, i: int, files):
+    headers = ctx.users[i % len(ctx.users)]
+    filename, data = files[i]
+    media_type = "application/pdf" if filename.endswith(".pdf") else \
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+    response = ctx.check(ctx.client.post("/resume/upload", files={"file": (filename, data, media_type)},
+                                         headers=headers), 201)
+    ctx.resumes.append((headers, response.json()["resume_id"]))
+
+
+def review(ctx: Context, i: int):
+    headers, resume_id = ctx.resumes[i % len(ctx.resumes)]
+    job_id = ctx.check(ctx.client.get(f"/resume/{resume_id}/review", headers=headers)).json()["job_id"]
+    event = ctx.check(ctx.client.get(f"/resume/review-jobs/{job_id}/wait", params={"timeout": 60},
+                                     headers=headers)).json()
+    if event["status"] != "done":
+        raise RuntimeError(f"review job {job_id} ended {event['status']}: {event.get('last_error')}")
+
+
+def match(ctx: Context, i: int):
+    headers, resume_id = ctx.resumes[i % len(ctx.resumes)]
+    skills = ", ".join(SKILLS[(i + k) % len(SKILLS)] for k in range(4))
+    description = f"Role {i}: backend engineer with {skills}; on-call and mentoring experience."
+    ctx.check(ctx.client.post(f"/job_match/{resume_id}/match", json={"job_description": description},
+                              headers=headers))
+
+
+def listing(ctx: Context, i: int):
+    headers, resume_id = ctx.resumes[i % len(ctx.resumes)]
+    kind = i % 3
+    if kind == 0:
+        ctx.check(ctx.client.get("/resume/resumes", params={"limit": 50}, headers=headers))
+    elif kind == 1:
+        # 404 when the review scenario did not run
+        ctx.check(ctx.client.get(f"/resume/{resume_id}/reviews", params={"limit": 50}, headers=headers), 200, 404)
+    else:
+        ctx.check(ctx.client.get(f"/job_match/{resume_id}/matches", params={"limit": 50}, headers=headers))
+
+
+def admin(ctx: Context, i: int):
+    kind = i % 4
+    if kind == 0:
+        ctx.check(ctx.client.get("/admin/stats", headers=ctx.admin))
+    elif kind == 1:
+        ctx.check(ctx.client.get("/admin/search", params={"q": ADMIN_QUERIES[i % len(ADMIN_QUERIES)]},
+                                 headers=ctx.admin))
+    elif kind == 2:
+        ctx.check(ctx.client.get("/admin/reviews", params={"limit": 50}, headers=ctx.admin), 200, 404)
+    else:
+        ctx.check(ctx.client.get("/admin/users", params={"limit": 50}, headers=ctx.admin))
+
+
+def run_scenario(operation, requests: int, concurrency: int) -> dict:
+    def timed(i):
+        started = time.perf_counter()
+        try:
+            operation(i)
+            error = None
+        except Exception as exc:
+            error = str(exc)
+        return time.perf_counter() - started, error
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        outcomes = list(pool.map(timed, range(requests)))
+    elapsed = time.perf_counter() - started
+    latencies = sorted(latency for latency, error in outcomes if error is None)
+    errors = [error for _, error in outcomes if error is not None]
+    if errors:
+        print(f"  {len(errors)} failed, first: {errors[0]}")
+    return {
+        "requests": requests,
+        "errors": len(errors),
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def compare(baseline: dict, results: dict, tolerance: float) -> list[str]:
+    """Human-readable regressions of ``results`` against ``baseline``."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+        if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95_ms']} -> {current['p95_ms']} ms")
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {previous['throughput_rps']} -> {current['throughput_rps']} req/s")
+        if current["errors"] > previous["errors"]:
+            regressions.append(f"{name}: errors {previous['errors']} -> {current['errors']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=100, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--max-pages", type=int, default=5, help="largest generated resume, in pages")
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--llm-jitter", type=float, default=0.1)
+    parser.add_argument("--llm-shape", choices=SHAPES + ("mixed",), default="mixed")
+    parser.add_argument("--llm-port", type=int, default=8099)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="compare with this file if it exists")
+    parser.add_argument("--save-baseline", metavar="PATH", help="write the results here as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown")
+    args = parser.parse_args()
+
+    configure_env(args.database_url, llm_base_url=f"http://127.0.0.1:{args.llm_port}/v1")
+    # Measure the paths, not the per-user quotas; reviews are processed in this process
+    os.environ["REVIEW_LIMIT_PER_DAY"] = os.environ["JOB_MATCH_LIMIT_PER_DAY"] = str(10 ** 9)
+    os.environ.setdefault("REVIEW_WORKER_EMBEDDED", "true")
+    os.environ.setdefault("REVIEW_WORKER_POLL_INTERVAL", "0.05")
+    os.environ.setdefault("REVIEW_EVENTS_POLL_INTERVAL", "0.05")
+    server, llm_state = serve(port=args.llm_port, latency=args.llm_latency, jitter=args.llm_jitter,
+                              shape=args.llm_shape)
+
+    from fastapi.testclient import TestClient
+    from app.db.session import engine
+    from app.main import app
+
+    config = {key: getattr(args, key) for key in
+              ("requests", "concurrency", "users", "max_pages", "llm_latency", "llm_jitter", "llm_shape")}
+    config["database"] = engine.dialect.name
+    results = {}
+    with TestClient(app) as client:
+        ctx = Context(client, args.users)
+        files = prepare_uploads(ctx, args.requests, args.max_pages)
+        if "upload" not in args.scenarios:
+            for i in range(args.requests):
+                upload(ctx, i, files)
+        print(f"{'scenario':<8} {'reqs':>5} {'errors':>6} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} "
+              f"{'p99 ms':>9} {'peak RSS MB':>12}")
+        operations = {
+            "upload": lambda i: upload(ctx, i, files),
+            "review": lambda i: review(ctx, i),
+            "match": lambda i: match(ctx, i),
+            "list": lambda i: listing(ctx, i),
+            "admin": lambda i: admin(ctx, i),
+        }
+        for name in SCENARIOS:
+            if name not in args.scenarios:
+                continue
+            result = results[name] = run_scenario(operations[name], args.requests, args.concurrency)
+            print(f"{name:<8} {result['requests']:>5} {result['errors']:>6} {result['throughput_rps']:>8.1f} "
+                  f"{result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} {result['p99_ms']:>9.1f} "
+                  f"{result['peak_rss_mb']:>12.1f}")
+    server.shutdown()
+    # Parser processes have exited by now, so their peak is visible
+    print(f"parser workers peak RSS {peak_rss_mb(resource.RUSAGE_CHILDREN):.1f} MB, "
+          f"fake LLM served {llm_state.snapshot()['requests']} completions")
+
+    report = {
+        "config": config,
+        "machine": {"python": platform.python_version(), "platform": platform.platform()},
+        "scenarios": results,
+    }
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"saved baseline to {args.save_baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}; write one with --save-baseline")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get("config") != config:
+        print(f"warning: baseline was recorded with {baseline.get('config')}")
+    regressions = compare(baseline, results, args.tolerance)
+    if regressions:
+        sys.exit("regressions against the baseline:\n  " + "\n  ".join(regressions))
+    print(f"no regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
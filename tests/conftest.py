@@ -0,0 +1,34 @@
+"""Shared fixtures: the app on a throwaway database, migrated to head by its own startup.
+
+Tests run against a temp SQLite file; set ``TEST_DATABASE_URL`` to run them against PostgreSQL.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.app_env import configure_env
+
+configure_env(os.getenv("TEST_DATABASE_URL"))
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def login(client):
+    """Headers for a user, registered on first use."""
+    def login(email: str) -> dict:
+        credentials = {"email": email, "password": "secret"}
+        client.post("/auth/register", json=credentials)
+        token = client.post("/auth/login", json=credentials).json()["access_token"]
+        return {"Authorization": f"Bearer {token}"}
+    return login
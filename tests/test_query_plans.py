@@ -0,0 +1,97 @@
+"""Every hot endpoint's queries are served by an index.
+
+Drives the endpoints with TestClient on the migrated schema, captures each
+SELECT they issue and EXPLAINs it; a full table scan fails the test. On
+PostgreSQL sequential scans are disabled for the EXPLAIN, so the planner
+reports whether an index *can* be used, whatever the table size.
+"""
+import re
+
+import pytest
+from sqlalchemy import event
+from sqlmodel import Session
+
+from app.crud.resume import get_resume_by_content_hash
+from app.db.session import engine
+from app.services.parser import content_hash
+from benchmarks.fixtures import generate_pdf
+
+ENDPOINTS = [
+    "login",
+    "upload (parse cache hit)",
+    "upload (dedup lookup)",
+    "list resumes",
+    "get resume",
+    "request review",
+    "review job status",
+    "list reviews",
+    "list job matches",
+]
+
+
+def explain(connection, statement, parameters) -> list[str]:
+    if connection.dialect.name == "sqlite":
+        rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+        return [row[-1] for row in rows]
+    connection.exec_driver_sql("SET enable_seqscan = off")
+    rows = connection.exec_driver_sql("EXPLAIN " + statement, parameters).fetchall()
+    return [row[0] for row in rows]
+
+
+def full_scans(plan: list[str], dialect: str) -> list[str]:
+    if dialect == "sqlite":
+        return [line for line in plan if re.match(r"SCAN \w+$", line.strip())]
+    return [line for line in plan if "Seq Scan" in line]
+
+
+@pytest.fixture(scope="module")
+def queries(client, login):
+    """endpoint name -> the SELECTs it ran, as (statement, parameters)."""
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    headers = login("plans@example.com")
+    pdf = generate_pdf(1)
+    resume_id = client.post("/resume/upload", headers=headers,
+                            files={"file": ("plans.pdf", pdf, "application/pdf")}).json()["resume_id"]
+    job_id = client.get(f"/resume/{resume_id}/review", headers=headers).json()["job_id"]
+    requests = {
+        "login": ("POST", "/auth/login", {"json": {"email": "plans@example.com", "password": "secret"}}),
+        "upload (parse cache hit)": ("POST", "/resume/upload",
+                                     {"files": {"file": ("plans.pdf", pdf, "application/pdf")}}),
+        "list resumes": ("GET", "/resume/resumes", {}),
+        "get resume": ("GET", f"/resume/{resume_id}", {}),
+        "request review": ("GET", f"/resume/{resume_id}/review", {}),
+        "review job status": ("GET", f"/resume/review-jobs/{job_id}", {}),
+        "list reviews": ("GET", f"/resume/{resume_id}/reviews", {}),
+        "list job matches": ("GET", f"/job_match/{resume_id}/matches", {}),
+    }
+    results = {}
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        for name, (method, path, kwargs) in requests.items():
+            captured.clear()
+            client.request(method, path, headers=headers, **kwargs)
+            results[name] = list(captured)
+        # The re-upload is answered by the in-process parse cache before the database is asked,
+        # so run the content-hash dedup lookup that a cold process (or another worker) makes directly
+        captured.clear()
+        with Session(engine) as session:
+            get_resume_by_content_hash(session, content_hash(pdf))
+        results["upload (dedup lookup)"] = list(captured)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    return results
+
+
+@pytest.mark.parametrize("endpoint", ENDPOINTS)
+def test_hot_queries_use_an_index(queries, endpoint):
+    assert queries[endpoint], f"{endpoint} ran no SELECT"
+    with engine.connect() as connection:
+        for statement, parameters in queries[endpoint]:
+            plan = explain(connection, statement, parameters)
+            scans = full_scans(plan, connection.dialect.name)
+            assert not scans, f"{' '.join(statement.split())[:200]}\n" + "\n".join(plan)
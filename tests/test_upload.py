@@ -0,0 +1,99 @@
+"""Uploads are streamed: an oversized body is cut off, and peak memory does not grow with the file."""
+import io
+import os
+import tracemalloc
+import zipfile
+
+import pytest
+
+from app.utils.upload import UPLOAD_CHUNK_BYTES, UPLOAD_MAX_BYTES, UPLOAD_SPOOL_BYTES
+from benchmarks.fixtures import generate_docx
+
+# Starlette spools multipart file parts in memory up to 1 MiB before it moves them to disk
+MULTIPART_SPOOL_BYTES = 1024 * 1024
+PEAK_BOUND = MULTIPART_SPOOL_BYTES + UPLOAD_SPOOL_BYTES + 8 * UPLOAD_CHUNK_BYTES
+
+
+class Rechunked:
+    """Hands the request body to the app in UPLOAD_CHUNK_BYTES pieces, as a real server does.
+
+    TestClient passes the whole body in one message, which the multipart parser would copy in one go.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        pieces = []
+
+        async def chunked_receive():
+            if not pieces:
+                message = await receive()
+                body = memoryview(message.get("body", b""))
+                if message["type"] != "http.request" or not body:
+                    return message
+                pieces.extend(body[i:i + UPLOAD_CHUNK_BYTES] for i in range(0, len(body), UPLOAD_CHUNK_BYTES))
+            return {"type": "http.request", "body": bytes(pieces.pop(0)), "more_body": bool(pieces)}
+
+        await self.app(scope, chunked_receive, send)
+
+
+def padded_docx(size: int) -> bytes:
+    """A valid DOCX of about ``size`` bytes: a generated resume plus an incompressible media file."""
+    buffer = io.BytesIO(generate_docx(1))
+    with zipfile.ZipFile(buffer, "a", compression=zipfile.ZIP_STORED) as archive:
+        archive.writestr("word/media/padding.bin", os.urandom(size - len(buffer.getvalue())))
+    return buffer.getvalue()
+
+
+@pytest.fixture(scope="module")
+def headers(login):
+    return login("uploads@example.com")
+
+
+def test_streamed_upload_over_the_cap_is_rejected(client, headers):
+    boundary = "upload-test-boundary"
+
+    def body():
+        # A generator body is sent chunked, without Content-Length, so the size has to be counted as it arrives
+        yield (f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"big.pdf\"\r\n"
+               f"Content-Type: application/pdf\r\n\r\n%PDF-").encode()
+        for _ in range(UPLOAD_MAX_BYTES // UPLOAD_CHUNK_BYTES + 2):
+            yield b"x" * UPLOAD_CHUNK_BYTES
+        yield f"\r\n--{boundary}--\r\n".encode()
+
+    response = client.post("/resume/upload", content=body(),
+                           headers={**headers, "Content-Type": f"multipart/form-data; boundary={boundary}"})
+    assert response.status_code == 413
+
+
+def test_file_over_the_cap_is_rejected(client, headers):
+    # Fits the request-size slack for multipart overhead, so read_upload is the one that refuses it
+    content = b"%PDF-" + b"x" * (UPLOAD_MAX_BYTES - 4)
+    response = client.post("/resume/upload", headers=headers,
+                           files={"file": ("big.pdf", content, "application/pdf")})
+    assert response.status_code == 413
+
+
+def test_peak_memory_of_a_large_upload_is_bounded(client, headers):
+    from fastapi.testclient import TestClient
+
+    content = padded_docx(UPLOAD_MAX_BYTES - 64 * 1024)
+    request = client.build_request("POST", "/resume/upload", headers=headers,
+                                   files={"file": ("large.docx", content, "application/octet-stream")})
+    # Encoded before tracing starts, so only what the app allocates is counted
+    request.read()
+    chunked = TestClient(Rechunked(client.app))
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        response = chunked.send(request)
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+    assert response.status_code == 201, response.text
+    assert peak < PEAK_BOUND, f"peak {peak // 1024} KiB for a {len(content) // 1024} KiB upload"
+    assert peak < len(content) / 2